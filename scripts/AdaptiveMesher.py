@@ -0,0 +1,182 @@
+#!/usr/bin/env python3
+
+import numpy as np
+from TerrainSampler import triangle_stencils
+
+
+class AdaptiveMesher:
+    """Error-bounded right-triangulated irregular network (RTIN) over a height grid
+
+    The grid is embedded in a (2^k + 1) square that is recursively split
+    along triangle hypotenuses, as in Martini. Each triangle gets the exact
+    maximum vertical deviation of the grid points it covers from its plane,
+    and each hypotenuse midpoint the maximum over all triangles below it.
+    Splitting every triangle whose midpoint error exceeds a threshold then
+    yields a crack-free mesh whose error stays within the threshold, with
+    large triangles on flat ground and small ones on ridges. Triangles that
+    reach past the grid are always split, so the padding never shows up in
+    the mesh, and so are triangles along the grid border, which keeps every
+    border vertex of the full grid mesh.
+    """
+
+    def __init__(self, heights, chunk_points=1 << 22):
+        self.heights = np.asarray(heights, dtype=np.float64)
+        rows, cols = self.heights.shape
+        if rows < 2 or cols < 2:
+            raise ValueError("Height grid needs at least 2x2 samples")
+
+        self.max_col = cols - 1
+        self.max_row = rows - 1
+        self.size = 1 << int(np.ceil(np.log2(max(self.max_col, self.max_row))))
+        self.chunk_points = chunk_points
+
+        # Accumulated error per hypotenuse midpoint, indexed row * (size + 1) + col
+        self.errors = np.zeros((self.size + 1) ** 2, dtype=np.float64)
+        self._compute_errors()
+
+    def _roots(self):
+        """The two triangles halving the padded square, as (a, b, c) col/row arrays
+
+        a-b is the hypotenuse and c the right-angle corner.
+        """
+        n = self.size
+        a = np.array([[0, 0], [n, n]], dtype=np.int64)
+        b = np.array([[n, n], [0, 0]], dtype=np.int64)
+        c = np.array([[n, 0], [0, n]], dtype=np.int64)
+        return a, b, c
+
+    @staticmethod
+    def _children(a, b, c):
+        """Split triangles at their hypotenuse midpoint"""
+        m = (a + b) // 2
+        return np.concatenate([a, c]), np.concatenate([c, b]), np.concatenate([m, m])
+
+    @staticmethod
+    def _splittable(a, b):
+        """True where the hypotenuse midpoint is a grid point"""
+        return ((a + b) % 2 == 0).all(axis=1)
+
+    def _midpoint_index(self, a, b):
+        m = (a + b) // 2
+        return m[:, 1] * (self.size + 1) + m[:, 0]
+
+    def _overlaps(self, a, b, c):
+        """True for triangles covering part of the real grid"""
+        min_corner = np.minimum(np.minimum(a, b), c)
+        return (min_corner[:, 0] < self.max_col) & (min_corner[:, 1] < self.max_row)
+
+    def _inside(self, a, b, c):
+        """True for triangles lying entirely on the real grid"""
+        max_corner = np.maximum(np.maximum(a, b), c)
+        return (max_corner[:, 0] <= self.max_col) & (max_corner[:, 1] <= self.max_row)
+
+    def _on_border(self, a, b, c):
+        """True for triangles with an edge longer than one cell on the grid border"""
+        on_border = np.zeros(len(a), dtype=bool)
+        for p, q in ((a, b), (b, c), (c, a)):
+            long_edge = np.abs(p - q).max(axis=1) > 1
+            for axis, limit in ((0, 0), (0, self.max_col), (1, 0), (1, self.max_row)):
+                on_border |= long_edge & (p[:, axis] == limit) & (q[:, axis] == limit)
+        return on_border
+
+    def plane_errors(self, a, b, c):
+        """Maximum vertical deviation of the grid points inside each triangle from its plane"""
+        errors = np.zeros(len(a))
+        if not len(a):
+            return errors
+
+        tri_col = np.column_stack([a[:, 0], b[:, 0], c[:, 0]])
+        tri_row = np.column_stack([a[:, 1], b[:, 1], c[:, 1]])
+        h = self.heights
+        for index, ox, oy, w0, w1, w2 in triangle_stencils(tri_col, tri_row, self.chunk_points):
+            ax, ay = a[index, 0], a[index, 1]
+            za = h[ay, ax][:, None]
+            zb = h[b[index, 1], b[index, 0]][:, None]
+            zc = h[c[index, 1], c[index, 0]][:, None]
+            z = h[ay[:, None] + oy, ax[:, None] + ox]
+            errors[index] = np.abs(z - (w0 * za + w1 * zb + w2 * zc)).max(axis=1)
+
+        return errors
+
+    def _compute_errors(self):
+        """Fill the midpoint errors bottom-up over every splittable level"""
+        levels = []
+        a, b, c = self._roots()
+        while len(a):
+            keep = self._overlaps(a, b, c)
+            a, b, c = a[keep], b[keep], c[keep]
+            if not len(a) or not self._splittable(a, b).all():
+                break
+            levels.append((a, b, c))
+            a, b, c = self._children(a, b, c)
+
+        for a, b, c in reversed(levels):
+            errors = np.full(len(a), np.inf)
+            inside = self._inside(a, b, c) & ~self._on_border(a, b, c)
+            errors[inside] = self.plane_errors(a[inside], b[inside], c[inside])
+
+            # Include the midpoints of the children so parents split first
+            if self._splittable(a, c).all():
+                errors = np.maximum(errors, self.errors[self._midpoint_index(a, c)])
+                errors = np.maximum(errors, self.errors[self._midpoint_index(c, b)])
+            np.maximum.at(self.errors, self._midpoint_index(a, b), errors)
+
+    def triangles(self, max_error):
+        """Leaf triangles (a, b, c) of the RTIN refined until every error is within max_error"""
+        leaves = []
+        a, b, c = self._roots()
+        while len(a):
+            keep = self._overlaps(a, b, c)
+            a, b, c = a[keep], b[keep], c[keep]
+
+            split = self._splittable(a, b)
+            split[split] = self.errors[self._midpoint_index(a[split], b[split])] > max_error
+            leaf = ~split
+            leaves.append((a[leaf], b[leaf], c[leaf]))
+            a, b, c = self._children(a[split], b[split], c[split])
+
+        a, b, c = (np.concatenate(points) for points in zip(*leaves))
+        inside = self._inside(a, b, c)
+        return a[inside], b[inside], c[inside]
+
+    def threshold_for_budget(self, max_triangles):
+        """Smallest error threshold whose mesh has at most max_triangles faces"""
+        candidates = np.unique(np.concatenate([[0.0], self.errors[np.isfinite(self.errors)]]))
+        low, high = 0, len(candidates) - 1
+        while low < high:
+            middle = (low + high) // 2
+            if len(self.triangles(candidates[middle])[0]) <= max_triangles:
+                high = middle
+            else:
+                low = middle + 1
+        return candidates[low]
+
+    def mesh(self, max_error=0.0, max_triangles=None):
+        """Build the adaptive mesh
+
+        Returns (cols, rows, faces, error): grid coordinates of the used
+        vertices, counter-clockwise face indices and the achieved maximum
+        vertical error. With max_triangles the threshold is raised until the
+        face count fits, but never below max_error.
+        """
+        threshold = max_error or 0.0
+        if max_triangles is not None:
+            threshold = max(threshold, self.threshold_for_budget(max_triangles))
+
+        a, b, c = self.triangles(threshold)
+        achieved_error = float(self.plane_errors(a, b, c).max()) if len(a) else 0.0
+
+        # Counter-clockwise in (col, row) like the regular grid mesher
+        cross = ((b[:, 0] - a[:, 0]) * (c[:, 1] - a[:, 1]) -
+                 (b[:, 1] - a[:, 1]) * (c[:, 0] - a[:, 0]))
+        flip = cross < 0
+        b[flip], c[flip] = c[flip], b[flip].copy()
+
+        corners = np.stack([a, b, c], axis=1).reshape(-1, 2)
+        flat = corners[:, 1] * (self.size + 1) + corners[:, 0]
+        used, faces = np.unique(flat, return_inverse=True)
+        index_dtype = np.int32 if len(used) < np.iinfo(np.int32).max else np.int64
+        faces = faces.reshape(-1, 3).astype(index_dtype)
+
+        rows, cols = np.divmod(used, self.size + 1)
+        return cols, rows, faces, achieved_error
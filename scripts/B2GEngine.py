@@ -7,6 +7,12 @@ import sys
 import time
 import threading
 import argparse
+import tempfile
+import traceback
+import contextlib
+import json
+import hashlib
+from concurrent.futures import ProcessPoolExecutor, as_completed
 from itertools import cycle
 
 class LoadingAnimation:
@@ -34,15 +40,171 @@ class LoadingAnimation:
             self._thread.join()
             print('\r', end='', flush=True)
 
+BATCH_EXPORT_SCRIPT = '''
+import bpy
+import json
+import sys
+import traceback
+
+manifest_path, results_path = sys.argv[sys.argv.index("--") + 1:][:2]
+with open(manifest_path) as f:
+    exports = json.load(f)
+
+def decimate(objects, ratio):
+    for obj in objects:
+        bpy.context.view_layer.objects.active = obj
+        modifier = obj.modifiers.new(name="Decimate", type='DECIMATE')
+        modifier.ratio = ratio
+        bpy.ops.object.modifier_apply(modifier=modifier.name)
+
+def export(objects, filepath):
+    bpy.ops.object.select_all(action='DESELECT')
+    for obj in objects:
+        obj.select_set(True)
+    bpy.ops.wm.collada_export(
+        filepath=filepath,
+        selected=True,
+        apply_modifiers=True,
+        include_children=True,
+        include_armatures=True,
+        include_shapekeys=False
+    )
+
+results = []
+for item in exports:
+    result = {"blend_file": item["blend_file"], "success": False, "error": None}
+    try:
+        bpy.ops.wm.open_mainfile(filepath=item["blend_file"])
+        visual = [obj for obj in bpy.data.objects if obj.type == 'MESH']
+
+        # Duplicate the meshes so both exports come from a single file load
+        copies = {}
+        for obj in visual:
+            copy = obj.copy()
+            copy.data = obj.data.copy()
+            for collection in obj.users_collection:
+                collection.objects.link(copy)
+            copies[obj] = copy
+        for obj, copy in copies.items():
+            if obj.parent in copies:
+                copy.parent = copies[obj.parent]
+        collision = list(copies.values())
+
+        decimate(visual, item["visual_ratio"])
+        export(visual, item["output_path"])
+        decimate(collision, item["collision_ratio"])
+        export(collision, item["collision_path"])
+        result["success"] = True
+    except Exception:
+        result["error"] = traceback.format_exc()
+    results.append(result)
+
+    # Rewritten after every asset so a crash keeps the results so far
+    with open(results_path, "w") as f:
+        json.dump(results, f, indent=2)
+'''
+
 class AssetExporter:
-    def __init__(self, blender_path):
-        self.blender_path = os.path.join(blender_path, "blender")
+    VISUAL_DECIMATE_RATIO = 0.1
+    COLLISION_DECIMATE_RATIO = 0.01
+
+    # Bump when the export output changes so cached assets are rebuilt
+    EXPORTER_VERSION = 1
+    MANIFEST_NAME = '.export_manifest.json'
+
+    def __init__(self, blender_path=None, show_progress=True):
+        # Without an installation directory, use the blender found on PATH
+        if blender_path:
+            self.blender_path = os.path.join(blender_path, "blender")
+        else:
+            self.blender_path = shutil.which("blender") or "blender"
         self.loading_animation = LoadingAnimation()
+        self.show_progress = show_progress
 
-    def process_asset(self, blend_file, category_dir):
-        """Process a single asset"""
+    def _start_progress(self, description):
+        if self.show_progress:
+            self.loading_animation.description = description
+            self.loading_animation.start()
+
+    def _stop_progress(self):
+        if self.show_progress:
+            self.loading_animation.stop()
+
+    @staticmethod
+    def _file_hash(path, chunk_size=1 << 20):
+        """SHA-256 of a file's content"""
+        digest = hashlib.sha256()
+        with open(path, 'rb') as f:
+            for chunk in iter(lambda: f.read(chunk_size), b''):
+                digest.update(chunk)
+        return digest.hexdigest()
+
+    def _export_settings(self):
+        return {
+            'visual_ratio': self.VISUAL_DECIMATE_RATIO,
+            'collision_ratio': self.COLLISION_DECIMATE_RATIO,
+            'exporter_version': self.EXPORTER_VERSION
+        }
+
+    def _load_manifest(self, category_dir):
+        """Read a category's export manifest, {} if missing or unreadable"""
+        manifest_path = os.path.join(category_dir, self.MANIFEST_NAME)
+        try:
+            with open(manifest_path) as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return {}
+
+    def _save_manifest(self, category_dir, manifest):
+        os.makedirs(category_dir, exist_ok=True)
+        manifest_path = os.path.join(category_dir, self.MANIFEST_NAME)
+        tmp_path = manifest_path + '.tmp'
+        with open(tmp_path, 'w') as f:
+            json.dump(manifest, f, indent=2, sort_keys=True)
+        os.replace(tmp_path, manifest_path)
+
+    def is_up_to_date(self, blend_file, category_dir):
+        """Check whether an asset was already exported from the same source and settings
+
+        The content hash is only recomputed when the file size or
+        modification time differ from the recorded ones.
+        """
+        base_name = os.path.splitext(os.path.basename(blend_file))[0]
+        entry = self._load_manifest(category_dir).get(base_name)
+        if not entry or entry.get('settings') != self._export_settings():
+            return False
+
+        asset_dir = os.path.join(category_dir, base_name)
+        outputs = [
+            os.path.join(asset_dir, 'model.sdf'),
+            os.path.join(asset_dir, 'mesh', f"{base_name}.dae"),
+            os.path.join(asset_dir, 'mesh', f"{base_name}_collision.dae")
+        ]
+        if not all(os.path.exists(path) for path in outputs):
+            return False
+
+        stat = os.stat(blend_file)
+        if entry.get('size') == stat.st_size and entry.get('mtime_ns') == stat.st_mtime_ns:
+            return True
+        return entry.get('sha256') == self._file_hash(blend_file)
+
+    def record_export(self, blend_file, category_dir):
+        """Store the source hash and settings of a successfully exported asset"""
+        base_name = os.path.splitext(os.path.basename(blend_file))[0]
+        stat = os.stat(blend_file)
+        manifest = self._load_manifest(category_dir)
+        manifest[base_name] = {
+            'source': os.path.basename(blend_file),
+            'sha256': self._file_hash(blend_file),
+            'size': stat.st_size,
+            'mtime_ns': stat.st_mtime_ns,
+            'settings': self._export_settings()
+        }
+        self._save_manifest(category_dir, manifest)
+
+    def _prepare_asset(self, blend_file, category_dir):
+        """Create the model directory structure and return the asset's paths"""
         base_name = os.path.splitext(os.path.basename(blend_file))[0]
-        print(f"\nProcessing asset: {base_name}")
         
         # Create directory structure
         asset_dir = os.path.join(category_dir, base_name)
@@ -54,14 +216,56 @@ class AssetExporter:
         os.makedirs(textures_dir, exist_ok=True)
         os.makedirs(materials_dir, exist_ok=True)
 
+        return {
+            'blend_file': blend_file,
+            'base_name': base_name,
+            'asset_dir': asset_dir,
+            'mesh_dir': mesh_dir,
+            'textures_dir': textures_dir,
+            'materials_dir': materials_dir,
+            'output_path': os.path.join(mesh_dir, f"{base_name}.dae"),
+            'collision_path': os.path.join(mesh_dir, f"{base_name}_collision.dae")
+        }
+
+    def process_asset(self, blend_file, category_dir):
+        """Process a single asset, returns True if the meshes were exported"""
+        asset = self._prepare_asset(blend_file, category_dir)
+        print(f"\nProcessing asset: {asset['base_name']}")
+
         # Export DAE
         print("Step 1: Exporting DAE...")
-        self.loading_animation.description = "Exporting DAE files"
-        self.loading_animation.start()
-        dae_path = os.path.join(mesh_dir, f"{base_name}.dae")
-        collision_path = os.path.join(mesh_dir, f"{base_name}_collision.dae")
-        self._export_dae(blend_file, dae_path, collision_path)
-        self.loading_animation.stop()
+        self._start_progress("Exporting DAE files")
+        exported = self._export_dae(blend_file, asset['output_path'], asset['collision_path'])
+        self._stop_progress()
+
+        self._finish_asset(asset)
+        return exported
+
+    def process_assets_batch(self, jobs):
+        """Process (blend_file, category_dir) jobs with a single Blender session
+
+        Returns {blend_file: success}.
+        """
+        assets = [self._prepare_asset(blend_file, category_dir)
+                  for blend_file, category_dir in jobs]
+
+        print(f"\nStep 1: Exporting DAE for {len(assets)} assets in one Blender session...")
+        self._start_progress("Exporting DAE files")
+        results = self._export_dae_batch(assets)
+        self._stop_progress()
+
+        for asset in assets:
+            print(f"\nProcessing asset: {asset['base_name']}")
+            self._finish_asset(asset)
+        return results
+
+    def _finish_asset(self, asset):
+        """Organize textures and write material, SDF, config and test world files"""
+        base_name = asset['base_name']
+        asset_dir = asset['asset_dir']
+        mesh_dir = asset['mesh_dir']
+        textures_dir = asset['textures_dir']
+        materials_dir = asset['materials_dir']
         
         # Move textures to correct location
         print("Step 2: Moving textures to correct location...")
@@ -74,10 +278,9 @@ class AssetExporter:
         
         # Get textures and create material
         print("Step 3: Finding textures...")
-        self.loading_animation.description = "Processing textures"
-        self.loading_animation.start()
-        textures = self._organize_textures(blend_file, textures_dir)
-        self.loading_animation.stop()
+        self._start_progress("Processing textures")
+        textures = self._organize_textures(asset['blend_file'], textures_dir)
+        self._stop_progress()
         
         if textures:
             print("Step 4: Creating material file...")
@@ -110,7 +313,7 @@ for obj in bpy.data.objects:
         obj.select_set(True)
         bpy.context.view_layer.objects.active = obj
         decimate = obj.modifiers.new(name="Decimate", type='DECIMATE')
-        decimate.ratio = 0.1  
+        decimate.ratio = {self.VISUAL_DECIMATE_RATIO}
         bpy.ops.object.modifier_apply(modifier="Decimate")
 
 bpy.ops.wm.collada_export(
@@ -129,7 +332,7 @@ for obj in bpy.data.objects:
         obj.select_set(True)
         bpy.context.view_layer.objects.active = obj
         decimate = obj.modifiers.new(name="Decimate", type='DECIMATE')
-        decimate.ratio = 0.01  
+        decimate.ratio = {self.COLLISION_DECIMATE_RATIO}
         bpy.ops.object.modifier_apply(modifier="Decimate")
 
 bpy.ops.wm.collada_export(
@@ -141,23 +344,93 @@ bpy.ops.wm.collada_export(
     include_shapekeys=False
 )
 '''
-        script_path = "/tmp/export_script.py"
-        with open(script_path, 'w') as f:
+        # One script file per export so concurrent jobs do not overwrite each other
+        with tempfile.NamedTemporaryFile('w', prefix='export_script_', suffix='.py',
+                                         delete=False) as f:
             f.write(blender_script)
+            script_path = f.name
         
-        result = subprocess.run([
-            self.blender_path,
-            "--background",
-            "--python",
-            script_path
-        ], capture_output=True, text=True)
+        try:
+            result = subprocess.run([
+                self.blender_path,
+                "--background",
+                "--python",
+                script_path
+            ], capture_output=True, text=True)
+        finally:
+            os.remove(script_path)
         
         if os.path.exists(output_path) and os.path.exists(collision_path):
             print(f"Successfully exported: {output_path} and {collision_path}")
+            return True
         else:
             print("Failed to export DAE files")
             print("Blender output:", result.stdout)
             print("Blender errors:", result.stderr)
+            return False
+
+    def _export_dae_batch(self, assets):
+        """Export visual and collision DAEs of many assets from one Blender process
+
+        Blender is run as
+            blender --background --python <script> -- <manifest.json> <results.json>
+        where manifest.json is a list of {"blend_file", "output_path",
+        "collision_path", "visual_ratio", "collision_ratio"} entries and the
+        script writes a list of {"blend_file", "success", "error"} entries to
+        results.json. Returns {blend_file: success}.
+        """
+        manifest = [{
+            'blend_file': asset['blend_file'],
+            'output_path': asset['output_path'],
+            'collision_path': asset['collision_path'],
+            'visual_ratio': self.VISUAL_DECIMATE_RATIO,
+            'collision_ratio': self.COLLISION_DECIMATE_RATIO
+        } for asset in assets]
+
+        with tempfile.TemporaryDirectory(prefix='b2g_batch_') as work_dir:
+            script_path = os.path.join(work_dir, 'batch_export.py')
+            manifest_path = os.path.join(work_dir, 'manifest.json')
+            results_path = os.path.join(work_dir, 'results.json')
+            with open(script_path, 'w') as f:
+                f.write(BATCH_EXPORT_SCRIPT)
+            with open(manifest_path, 'w') as f:
+                json.dump(manifest, f, indent=2)
+
+            result = subprocess.run([
+                self.blender_path,
+                "--background",
+                "--python",
+                script_path,
+                "--",
+                manifest_path,
+                results_path
+            ], capture_output=True, text=True)
+
+            try:
+                with open(results_path) as f:
+                    reported = {item['blend_file']: item for item in json.load(f)}
+            except (OSError, ValueError) as e:
+                print(f"No export results from Blender: {e}")
+                reported = {}
+
+        results = {}
+        for item in manifest:
+            entry = reported.get(item['blend_file'], {})
+            success = (entry.get('success', False) and
+                       os.path.exists(item['output_path']) and
+                       os.path.exists(item['collision_path']))
+            results[item['blend_file']] = success
+            if success:
+                print(f"Successfully exported: {item['output_path']} and {item['collision_path']}")
+            else:
+                print(f"Failed to export DAE files for {item['blend_file']}")
+                if entry.get('error'):
+                    print("Blender error:", entry['error'])
+
+        if not all(results.values()):
+            print("Blender output:", result.stdout)
+            print("Blender errors:", result.stderr)
+        return results
 
     def _organize_textures(self, blend_file, textures_dir):
         """Simply list all textures without categorizing"""
@@ -301,6 +574,103 @@ bpy.ops.wm.collada_export(
             f.write(world_content)
         print(f"Created test world file: {world_path}")
 
+def _process_group(exporter, jobs, batch=False):
+    """Process (blend_file, category_dir) jobs, returns {blend_file: success}"""
+    if batch:
+        try:
+            return exporter.process_assets_batch(jobs)
+        except Exception:
+            traceback.print_exc()
+            return {blend_file: False for blend_file, _ in jobs}
+
+    results = {}
+    for blend_file, category_dir in jobs:
+        try:
+            results[blend_file] = exporter.process_asset(blend_file, category_dir)
+        except Exception:
+            traceback.print_exc()
+            results[blend_file] = False
+    return results
+
+def _process_group_job(blender_path, jobs, log_path, batch=False):
+    """Worker entry point: process jobs with all output captured in log_path"""
+    with open(log_path, 'w') as log, contextlib.redirect_stdout(log), \
+            contextlib.redirect_stderr(log):
+        exporter = AssetExporter(blender_path, show_progress=False)
+        return _process_group(exporter, jobs, batch)
+
+def run_exports(exporter, jobs, num_jobs=1, log_dir=None, batch_size=1, force=False):
+    """Export (blend_file, category_dir) jobs, returns the list of failed blend files
+
+    Assets whose source and export settings match the category manifest are
+    skipped unless force is set. With batch_size > 1 the jobs are grouped
+    and each group is exported by a single Blender process. With
+    num_jobs > 1 groups run concurrently and each group's output goes to
+    its own log file in log_dir.
+    """
+    if not force:
+        pending = []
+        for blend_file, category_dir in jobs:
+            if exporter.is_up_to_date(blend_file, category_dir):
+                print(f"Up to date, skipping: {os.path.basename(blend_file)}")
+            else:
+                pending.append((blend_file, category_dir))
+        jobs = pending
+
+    category_dirs = dict(jobs)
+    batch = batch_size > 1
+    groups = [jobs[i:i + batch_size] for i in range(0, len(jobs), max(batch_size, 1))]
+    failures = []
+
+    if num_jobs <= 1:
+        for group in groups:
+            results = _process_group(exporter, group, batch)
+            for blend_file, success in results.items():
+                if success:
+                    exporter.record_export(blend_file, category_dirs[blend_file])
+                else:
+                    failures.append(blend_file)
+        return failures
+
+    log_dir = log_dir or tempfile.mkdtemp(prefix='b2g_logs_')
+    os.makedirs(log_dir, exist_ok=True)
+    print(f"\nExporting {len(jobs)} assets with {num_jobs} jobs, logs in {log_dir}")
+
+    with ProcessPoolExecutor(max_workers=num_jobs) as pool:
+        futures = {}
+        for index, group in enumerate(groups):
+            if batch:
+                log_name = f"batch_{index:03d}.log"
+            else:
+                blend_file, category_dir = group[0]
+                base_name = os.path.splitext(os.path.basename(blend_file))[0]
+                category = os.path.basename(os.path.normpath(category_dir))
+                log_name = f"{category}_{base_name}.log"
+            log_path = os.path.join(log_dir, log_name)
+            future = pool.submit(_process_group_job, os.path.dirname(exporter.blender_path),
+                                 group, log_path, batch)
+            futures[future] = (group, log_path)
+
+        done = 0
+        for future in as_completed(futures):
+            group, log_path = futures[future]
+            try:
+                results = future.result()
+            except Exception as e:
+                print(f"Error processing {len(group)} assets: {e}")
+                results = {blend_file: False for blend_file, _ in group}
+
+            for blend_file, success in results.items():
+                done += 1
+                status = "ok" if success else "FAILED"
+                print(f"[{done}/{len(jobs)}] {status}: {os.path.basename(blend_file)} (log: {log_path})")
+                if success:
+                    exporter.record_export(blend_file, category_dirs[blend_file])
+                else:
+                    failures.append(blend_file)
+
+    return failures
+
 def main():
     parser = argparse.ArgumentParser(description='Export Blender assets to Gazebo models')
     parser.add_argument('--blender-path', default="/home/vampiro/Downloads/blender-4.2.1-linux-x64",
@@ -309,6 +679,14 @@ def main():
                         help='Path to directory containing Blender files')
     parser.add_argument('--models-base-dir', default="/home/vampiro/Desktop/AI4Forest/forest_generator/models",
                         help='Path to output directory for Gazebo models')
+    parser.add_argument('--jobs', type=int, default=1,
+                        help='Number of assets to export concurrently (default: 1)')
+    parser.add_argument('--log-dir',
+                        help='Directory for per-asset logs when --jobs > 1 (default: temporary directory)')
+    parser.add_argument('--batch-size', type=int, default=1,
+                        help='Assets exported per Blender session (default: 1)')
+    parser.add_argument('--force', action='store_true',
+                        help='Re-export assets even if they are up to date')
 
     args = parser.parse_args()
     
@@ -338,6 +716,7 @@ def main():
     
     exporter = AssetExporter(args.blender_path)
     
+    jobs = []
     for category, models in model_categories.items():
         category_dir = os.path.join(args.models_base_dir, category)
         print(f"\nProcessing {category} category...")
@@ -345,9 +724,18 @@ def main():
         for model in models:
             blend_path = os.path.join(args.blend_files_path, model)
             if os.path.exists(blend_path):
-                exporter.process_asset(blend_path, category_dir)
+                jobs.append((blend_path, category_dir))
             else:
                 print(f"Warning: {blend_path} does not exist")
 
+    failures = run_exports(exporter, jobs, args.jobs, args.log_dir, args.batch_size, args.force)
+
+    print(f"\nProcessed {len(jobs) - len(failures)} of {len(jobs)} assets")
+    if failures:
+        print("Failed assets:")
+        for blend_file in failures:
+            print(f"  - {blend_file}")
+        sys.exit(1)
+
 if __name__ == "__main__":
     main()
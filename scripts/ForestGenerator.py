@@ -1,11 +1,18 @@
 #!/usr/bin/env python3
 
 import os
+import json
 import numpy as np
 from stl import mesh
-from xml.etree import ElementTree as ET
 from pathlib import Path
 import sys
+import io
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from contextlib import ExitStack, redirect_stdout
+from TerrainSampler import TerrainSampler, TerrainInfo
+from SpatialHash import SpatialHash
+from PlacementSampler import PoissonDiskSampler, DensityRasterSampler, ClusterProcessSampler
+from WorldWriter import WorldWriter
 
 class WorldPopulator:
     SCALE_RANGES = {
@@ -31,6 +38,42 @@ class WorldPopulator:
         'grass': {'edge': 0.5, 'center': 0.5},
         'sand': {'edge': 0.7, 'center': 0.3}
     }
+
+    # Other categories a category must keep MIN_DISTANCES[other] away from
+    EXCLUSIONS = {
+        'tree': ['rock', 'sand'],
+        'bush': ['sand']
+    }
+
+    # Random height offset applied on top of the terrain surface
+    Z_JITTER = {
+        'tree': (-0.08, 0.08),
+        'rock': (-0.1, 0.1),
+        'bush': (-0.08, 0.08),
+        'grass': (-0.05, 0.05),
+        'sand': (-0.2, 0)
+    }
+
+    # Cluster process of the 'cluster' placement mode: share of clustered
+    # models, Thomas kernel radius, and either the category whose placed
+    # models act as parents or the mean children per random parent
+    CLUSTERING = {
+        'tree': {'share': 0.7, 'radius': 3.6, 'mean_children': 4.0},
+        'bush': {'share': 0.6, 'radius': 2.4, 'parents': 'tree'}
+    }
+
+    # Max random tilt (roll and pitch) per category, others stand upright
+    TILT_RANGES = {
+        'tree': 0.05,
+        'rock': 0.15
+    }
+
+    PLACEMENT_MODES = ['rejection', 'poisson', 'density', 'cluster']
+    # Modes that can place categories tile by tile in worker processes
+    TILED_PLACEMENT_MODES = ['poisson', 'cluster']
+
+    # Fixed order used to spawn the per-category random streams
+    CATEGORIES = ['tree', 'bush', 'rock', 'grass', 'sand']
     
     def __init__(self, base_path):
         self.base_path = Path(base_path)
@@ -43,6 +86,15 @@ class WorldPopulator:
             'grass': [],
             'sand': []
         }
+        self.spatial_index = {
+            category: SpatialHash(self.MIN_DISTANCES[category])
+            for category in self.placed_models
+        }
+        self.placed_instances = {}
+        self.terrain_sampler = None
+        self.terrain_info = None
+        self.seed_sequence = None
+        self.category_rngs = {}
         self.model_variants = self._get_model_variants()
         self._verify_paths()
 
@@ -78,16 +130,121 @@ class WorldPopulator:
             category_path = self.models_path / category
             if category_path.exists():
                 variants[category] = []
-                for d in category_path.iterdir():
+                # Sorted so variant indices do not depend on directory order
+                for d in sorted(category_path.iterdir()):
                     if d.is_dir() and not d.name.startswith('.'):
                         variants[category].append(d.name)
                 print(f"Found {len(variants[category])} variants for {category}")
                 
         return variants
 
+    def seed(self, seed=None):
+        """Reset the random streams; returns the entropy that reproduces them
+
+        Each category gets an independent np.random.Generator spawned from
+        one SeedSequence, so changing the count of one category does not
+        change the placements of the others.
+        """
+        self.seed_sequence = np.random.SeedSequence(seed)
+        children = self.seed_sequence.spawn(len(self.CATEGORIES))
+        self.category_rngs = {
+            category: np.random.default_rng(child)
+            for category, child in zip(self.CATEGORIES, children)
+        }
+        return self.seed_sequence.entropy
+
+    def _rng(self, category):
+        """Random generator of a category, seeding from OS entropy on first use"""
+        if not self.category_rngs:
+            self.seed()
+        return self.category_rngs[category]
+
+    def tile_seed_sequence(self, category, tile_index):
+        """Seed sequence of one spatial tile of a category
+
+        Equal to the tile_index-th child spawned from the category's stream,
+        but derived directly so it does not depend on spawn order, which lets
+        tiles processed in separate workers draw the same numbers as serially.
+        """
+        if self.seed_sequence is None:
+            self.seed()
+        category_index = self.CATEGORIES.index(category)
+        return np.random.SeedSequence(
+            self.seed_sequence.entropy,
+            spawn_key=self.seed_sequence.spawn_key + (category_index, tile_index)
+        )
+
+    def _get_terrain_tiles(self):
+        """Tile manifest written by TerrainGenerator --tiles, or None for a single mesh"""
+        manifest_path = self.models_path / "ground/tiles/tiles.json"
+        if not manifest_path.exists():
+            return None
+        with open(manifest_path) as f:
+            return json.load(f)
+
+    def _get_terrain_heightmap(self):
+        """Heightmap description written by TerrainGenerator --format heightmap, or None"""
+        info_path = self.models_path / "ground/mesh" / TerrainSampler.HEIGHTMAP_FILENAME
+        if not info_path.exists():
+            return None
+        with open(info_path) as f:
+            return json.load(f)
+
+    def _get_heightmap_sampler(self, heightmap):
+        """Height sampler on the grid of the terrain heightmap image"""
+        from osgeo import gdal
+
+        try:
+            image_path = self.models_path / "ground/mesh" / heightmap['image']
+            ds = gdal.Open(str(image_path))
+            if ds is None:
+                raise FileNotFoundError(f"Terrain heightmap not found at: {image_path}")
+            image = ds.GetRasterBand(1).ReadAsArray()
+            return TerrainSampler.from_heightmap(image, heightmap['size'], heightmap['pos'],
+                                                 heightmap.get('max_value', 65535))
+        except Exception as e:
+            print(f"Error loading terrain heightmap: {e}")
+            sys.exit(1)
+
+    def _get_terrain_source(self):
+        """File the current terrain was generated into, the tile manifest for tiled terrains"""
+        if self._get_terrain_tiles() is not None:
+            return self.models_path / "ground/tiles/tiles.json"
+        return self.models_path / "ground/mesh/terrain.stl"
+
+    def _get_terrain_sidecar(self):
+        """Memory-mapped height grid saved next to the terrain mesh
+
+        Returns None when the sidecar is missing or older than the mesh, in
+        which case heights have to be recovered from the STL.
+        """
+        mesh_dir = self.models_path / "ground/mesh"
+        info_path = mesh_dir / TerrainSampler.GRID_INFO_FILENAME
+        source_path = self._get_terrain_source()
+        if (not info_path.exists() or not (mesh_dir / TerrainSampler.GRID_FILENAME).exists() or
+                not source_path.exists() or
+                info_path.stat().st_mtime < source_path.stat().st_mtime):
+            return None
+
+        try:
+            return TerrainSampler.load(mesh_dir)
+        except (OSError, ValueError, KeyError, TypeError) as e:
+            print(f"Warning: Ignoring invalid terrain height grid {info_path}: {e}")
+            return None
+
     def _get_terrain_mesh(self):
-        """Get terrain mesh for height sampling"""
+        """Get terrain mesh for height sampling, joining the tiles of a tiled terrain"""
         try:
+            tiles = self._get_terrain_tiles()
+            if tiles is not None:
+                tile_meshes = []
+                for tile in tiles['tiles']:
+                    tile_path = self.models_path / "ground" / tile['mesh']
+                    if not tile_path.exists():
+                        raise FileNotFoundError(f"Terrain tile not found at: {tile_path}")
+                    tile_meshes.append(mesh.Mesh.from_file(str(tile_path)).data)
+                return mesh.Mesh(np.concatenate(tile_meshes))
+
             mesh_path = self.models_path / "ground/mesh/terrain.stl"
             if not mesh_path.exists():
                 raise FileNotFoundError(f"Terrain mesh not found at: {mesh_path}")
@@ -96,87 +253,184 @@ class WorldPopulator:
             print(f"Error loading terrain mesh: {e}")
             sys.exit(1)
 
-    def _get_random_variant(self, category):
-        """Get random variant with weighted probabilities"""
-        variants = self.model_variants.get(category, [])
-        if not variants:
+    def _get_terrain_includes(self):
+        """(uri, name, pose) of the terrain models to include in the world"""
+        tiles = self._get_terrain_tiles()
+        if tiles is None:
             return None
-            
-        weights = [1.0] * len(variants)  # Equal weights by default
-        return np.random.choice(variants, p=np.array(weights)/sum(weights))
+        return [(tile['uri'], f"terrain_{tile['name']}", (0, 0, 0)) for tile in tiles['tiles']]
+
+    def load_terrain(self, reload=False):
+        """Load the height sampler and bounds of the terrain, once per populator
+
+        Prefers the heightmap, then the memory-mapped height grid sidecar,
+        and parses the STL only when neither is available. Later worlds
+        reuse the loaded terrain unless reload is set.
+        """
+        if self.terrain_sampler is not None and not reload:
+            return
+
+        heightmap = self._get_terrain_heightmap()
+        if heightmap is not None:
+            self.terrain_sampler = self._get_heightmap_sampler(heightmap)
+            self.terrain_info = TerrainInfo.from_sampler(self.terrain_sampler)
+            return
+
+        self.terrain_sampler = self._get_terrain_sidecar()
+        if self.terrain_sampler is not None:
+            self.terrain_info = self._get_terrain_info()
+        else:
+            terrain_mesh = self._get_terrain_mesh()
+            self.terrain_sampler = TerrainSampler.from_mesh(terrain_mesh)
+            self.terrain_info = self._get_terrain_info(terrain_mesh)
+
+    def _get_terrain_info(self, terrain_mesh=None):
+        """Load cached terrain bounds next to the mesh, or compute and cache them
+
+        Without terrain_mesh the bounds are computed from the height sampler.
+        """
+        mesh_path = self._get_terrain_source()
+        info_path = self.models_path / "ground/mesh" / TerrainInfo.FILENAME
+
+        if info_path.exists() and info_path.stat().st_mtime >= mesh_path.stat().st_mtime:
+            try:
+                return TerrainInfo.load(info_path)
+            except (ValueError, KeyError, TypeError) as e:
+                print(f"Warning: Ignoring invalid terrain info {info_path}: {e}")
+
+        if terrain_mesh is None:
+            terrain_info = TerrainInfo.from_sampler(self.terrain_sampler)
+        else:
+            terrain_info = TerrainInfo.from_mesh(terrain_mesh, self.terrain_sampler)
+        try:
+            terrain_info.save(info_path)
+        except OSError as e:
+            print(f"Warning: Could not cache terrain info: {e}")
+        return terrain_info
+
+    @staticmethod
+    def _split_density(density_config):
+        """Split a density config into counts and variant weights per category
+
+        A category maps to a model count, or to {"count": n, "variants":
+        {variant_name: weight}}. Variants without a weight get 1.
+        """
+        counts = {}
+        variant_weights = {}
+        for category, value in density_config.items():
+            if isinstance(value, dict):
+                counts[category] = value.get('count', 0)
+                variant_weights[category] = value.get('variants') or {}
+            else:
+                counts[category] = value
+        return counts, variant_weights
+
+    def _get_variant_probabilities(self, category, variant_weights=None):
+        """Probability of each variant of a category, in model_variants order"""
+        variants = self.model_variants.get(category, [])
+        weights = np.ones(len(variants))
+        for name, weight in (variant_weights or {}).items():
+            if name in variants:
+                weights[variants.index(name)] = weight
+            else:
+                print(f"Warning: Unknown {category} variant in weights: {name}")
+        if (weights < 0).any() or weights.sum() <= 0:
+            raise ValueError(f"Invalid variant weights for {category}: {variant_weights}")
+        return weights / weights.sum()
+
+    def _sample_instances(self, category, count, variant_weights=None):
+        """Draw variants, scales and rotations of count models in one batch
+
+        Returns a WorldWriter.INSTANCE_DTYPE array with the pose position
+        left at zero.
+        """
+        rng = self._rng(category)
+        probabilities = self._get_variant_probabilities(category, variant_weights)
+
+        instances = np.zeros(count, dtype=WorldWriter.INSTANCE_DTYPE)
+        instances['variant'] = rng.choice(len(probabilities), size=count, p=probabilities)
+        instances['scale'] = rng.uniform(*self.SCALE_RANGES[category], size=count)
+        tilt = self.TILT_RANGES.get(category)
+        if tilt:
+            # Roll and pitch share one tilt angle
+            instances['roll'] = rng.uniform(-tilt, tilt, size=count)
+            instances['pitch'] = instances['roll']
+        instances['yaw'] = rng.uniform(0, 2 * np.pi, size=count)
+        return instances
 
     def _check_distance_to_placed(self, x, y, category):
         """Check if position is far enough from placed models"""
         min_distance = self.MIN_DISTANCES.get(category, 1.0)
-        
+
         # Check distance to same category
-        for px, py, _ in self.placed_models[category]:
-            if np.sqrt((x - px)**2 + (y - py)**2) < min_distance:
+        if self.spatial_index[category].any_within(x, y, min_distance):
+            return False
+
+        # Trees keep clear of rocks and sand, bushes of sand
+        for other_category in self.EXCLUSIONS.get(category, []):
+            if self.spatial_index[other_category].any_within(
+                    x, y, self.MIN_DISTANCES[other_category]):
                 return False
-        
-        # Special checks for certain categories
-        if category == 'tree':
-            # Trees should be far from rocks and sand
-            for other_category in ['rock', 'sand']:
-                for px, py, _ in self.placed_models[other_category]:
-                    if np.sqrt((x - px)**2 + (y - py)**2) < self.MIN_DISTANCES[other_category]:
-                        return False
-        
-        elif category == 'bush':
-            # Bushes should maintain some distance from sand
-            for px, py, _ in self.placed_models['sand']:
-                if np.sqrt((x - px)**2 + (y - py)**2) < self.MIN_DISTANCES['sand']:
-                    return False
-                    
+
         return True
 
+    def _reset_placements(self):
+        """Forget all placed models"""
+        for category in self.placed_models:
+            self.placed_models[category] = []
+            self.spatial_index[category].clear()
+
+    def _record_placement(self, category, x, y, z):
+        """Register a placed model for later distance checks"""
+        self.placed_models[category].append((x, y, z))
+        self.spatial_index[category].insert(x, y)
+
     def _is_edge_position(self, x, y, min_x, max_x, min_y, max_y, edge_width=5.0):
         """Determine if a position is in the edge zone"""
         return (x < min_x + edge_width or x > max_x - edge_width or
                 y < min_y + edge_width or y > max_y - edge_width)
 
-    def _get_random_position(self, terrain_mesh, category, margin=2.0):
+    def _get_random_position(self, terrain_info, category, margin=2.0):
         """Get random position with improved variant distribution including sand"""
-        bounds = terrain_mesh.vectors.reshape(-1, 3)
-        min_x, max_x = np.min(bounds[:, 0]) + margin, np.max(bounds[:, 0]) - margin
-        min_y, max_y = np.min(bounds[:, 1]) + margin, np.max(bounds[:, 1]) - margin
+        min_x, max_x, min_y, max_y = terrain_info.placement_bounds(margin)
+        rng = self._rng(category)
 
         max_attempts = 50
-        edge_width = 5.0
         
         for _ in range(max_attempts):
-            is_edge = np.random.random() < self.ZONE_WEIGHTS[category]['edge']
+            is_edge = rng.random() < self.ZONE_WEIGHTS[category]['edge']
             
             if category == 'sand':
                 if is_edge:
-                    edge = np.random.choice(['top', 'bottom', 'left', 'right'])
+                    edge = rng.choice(['top', 'bottom', 'left', 'right'])
                     if edge in ['top', 'bottom']:
-                        x = np.random.uniform(min_x + margin, max_x - margin)
+                        x = rng.uniform(min_x + margin, max_x - margin)
                         y = max_y - margin if edge == 'top' else min_y + margin
-                        y += np.random.uniform(-1, 1)
+                        y += rng.uniform(-1, 1)
                     else:
                         x = max_x - margin if edge == 'right' else min_x + margin
-                        x += np.random.uniform(-1, 1)
-                        y = np.random.uniform(min_y + margin, max_y - margin)
+                        x += rng.uniform(-1, 1)
+                        y = rng.uniform(min_y + margin, max_y - margin)
                 else:
-                    x = np.random.uniform(min_x + margin, max_x - margin)
-                    y = np.random.uniform(min_y + margin, max_y - margin)
+                    x = rng.uniform(min_x + margin, max_x - margin)
+                    y = rng.uniform(min_y + margin, max_y - margin)
                 
             elif category == 'tree':
-                if self.placed_models['tree'] and np.random.random() < 0.7:
-                    base_tree = np.random.choice(self.placed_models['tree'])
-                    radius = np.random.uniform(self.MIN_DISTANCES['tree'], 
+                if self.placed_models['tree'] and rng.random() < 0.7:
+                    trees = self.placed_models['tree']
+                    base_tree = trees[rng.integers(len(trees))]
+                    radius = rng.uniform(self.MIN_DISTANCES['tree'], 
                                             self.MIN_DISTANCES['tree'] * 2)
-                    angle = np.random.uniform(0, 2 * np.pi)
+                    angle = rng.uniform(0, 2 * np.pi)
                     x = base_tree[0] + radius * np.cos(angle)
                     y = base_tree[1] + radius * np.sin(angle)
                 else:
                     valid_position = False
                     for _ in range(10):
-                        x = np.random.uniform(min_x + margin, max_x - margin)
-                        y = np.random.uniform(min_y + margin, max_y - margin)
-                        if all(np.sqrt((x - sx)**2 + (y - sy)**2) > self.MIN_DISTANCES['sand'] * 2 
-                              for sx, sy, _ in self.placed_models['sand']):
+                        x = rng.uniform(min_x + margin, max_x - margin)
+                        y = rng.uniform(min_y + margin, max_y - margin)
+                        if not self.spatial_index['sand'].any_within(
+                                x, y, self.MIN_DISTANCES['sand'] * 2):
                             valid_position = True
                             break
                     if not valid_position:
@@ -184,177 +438,500 @@ class WorldPopulator:
                     
             elif category == 'rock':
                 if is_edge:
-                    edge = np.random.choice(['top', 'bottom', 'left', 'right'])
+                    edge = rng.choice(['top', 'bottom', 'left', 'right'])
                     if edge in ['top', 'bottom']:
-                        x = np.random.uniform(min_x + margin, max_x - margin)
+                        x = rng.uniform(min_x + margin, max_x - margin)
                         y = max_y - margin if edge == 'top' else min_y + margin
                     else:
                         x = max_x - margin if edge == 'right' else min_x + margin
-                        y = np.random.uniform(min_y + margin, max_y - margin)
+                        y = rng.uniform(min_y + margin, max_y - margin)
                 else:
-                    x = np.random.uniform(min_x + margin, max_x - margin)
-                    y = np.random.uniform(min_y + margin, max_y - margin)
+                    x = rng.uniform(min_x + margin, max_x - margin)
+                    y = rng.uniform(min_y + margin, max_y - margin)
                     
             elif category == 'bush':
-                if np.random.random() < 0.6 and self.placed_models['tree']:
-                    base_tree = np.random.choice(self.placed_models['tree'])
-                    radius = np.random.uniform(2.0, 4.0)
-                    angle = np.random.uniform(0, 2 * np.pi)
+                if rng.random() < 0.6 and self.placed_models['tree']:
+                    trees = self.placed_models['tree']
+                    base_tree = trees[rng.integers(len(trees))]
+                    radius = rng.uniform(2.0, 4.0)
+                    angle = rng.uniform(0, 2 * np.pi)
                     x = base_tree[0] + radius * np.cos(angle)
                     y = base_tree[1] + radius * np.sin(angle)
                 else:
-                    x = np.random.uniform(min_x + margin, max_x - margin)
-                    y = np.random.uniform(min_y + margin, max_y - margin)
+                    x = rng.uniform(min_x + margin, max_x - margin)
+                    y = rng.uniform(min_y + margin, max_y - margin)
             
             else:  # grass
-                x = np.random.uniform(min_x + margin, max_x - margin)
-                y = np.random.uniform(min_y + margin, max_y - margin)
+                x = rng.uniform(min_x + margin, max_x - margin)
+                y = rng.uniform(min_y + margin, max_y - margin)
 
             if (min_x <= x <= max_x and min_y <= y <= max_y and 
                 self._check_distance_to_placed(x, y, category)):
                 
-                point = np.array([x, y])
-                vectors = terrain_mesh.vectors
-                distances = np.linalg.norm(vectors[:, :, :2] - point, axis=2)
-                closest_tri = vectors[np.argmin(distances.min(axis=1))]
-                z = np.mean(closest_tri[:, 2])
-
-                if category == 'sand':
-                    z += np.random.uniform(-0.2, 0)
-                elif category == 'grass':
-                    z += np.random.uniform(-0.05, 0.05)
-                elif category == 'rock':
-                    z += np.random.uniform(-0.1, 0.1)
-                else:
-                    z += np.random.uniform(-0.08, 0.08)
+                z = self.terrain_sampler.height(x, y)
 
-                self.placed_models[category].append((x, y, z))
+                z += rng.uniform(*self.Z_JITTER[category])
+
+                self._record_placement(category, x, y, z)
                 return x, y, z
 
-        # Fallback position
-        x = np.random.uniform(min_x + margin, max_x - margin)
-        y = np.random.uniform(min_y + margin, max_y - margin)
-        z = 0
+        # Fallback position, kept on the terrain surface
+        x = rng.uniform(min_x + margin, max_x - margin)
+        y = rng.uniform(min_y + margin, max_y - margin)
+        z = self.terrain_sampler.height(x, y)
         return x, y, z
 
-    def _add_lighting(self, world):
-            """Add optimized lighting to the world"""
-            # Add sun with optimized settings
-            sun = ET.SubElement(world, 'include')
-            ET.SubElement(sun, 'uri').text = 'model://sun'
-            
-            # Add single ambient light with optimized settings
-            ambient = ET.SubElement(world, 'light', {'name': 'ambient', 'type': 'directional'})
-            ET.SubElement(ambient, 'cast_shadows').text = 'false'  # Disable shadow casting for performance
-            ET.SubElement(ambient, 'pose').text = '0 0 10 0 0 0'
-            ET.SubElement(ambient, 'diffuse').text = '0.8 0.8 0.8 1'
-            ET.SubElement(ambient, 'specular').text = '0.1 0.1 0.1 1'
-            ET.SubElement(ambient, 'direction').text = '0.1 0.1 -0.9'
-            
-            # Add single point light for additional illumination
-            point = ET.SubElement(world, 'light', {
-                'name': 'point_light',
-                'type': 'point'
-            })
-            ET.SubElement(point, 'cast_shadows').text = 'false'
-            ET.SubElement(point, 'pose').text = '0 0 10 0 0 0'
-            ET.SubElement(point, 'diffuse').text = '0.3 0.3 0.3 1'
-            ET.SubElement(point, 'specular').text = '0.05 0.05 0.05 1'
-            ET.SubElement(point, 'attenuation')
-            ET.SubElement(point, 'range').text = '30'
-
-    def create_forest_world(self, density_config):
-        """Create forest world with all variants including sand"""
-        for category in self.placed_models:
-            self.placed_models[category] = []
-            
-        world_elem = ET.Element('sdf', version="1.7")
-        world = ET.SubElement(world_elem, 'world', name='forest_world')
-        
-        self._add_lighting(world)
-        
-        # Add terrain
-        terrain = ET.SubElement(world, 'include')
-        ET.SubElement(terrain, 'uri').text = 'model://ground'
-        ET.SubElement(terrain, 'name').text = 'terrain'
-        ET.SubElement(terrain, 'pose').text = '0 0 0 0 0 0'
-
-        # Add physics
-        physics = ET.SubElement(world, 'physics')
-        physics.set('type', 'ode')
-        ET.SubElement(physics, 'real_time_update_rate').text = '1000.0'
-        ET.SubElement(physics, 'max_step_size').text = '0.001'
-        ET.SubElement(physics, 'real_time_factor').text = '1'
-        ET.SubElement(physics, 'gravity').text = '0 0 -9.8'
-
-        terrain_mesh = self._get_terrain_mesh()
+    def _get_exclusions(self, category):
+        """Placed (xy, radius) sets that a category must keep clear of"""
+        exclusions = []
+        for other_category in self.EXCLUSIONS.get(category, []):
+            placed = np.array(self.placed_models[other_category]).reshape(-1, 3)
+            exclusions.append((placed[:, :2], self.MIN_DISTANCES[other_category]))
+        return exclusions
+
+    def _finalize_positions(self, category, xy):
+        """Add terrain heights to sampled XY positions and record them as placed"""
+        rng = self._rng(category)
+        z = self.terrain_sampler.heights(xy) + rng.uniform(
+            *self.Z_JITTER[category], size=len(xy))
+
+        positions = np.column_stack([xy, z])
+        self.placed_models[category].extend(map(tuple, positions.tolist()))
+        self.spatial_index[category].insert_many(positions[:, :2])
+        return positions
+
+    def _get_poisson_positions(self, terrain_info, category, count, margin=2.0):
+        """Place all models of a category at once with Poisson-disk sampling
 
+        Honours MIN_DISTANCES and EXCLUSIONS but not ZONE_WEIGHTS or tree
+        clustering. Returns an (n, 3) array with n <= count; n is smaller
+        when the free terrain area cannot fit count models.
+        """
+        sampler = PoissonDiskSampler(
+            terrain_info.placement_bounds(margin),
+            self.MIN_DISTANCES[category],
+            exclusions=self._get_exclusions(category),
+            rng=self._rng(category)
+        )
+        return self._finalize_positions(category, sampler.sample(count))
+
+    def _get_cluster_positions(self, terrain_info, category, count, margin=2.0):
+        """Place all models of a category at once with a Thomas cluster process
+
+        Categories without CLUSTERING parameters fall back to Poisson-disk
+        sampling. Returns an (n, 3) array with n <= count.
+        """
+        params = self.CLUSTERING.get(category)
+        if params is None:
+            return self._get_poisson_positions(terrain_info, category, count, margin)
+
+        parents = None
+        if 'parents' in params:
+            parents = np.array(self.placed_models[params['parents']]).reshape(-1, 3)[:, :2]
+        sampler = ClusterProcessSampler(
+            terrain_info.placement_bounds(margin),
+            self.MIN_DISTANCES[category],
+            params['radius'],
+            cluster_share=params['share'],
+            mean_children=params.get('mean_children', 4.0),
+            parents=parents,
+            exclusions=self._get_exclusions(category),
+            rng=self._rng(category)
+        )
+        return self._finalize_positions(category, sampler.sample(count))
+
+    @staticmethod
+    def _points_near(points, bounds, halo):
+        """Points inside bounds grown by halo on every side"""
+        min_x, max_x, min_y, max_y = bounds
+        keep = ((points[:, 0] >= min_x - halo) & (points[:, 0] <= max_x + halo) &
+                (points[:, 1] >= min_y - halo) & (points[:, 1] <= max_y + halo))
+        return points[keep]
+
+    @staticmethod
+    def _bucket_by_tile(points, x_edges, y_edges):
+        """Indices of XY points grouped by the placement tile containing them, {(row, col): indices}
+
+        Points outside the tile grid go to the nearest border tile.
+        """
+        cols = np.clip(np.searchsorted(x_edges, points[:, 0], side='right') - 1,
+                       0, len(x_edges) - 2)
+        rows = np.clip(np.searchsorted(y_edges, points[:, 1], side='right') - 1,
+                       0, len(y_edges) - 2)
+        tile_ids = rows * (len(x_edges) - 1) + cols
+        order = np.argsort(tile_ids, kind='stable')
+        ids, starts = np.unique(tile_ids[order], return_index=True)
+        groups = np.split(order, starts[1:])
+        return {divmod(int(tile_id), len(x_edges) - 1): group
+                for tile_id, group in zip(ids, groups)}
+
+    def _points_near_tile(self, points, buckets, i, j, bounds, halo):
+        """Points within halo of tile (i, j), looked up in its and its 8 neighbours' buckets
+
+        The points keep their original order.
+        """
+        near = [buckets[(i + di, j + dj)] for di in (-1, 0, 1) for dj in (-1, 0, 1)
+                if (i + di, j + dj) in buckets]
+        if not near:
+            return np.empty((0, 2))
+        return self._points_near(points[np.sort(np.concatenate(near))], bounds, halo)
+
+    def _get_placement_tiles(self, terrain_info, tiles, margin=2.0):
+        """Split the placement area into a grid of (min_x, max_x, min_y, max_y) tiles
+
+        Tiles are kept at least max(MIN_DISTANCES) wide, so tiles two apart
+        never interact and a 2x2 checkerboard of phases can run in parallel.
+        Returns the tiles as (row, col, bounds) and the x and y tile edges.
+        """
+        min_x, max_x, min_y, max_y = terrain_info.placement_bounds(margin)
+        halo = max(self.MIN_DISTANCES.values())
+        rows = max(min(tiles[0], int((max_y - min_y) // halo)), 1)
+        cols = max(min(tiles[1], int((max_x - min_x) // halo)), 1)
+        if (rows, cols) != tuple(tiles):
+            print(f"Warning: Using {rows} x {cols} placement tiles, "
+                  f"tiles must be at least {halo} units wide")
+
+        x_edges = np.linspace(min_x, max_x, cols + 1)
+        y_edges = np.linspace(min_y, max_y, rows + 1)
+        placement_tiles = [(i, j, (x_edges[j], x_edges[j + 1], y_edges[i], y_edges[i + 1]))
+                           for i in range(rows) for j in range(cols)]
+        return placement_tiles, x_edges, y_edges
+
+    def _get_tiled_positions(self, terrain_info, category, count, placement, tiles,
+                             executor=None, margin=2.0):
+        """Place all models of a category tile by tile, in worker processes if given
+
+        The count is split across tiles by area. Tiles run in four
+        checkerboard phases: tiles of one phase are at least one tile apart,
+        and each sees the models placed in earlier phases within a halo of
+        max(MIN_DISTANCES) as exclusions, so no conflicts cross tile borders.
+        Placed points are bucketed by tile once, so a tile only scans its own
+        and its neighbours' buckets. Every tile draws from its own
+        tile_seed_sequence, which makes the result independent of the number
+        of workers.
+        """
+        placement_tiles, x_edges, y_edges = self._get_placement_tiles(
+            terrain_info, tiles, margin)
+        halo = max(self.MIN_DISTANCES.values())
+        radius = self.MIN_DISTANCES[category]
+        cluster = self.CLUSTERING.get(category) if placement == 'cluster' else None
+
+        areas = np.array([(b[1] - b[0]) * (b[3] - b[2]) for _, _, b in placement_tiles])
+        tile_counts = self._rng(category).multinomial(count, areas / areas.sum())
+
+        others = [(points, self._bucket_by_tile(points, x_edges, y_edges), exclusion_radius)
+                  for points, exclusion_radius in self._get_exclusions(category)]
+        parents = None
+        if cluster is not None and 'parents' in cluster:
+            parents = np.array(self.placed_models[cluster['parents']]).reshape(-1, 3)[:, :2]
+            parent_buckets = self._bucket_by_tile(parents, x_edges, y_edges)
+
+        # Models of this category placed in earlier phases, bucketed by the tile
+        # that placed them
+        placed = [np.empty((0, 2))]
+        placed_buckets = {}
+        for phase in range(4):
+            jobs = []
+            job_tiles = []
+            same = np.vstack(placed)
+            for index, (i, j, bounds) in enumerate(placement_tiles):
+                if (i % 2) * 2 + j % 2 != phase or not tile_counts[index]:
+                    continue
+                exclusions = [(self._points_near_tile(points, buckets, i, j, bounds, halo),
+                               exclusion_radius)
+                              for points, buckets, exclusion_radius in others]
+                exclusions.append((self._points_near_tile(same, placed_buckets, i, j, bounds,
+                                                          halo), radius))
+                tile_cluster = None
+                if cluster is not None:
+                    tile_cluster = dict(cluster)
+                    if parents is not None:
+                        tile_cluster['parents'] = self._points_near_tile(
+                            parents, parent_buckets, i, j, bounds, halo)
+                jobs.append((bounds, radius, int(tile_counts[index]),
+                             self.tile_seed_sequence(category, index), exclusions, tile_cluster))
+                job_tiles.append((i, j))
+
+            if executor is not None:
+                results = list(executor.map(_place_tile, *zip(*jobs))) if jobs else []
+            else:
+                results = [_place_tile(*job) for job in jobs]
+            offset = len(same)
+            for tile, result in zip(job_tiles, results):
+                placed_buckets[tile] = np.arange(offset, offset + len(result))
+                offset += len(result)
+            placed.extend(results)
+
+        return self._finalize_positions(category, np.vstack(placed))
+
+    def _get_density_sampler(self, terrain_info, category, raster=None, margin=2.0):
+        """Density sampler from a GeoTIFF path, an array, or the built-in zone weights"""
+        bounds = (terrain_info.min_x, terrain_info.max_x,
+                  terrain_info.min_y, terrain_info.max_y)
+
+        rng = self._rng(category)
+
+        if raster is None:
+            return DensityRasterSampler.from_zone_weights(
+                terrain_info, self.ZONE_WEIGHTS[category]['edge'], margin, rng)
+
+        if isinstance(raster, (str, Path)):
+            raster_path = Path(raster)
+            if not raster_path.is_absolute() and not raster_path.exists():
+                raster_path = self.models_path / "ground/dem" / raster_path
+            return DensityRasterSampler.from_geotiff(raster_path, bounds, rng)
+
+        return DensityRasterSampler(raster, bounds, rng)
+
+    def _get_density_positions(self, terrain_info, category, count, raster=None,
+                               margin=2.0, max_rounds=50):
+        """Place all models of a category by sampling a density raster
+
+        The raster cells of all models are drawn up front. Each round puts a
+        point in every cell still owed one and drops the points that violate
+        MIN_DISTANCES or EXCLUSIONS; those are redrawn in a cell of the same
+        density level. This keeps every level, e.g. the edge and center
+        zones, on its share instead of drifting to where fewer points are
+        rejected. Levels still full after max_rounds leave a shortfall.
+        """
+        bounds = terrain_info.placement_bounds(margin)
+        sampler = self._get_density_sampler(terrain_info, category, raster, margin)
+        sampler.clip(bounds)
+        thinning = PoissonDiskSampler(
+            bounds,
+            self.MIN_DISTANCES[category],
+            exclusions=self._get_exclusions(category),
+            rng=self._rng(category)
+        )
+
+        xy = np.empty((0, 2))
+        cells = sampler.sample_cells(count)
+        for _ in range(max_rounds):
+            if not len(cells):
+                break
+            candidates = sampler.sample_in_cells(cells)
+            keep = thinning.accept_mask(candidates, xy)
+            xy = np.vstack([xy, candidates[keep]])
+            cells = sampler.redraw_cells(cells[~keep])
+
+        return self._finalize_positions(category, xy)
+
+    def create_forest_world(self, density_config, placement='rejection', density_rasters=None,
+                            position_decimals=3, angle_decimals=3, compress=False, seed=None,
+                            placement_tiles=None, workers=1, output_path=None, write=True):
+        """Create forest world with all variants including sand
+
+        density_config maps categories to model counts, or to {"count": n,
+        "variants": {variant_name: weight}} to weight the variant choice.
+        Variants, scales and rotations of a category are drawn in one batch.
+
+        placement selects how positions are drawn: 'rejection' samples each
+        model individually with zone weights and clustering, 'poisson' draws
+        all models of a category in one batched Poisson-disk pass, and
+        'density' draws them in bulk from per-category density rasters.
+        'cluster' draws trees and bushes from a batched cluster process
+        (see CLUSTERING) and the other categories like 'poisson'.
+        density_rasters maps categories to a GeoTIFF (aligned with the DEM,
+        relative paths resolve in models/ground/dem) or a 2D array;
+        categories without one use a raster built from ZONE_WEIGHTS.
+
+        The world is streamed to disk category by category, with poses rounded
+        to position_decimals and angle_decimals; compress writes a .world.gz.
+
+        seed makes the world reproducible; without it fresh entropy is drawn
+        and printed so the run can be repeated.
+
+        placement_tiles=(rows, cols) places each category tile by tile with
+        the 'poisson' or 'cluster' mode, across workers processes. The world
+        is the same for any number of workers.
+
+        The world is written to output_path, worlds/forest_world.world by
+        default. With write=False no file is written and None is returned;
+        the placements are kept in placed_instances either way, as arrays
+        of WorldWriter.INSTANCE_DTYPE per category.
+        """
+        if placement not in self.PLACEMENT_MODES:
+            raise ValueError(f"Unknown placement mode: {placement}")
+        if placement_tiles and placement not in self.TILED_PLACEMENT_MODES:
+            raise ValueError(f"Tiled placement is not supported with {placement} placement")
+
+        counts, variant_weights = self._split_density(density_config)
+        self._reset_placements()
+        self.placed_instances = {}
+        entropy = self.seed(seed)
+        print(f"Random seed: {entropy}")
+
+        self.load_terrain()
+
+        output_path = Path(output_path or self.worlds_path / "forest_world.world")
+        if compress and output_path.suffix != '.gz':
+            output_path = output_path.with_name(output_path.name + '.gz')
         # Process categories in specific order
         category_order = ['sand', 'rock', 'tree', 'bush', 'grass']
-        
-        for category in category_order:
-            if category in density_config and category in self.model_variants:
-                count = density_config[category]
-                print(f"\nAdding {count} {category} models...")
-                
-                for i in range(count):
-                    try:
-                        variant = self._get_random_variant(category)
-                        if not variant:
-                            continue
-                            
-                        x, y, z = self._get_random_position(terrain_mesh, category)
-                        
-                        # Scale and rotation based on category
-                        scale = np.random.uniform(*self.SCALE_RANGES[category])
-                        
-                        # Category-specific rotations
-                        if category == 'sand':
-                            # Sand dunes should be mostly level
-                            roll = pitch = 0
-                            yaw = np.random.uniform(0, 2 * np.pi)
-                        elif category == 'tree':
-                            # Slight random tilt for trees
-                            roll = pitch = np.random.uniform(-0.05, 0.05)
-                            yaw = np.random.uniform(0, 2 * np.pi)
-                        elif category == 'rock':
-                            # More varied rotation for rocks
-                            roll = pitch = np.random.uniform(-0.15, 0.15)
-                            yaw = np.random.uniform(0, 2 * np.pi)
-                        else:  # bush and grass
-                            roll = pitch = 0
-                            yaw = np.random.uniform(0, 2 * np.pi)
-                        
-                        # Add model to world
-                        include = ET.SubElement(world, 'include')
-                        ET.SubElement(include, 'uri').text = f'model://{category}/{variant}'
-                        ET.SubElement(include, 'name').text = f'{category}_{i}'
-                        ET.SubElement(include, 'pose').text = f'{x} {y} {z} {roll} {pitch} {yaw}'
-                        ET.SubElement(include, 'scale').text = f'{scale} {scale} {scale}'
-                        
-                    except Exception as e:
-                        print(f"Warning: Failed to add {category} model: {e}")
-                        continue
 
-        # Save the world file
-        output_path = self.worlds_path / "forest_world.world"
-        tree = ET.ElementTree(world_elem)
-        
-        # Pretty print XML if available (Python 3.9+)
-        try:
-            ET.indent(tree, space="  ")
-        except AttributeError:
-            pass
-            
-        tree.write(str(output_path), encoding='utf-8', xml_declaration=True)
-        
-        print(f"\nWorld file created successfully at: {output_path}")
+        with ExitStack() as stack:
+            executor = None
+            if placement_tiles and workers > 1:
+                executor = stack.enter_context(ProcessPoolExecutor(max_workers=workers))
+            writer = None
+            if write:
+                writer = stack.enter_context(WorldWriter(
+                    output_path, position_decimals=position_decimals,
+                    angle_decimals=angle_decimals,
+                    terrain_includes=self._get_terrain_includes()))
+            for category in category_order:
+                if counts.get(category) and self.model_variants.get(category):
+                    count = counts[category]
+                    print(f"\nAdding {count} {category} models...")
+
+                    positions = None
+                    if placement_tiles:
+                        positions = self._get_tiled_positions(
+                            self.terrain_info, category, count, placement, placement_tiles,
+                            executor)
+                    elif placement == 'poisson':
+                        positions = self._get_poisson_positions(self.terrain_info, category, count)
+                    elif placement == 'cluster':
+                        positions = self._get_cluster_positions(self.terrain_info, category, count)
+                    elif placement == 'density':
+                        positions = self._get_density_positions(
+                            self.terrain_info, category, count,
+                            raster=(density_rasters or {}).get(category))
+
+                    if positions is None:
+                        positions = np.array([
+                            self._get_random_position(self.terrain_info, category)
+                            for _ in range(count)
+                        ]).reshape(-1, 3)
+                    elif len(positions) < count:
+                        print(f"Warning: Only {len(positions)} of {count} {category} "
+                              f"models fit on the terrain")
+
+                    instances = self._sample_instances(category, len(positions),
+                                                       variant_weights.get(category))
+                    instances['x'] = positions[:, 0]
+                    instances['y'] = positions[:, 1]
+                    instances['z'] = positions[:, 2]
+                    self.placed_instances[category] = instances
+                    if writer is not None:
+                        writer.add_instances(category, self.model_variants[category], instances)
+
+        if write:
+            print(f"\nWorld file created successfully at: {output_path}")
+        # Counted from the written instances, which include rejection fallbacks
         print(f"Models placed:")
         for category in category_order:
-            if category in self.placed_models:
-                print(f"  - {category}: {len(self.placed_models[category])}")
+            print(f"  - {category}: {len(self.placed_instances.get(category, ()))}")
         
-        return output_path
+        return output_path if write else None
+
+    @staticmethod
+    def _perturb_density(density_config, jitter, rng):
+        """Scale each category count by a random factor in [1 - jitter, 1 + jitter]"""
+        perturbed = {}
+        for category, value in density_config.items():
+            count = value.get('count', 0) if isinstance(value, dict) else value
+            count = int(round(count * rng.uniform(1.0 - jitter, 1.0 + jitter)))
+            perturbed[category] = dict(value, count=count) if isinstance(value, dict) else count
+        return perturbed
+
+    def create_forest_worlds(self, count, density_config, output_pattern="forest_world_{index:04d}.world",
+                             density_jitter=0.0, seed=None, workers=1, manifest_path=None,
+                             **world_options):
+        """Create a batch of forest worlds for dataset production
+
+        The terrain and variant catalog are loaded once per process and
+        reused by all its worlds, which are generated across workers
+        processes. output_pattern
+        is formatted with the world index and seed; relative patterns resolve
+        in the worlds directory. Every world gets its own seed and, with
+        density_jitter, its category counts scaled by up to +-density_jitter.
+        Both are drawn from seed, and recorded in a JSON manifest
+        (worlds/batch_manifest.json by default) so any world can be rebuilt
+        alone with create_forest_world. world_options are passed on to
+        create_forest_world.
+
+        Returns the manifest path.
+        """
+        if count < 1:
+            raise ValueError("World count must be at least 1")
+        if not 0.0 <= density_jitter < 1.0:
+            raise ValueError("Density jitter must be in [0, 1)")
+
+        seed_sequence = np.random.SeedSequence(seed)
+        print(f"Batch random seed: {seed_sequence.entropy}")
+        rng = np.random.default_rng(seed_sequence)
+        world_seeds = [int(s) for s in rng.integers(0, 2**63, size=count, dtype=np.int64)]
+
+        jobs = []
+        for index, world_seed in enumerate(world_seeds):
+            output_path = Path(output_pattern.format(index=index, seed=world_seed))
+            if not output_path.is_absolute():
+                output_path = self.worlds_path / output_path
+            if world_options.get('compress') and output_path.suffix != '.gz':
+                output_path = output_path.with_name(output_path.name + '.gz')
+            density = density_config
+            if density_jitter:
+                density = self._perturb_density(density_config, density_jitter, rng)
+            jobs.append({'index': index, 'seed': world_seed, 'density': density,
+                         'path': output_path})
+
+        if len({job['path'] for job in jobs}) < count:
+            raise ValueError(f"Output pattern {output_pattern!r} does not give unique paths; "
+                             f"include {{index}} or {{seed}}")
+        for job in jobs:
+            job['path'].parent.mkdir(parents=True, exist_ok=True)
+
+        self.load_terrain()
+        # Worlds are the unit of parallelism, tiles inside them run serially
+        world_options = dict(world_options, workers=1)
+
+        print(f"\nGenerating {count} worlds with {workers} workers...")
+        results = []
+        if workers <= 1:
+            for job in jobs:
+                # The per-world log is discarded, the manifest records the counts
+                with redirect_stdout(io.StringIO()):
+                    world = generate_world(self, job['density'], job['seed'], job['path'],
+                                           world_options)
+                results.append(self._batch_entry(job, world))
+                self._print_batch_progress(len(results), count, results[-1])
+        else:
+            with ProcessPoolExecutor(max_workers=workers, initializer=init_world_worker,
+                                     initargs=(self.base_path,)) as pool:
+                futures = {pool.submit(generate_world, None, job['density'], job['seed'],
+                                       job['path'], world_options): job
+                           for job in jobs}
+                for future in as_completed(futures):
+                    results.append(self._batch_entry(futures[future], future.result()))
+                    self._print_batch_progress(len(results), count, results[-1])
+        results.sort(key=lambda result: result['index'])
+
+        manifest_path = Path(manifest_path or self.worlds_path / "batch_manifest.json")
+        manifest = {
+            'seed': seed_sequence.entropy,
+            'count': count,
+            'density': density_config,
+            'density_jitter': density_jitter,
+            'options': {key: value for key, value in world_options.items()
+                        if key not in ('workers', 'density_rasters')},
+            'worlds': results
+        }
+        with open(manifest_path, 'w') as f:
+            json.dump(manifest, f, indent=2)
+        print(f"\nBatch manifest written to: {manifest_path}")
+        return manifest_path
+
+    @staticmethod
+    def _batch_entry(job, world):
+        """Manifest entry of one generated batch world"""
+        return {'index': job['index'], 'path': world['path'], 'seed': world['seed'],
+                'density': job['density'], 'placed': world['placed']}
+
+    @staticmethod
+    def _print_batch_progress(done, count, result):
+        placed = sum(result['placed'].values())
+        print(f"  [{done}/{count}] {result['path']} ({placed} models)")
 
     def get_model_statistics(self):
         """Get statistics about placed models"""
@@ -370,3 +947,70 @@ class WorldPopulator:
             }
         }
         return stats
+
+def _place_tile(bounds, radius, count, seed_sequence, exclusions, cluster=None):
+    """Sample the XY positions of one placement tile
+
+    Runs in pool workers: the tile draws from its own seed sequence and
+    only sees the exclusion points near it. cluster holds CLUSTERING
+    parameters (with the parent points near the tile) for the cluster
+    process, otherwise Poisson-disk sampling is used.
+    """
+    rng = np.random.default_rng(seed_sequence)
+    if cluster is None:
+        sampler = PoissonDiskSampler(bounds, radius, exclusions=exclusions, rng=rng)
+    else:
+        sampler = ClusterProcessSampler(
+            bounds, radius, cluster['radius'],
+            cluster_share=cluster['share'],
+            mean_children=cluster.get('mean_children', 4.0),
+            parents=cluster.get('parents'),
+            exclusions=exclusions,
+            rng=rng
+        )
+    return sampler.sample(count)
+
+
+# Populator of a world pool worker, built by init_world_worker
+_worker_populator = None
+
+
+def init_world_worker(base_path):
+    """Pool initializer for batch and service workers
+
+    Builds the worker's own populator for generate_world and loads the
+    terrain there, so the height grid is memory-mapped again rather than
+    pickled into every worker. Silences this worker process's stdout, so
+    world logs neither reach nor interleave with the parent's output.
+    """
+    global _worker_populator
+    sys.stdout = open(os.devnull, 'w')
+    _worker_populator = WorldPopulator(base_path)
+    _worker_populator.load_terrain()
+
+
+def generate_world(populator, density, seed, output_path=None, world_options=None,
+                   arrays=False):
+    """Generate one world and return its seed, path and placed counts
+
+    Pool workers pass populator=None and use the one built by
+    init_world_worker. Without output_path no file is written and the path
+    is None. With arrays the placements are added per category as
+    {"variants": names, "instances": WorldWriter.INSTANCE_DTYPE array}.
+    """
+    populator = populator or _worker_populator
+    path = populator.create_forest_world(density, seed=seed, output_path=output_path,
+                                         write=output_path is not None,
+                                         **(world_options or {}))
+    world = {
+        'seed': seed,
+        'path': str(path) if path is not None else None,
+        'placed': {category: len(populator.placed_instances.get(category, ()))
+                   for category in populator.CATEGORIES}
+    }
+    if arrays:
+        world['arrays'] = {
+            category: {'variants': populator.model_variants[category], 'instances': instances}
+            for category, instances in populator.placed_instances.items()
+        }
+    return world
@@ -0,0 +1,167 @@
+#!/usr/bin/env python3
+
+import json
+import struct
+from pathlib import Path
+import numpy as np
+
+
+class MeshExporter:
+    """Write indexed triangle meshes as Wavefront OBJ, binary PLY or binary glTF (.glb)
+
+    Unlike STL, which stores three full vertices and a normal per face,
+    indexed formats store every vertex once and reference it from the
+    faces by index. Vertices, faces and, in the binary formats, smooth
+    vertex normals are written straight from their NumPy arrays.
+    """
+
+    FORMATS = ['obj', 'ply', 'glb']
+    # Formats Gazebo Classic can load as a model mesh, the others are side outputs
+    GAZEBO_FORMATS = ['obj']
+
+    # glTF constants
+    GLB_MAGIC = 0x46546C67
+    CHUNK_JSON = 0x4E4F534A
+    CHUNK_BIN = 0x004E4942
+    FLOAT = 5126
+    UNSIGNED_INT = 5125
+    ARRAY_BUFFER = 34962
+    ELEMENT_ARRAY_BUFFER = 34963
+    TRIANGLES = 4
+    # Rotates the Z-up terrain into glTF's Y-up convention
+    Z_UP_TO_Y_UP = [-0.7071067811865476, 0.0, 0.0, 0.7071067811865476]
+
+    @staticmethod
+    def vertex_normals(vertices, faces):
+        """Area-weighted unit normals of every vertex"""
+        corners = vertices[faces]
+        face_normals = np.cross(corners[:, 1] - corners[:, 0], corners[:, 2] - corners[:, 0])
+
+        normals = np.empty((len(vertices), 3))
+        for axis in range(3):
+            normals[:, axis] = sum(
+                np.bincount(faces[:, corner], weights=face_normals[:, axis],
+                            minlength=len(vertices))
+                for corner in range(3)
+            )
+
+        lengths = np.linalg.norm(normals, axis=1, keepdims=True)
+        normals /= np.where(lengths > 0, lengths, 1.0)
+        return normals
+
+    @classmethod
+    def write(cls, path, vertices, faces):
+        """Write a mesh in the format given by the path suffix"""
+        path = Path(path)
+        fmt = path.suffix.lstrip('.').lower()
+        if fmt == 'obj':
+            cls.write_obj(path, vertices, faces)
+        elif fmt == 'ply':
+            cls.write_ply(path, vertices, faces)
+        elif fmt == 'glb':
+            cls.write_glb(path, vertices, faces)
+        else:
+            raise ValueError(f"Unknown mesh format: {path.suffix}")
+
+    @classmethod
+    def write_obj(cls, path, vertices, faces, decimals=3, chunk_size=100000):
+        """Write a Wavefront OBJ of positions and faces
+
+        Positions keep decimals digits, millimetres by default, which is
+        far below the DEM resolution. Normals are left out, so they are
+        computed by the loader and the text stays smaller than the STL.
+        """
+        # OBJ indices are 1-based
+        indices = np.asarray(faces, dtype=np.int64) + 1
+        vertex_format = f"v %.{decimals}f %.{decimals}f %.{decimals}f\n"
+
+        with open(path, 'w') as f:
+            f.write(f"# {len(vertices)} vertices, {len(faces)} faces\n")
+            for rows, fmt in ((vertices, vertex_format), (indices, 'f %d %d %d\n')):
+                for start in range(0, len(rows), chunk_size):
+                    chunk = rows[start:start + chunk_size]
+                    f.write((fmt * len(chunk)) % tuple(chunk.ravel().tolist()))
+
+    @classmethod
+    def write_ply(cls, path, vertices, faces):
+        """Write a binary little-endian PLY with vertex normals"""
+        vertex_data = np.empty(len(vertices), dtype=[('position', '<f4', 3),
+                                                     ('normal', '<f4', 3)])
+        vertex_data['position'] = vertices
+        vertex_data['normal'] = cls.vertex_normals(vertices, faces)
+
+        face_data = np.empty(len(faces), dtype=[('count', 'u1'), ('indices', '<i4', 3)])
+        face_data['count'] = 3
+        face_data['indices'] = faces
+
+        header = (
+            "ply\n"
+            "format binary_little_endian 1.0\n"
+            f"element vertex {len(vertices)}\n"
+            "property float x\n"
+            "property float y\n"
+            "property float z\n"
+            "property float nx\n"
+            "property float ny\n"
+            "property float nz\n"
+            f"element face {len(faces)}\n"
+            "property list uchar int vertex_indices\n"
+            "end_header\n"
+        )
+        with open(path, 'wb') as f:
+            f.write(header.encode('ascii'))
+            vertex_data.tofile(f)
+            face_data.tofile(f)
+
+    @classmethod
+    def write_glb(cls, path, vertices, faces):
+        """Write a single-mesh binary glTF 2.0 file with vertex normals"""
+        positions = np.ascontiguousarray(vertices, dtype='<f4')
+        normals = cls.vertex_normals(vertices, faces).astype('<f4')
+        indices = np.ascontiguousarray(faces, dtype='<u4')
+        views = [positions, normals, indices]
+
+        # Buffer views laid out back to back, each 4-byte aligned
+        offsets = np.cumsum([0] + [view.nbytes for view in views])
+        gltf = {
+            'asset': {'version': '2.0', 'generator': 'Forest3D TerrainGenerator'},
+            'scene': 0,
+            'scenes': [{'nodes': [0]}],
+            'nodes': [{'mesh': 0, 'rotation': cls.Z_UP_TO_Y_UP}],
+            'meshes': [{'primitives': [{
+                'attributes': {'POSITION': 0, 'NORMAL': 1},
+                'indices': 2,
+                'mode': cls.TRIANGLES
+            }]}],
+            'accessors': [
+                {'bufferView': 0, 'componentType': cls.FLOAT, 'count': len(positions),
+                 'type': 'VEC3', 'min': positions.min(axis=0).tolist(),
+                 'max': positions.max(axis=0).tolist()},
+                {'bufferView': 1, 'componentType': cls.FLOAT, 'count': len(normals),
+                 'type': 'VEC3'},
+                {'bufferView': 2, 'componentType': cls.UNSIGNED_INT, 'count': indices.size,
+                 'type': 'SCALAR'}
+            ],
+            'bufferViews': [
+                {'buffer': 0, 'byteOffset': int(offsets[i]), 'byteLength': view.nbytes,
+                 'target': cls.ELEMENT_ARRAY_BUFFER if i == 2 else cls.ARRAY_BUFFER}
+                for i, view in enumerate(views)
+            ],
+            'buffers': [{'byteLength': int(offsets[-1])}]
+        }
+
+        # Chunks are padded to 4 bytes, JSON with spaces and BIN with zeros
+        json_chunk = json.dumps(gltf, separators=(',', ':')).encode('utf-8')
+        json_chunk += b' ' * (-len(json_chunk) % 4)
+        bin_length = int(offsets[-1])
+        bin_padding = -bin_length % 4
+        total_length = 12 + 8 + len(json_chunk) + 8 + bin_length + bin_padding
+
+        with open(path, 'wb') as f:
+            f.write(struct.pack('<III', cls.GLB_MAGIC, 2, total_length))
+            f.write(struct.pack('<II', len(json_chunk), cls.CHUNK_JSON))
+            f.write(json_chunk)
+            f.write(struct.pack('<II', bin_length + bin_padding, cls.CHUNK_BIN))
+            for view in views:
+                view.tofile(f)
+            f.write(b'\0' * bin_padding)
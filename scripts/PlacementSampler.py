@@ -0,0 +1,333 @@
+#!/usr/bin/env python3
+
+import numpy as np
+from scipy.spatial import cKDTree
+
+
+class PoissonDiskSampler:
+    """Batched Bridson-style Poisson-disk sampling inside a rectangle
+
+    Produces points at least radius apart that also keep clear of fixed
+    exclusion point sets (e.g. already placed models of other categories).
+    Sampling starts with batches of uniform darts, which spreads small
+    counts over the whole area, and switches to Bridson annulus growth
+    around accepted points once darts stop fitting, which fills the
+    remaining gaps up to saturation. Every step works on candidate arrays.
+    """
+
+    def __init__(self, bounds, radius, exclusions=None, rng=None, k=30,
+                 batch_size=4096):
+        self.min_x, self.max_x, self.min_y, self.max_y = bounds
+        if self.max_x <= self.min_x or self.max_y <= self.min_y:
+            raise ValueError(f"Empty sampling bounds: {bounds}")
+        if radius <= 0:
+            raise ValueError(f"Radius must be positive, got {radius}")
+
+        self.radius = float(radius)
+        self.rng = rng if rng is not None else np.random
+        self.k = k
+        self.batch_size = batch_size
+
+        # (KD-tree, exclusion radius) per non-empty exclusion set
+        self.exclusions = []
+        for points, exclusion_radius in exclusions or []:
+            points = np.asarray(points, dtype=np.float64).reshape(-1, 2)
+            if len(points):
+                self.exclusions.append((cKDTree(points), float(exclusion_radius)))
+
+    def _uniform(self, size):
+        """Uniform candidates over the sampling rectangle"""
+        x = self.rng.uniform(self.min_x, self.max_x, size)
+        y = self.rng.uniform(self.min_y, self.max_y, size)
+        return np.column_stack([x, y])
+
+    def _annulus(self, centers):
+        """k candidates per center in the annulus [radius, 2 * radius)"""
+        centers = np.repeat(centers, self.k, axis=0)
+        # Area-uniform radius within the annulus
+        r = self.radius * np.sqrt(self.rng.uniform(1.0, 4.0, len(centers)))
+        angle = self.rng.uniform(0, 2 * np.pi, len(centers))
+        return centers + np.column_stack([r * np.cos(angle), r * np.sin(angle)])
+
+    def accept_mask(self, candidates, accepted=None):
+        """Boolean mask of the candidates that can be added to accepted points"""
+        keep = ((candidates[:, 0] >= self.min_x) & (candidates[:, 0] <= self.max_x) &
+                (candidates[:, 1] >= self.min_y) & (candidates[:, 1] <= self.max_y))
+
+        for tree, exclusion_radius in self.exclusions:
+            index = np.flatnonzero(keep)
+            if not len(index):
+                break
+            distance, _ = tree.query(candidates[index], distance_upper_bound=exclusion_radius)
+            keep[index[distance < exclusion_radius]] = False
+
+        index = np.flatnonzero(keep)
+        if accepted is not None and len(accepted) and len(index):
+            distance, _ = cKDTree(accepted).query(candidates[index],
+                                                  distance_upper_bound=self.radius)
+            keep[index[distance < self.radius]] = False
+
+        # Resolve conflicts inside the batch: the later point of each close pair loses
+        index = np.flatnonzero(keep)
+        if len(index) > 1:
+            pairs = cKDTree(candidates[index]).query_pairs(self.radius, output_type='ndarray')
+            keep[index[pairs.max(axis=1)]] = False
+
+        return keep
+
+    def filter(self, candidates, accepted=None, limit=None):
+        """Return the subset of candidates that can be added to accepted points"""
+        return candidates[self.accept_mask(candidates, accepted)][:limit]
+
+    def sample(self, count, max_dart_rounds=100, min_acceptance=0.05):
+        """Draw up to count points; fewer are returned if the area saturates"""
+        accepted = np.empty((0, 2))
+        if count <= 0:
+            return accepted
+
+        # Phase 1: uniform darts while they still fit reasonably often
+        for _ in range(max_dart_rounds):
+            remaining = count - len(accepted)
+            if remaining <= 0:
+                return accepted
+            candidates = self._uniform(min(max(64, 2 * remaining), self.batch_size * self.k))
+            new = self.filter(candidates, accepted, remaining)
+            accepted = np.vstack([accepted, new])
+            if len(new) < min_acceptance * len(candidates):
+                break
+
+        # Phase 2: Bridson growth, each active point gets k annulus candidates once
+        active = accepted if len(accepted) else self._uniform(1)
+        while len(active) and len(accepted) < count:
+            batch, active = active[:self.batch_size], active[self.batch_size:]
+            new = self.filter(self._annulus(batch), accepted, count - len(accepted))
+            accepted = np.vstack([accepted, new])
+            active = np.vstack([active, new])
+
+        return accepted
+
+
+class DensityRasterSampler:
+    """Draw points with probability proportional to a density raster
+
+    density[row, col] covers the cell
+    [min_x + col * cell_w, min_x + (col + 1) * cell_w) x
+    [min_y + row * cell_h, min_y + (row + 1) * cell_h), i.e. rows run along
+    +y like the DEM rows in the terrain mesh. Cells are picked with a
+    vectorized inverse CDF and points are spread uniformly inside them.
+    Cells of equal density form a level, e.g. the edge or center zone of
+    from_zone_weights, and redraw_cells moves points within their level.
+    """
+
+    def __init__(self, density, bounds, rng=None):
+        density = np.nan_to_num(np.asarray(density, dtype=np.float64), nan=0.0)
+        if density.ndim != 2:
+            raise ValueError(f"Density raster must be 2D, got shape {density.shape}")
+        if (density < 0).any() or not np.isfinite(density).all():
+            raise ValueError("Density raster must be finite and non-negative")
+
+        if not (density > 0).any():
+            raise ValueError("Density raster has no positive cells")
+
+        self.density = density
+        self._set_weights(density)
+        self.min_x, self.max_x, self.min_y, self.max_y = bounds
+        self.rng = rng if rng is not None else np.random
+
+        rows, cols = density.shape
+        self.cell_w = (self.max_x - self.min_x) / cols
+        self.cell_h = (self.max_y - self.min_y) / rows
+        # (start, end) of every cell column and row, narrowed by clip
+        col_edges = self.min_x + np.arange(cols + 1) * self.cell_w
+        row_edges = self.min_y + np.arange(rows + 1) * self.cell_h
+        self.col_extents = np.column_stack([col_edges[:-1], col_edges[1:]])
+        self.row_extents = np.column_stack([row_edges[:-1], row_edges[1:]])
+
+    @classmethod
+    def from_geotiff(cls, path, bounds, rng=None):
+        """Load a single-band density GeoTIFF covering the same extent as the DEM"""
+        from osgeo import gdal
+
+        ds = gdal.Open(str(path))
+        if ds is None:
+            raise ValueError(f"Failed to open {path}")
+        band = ds.GetRasterBand(1)
+        density = band.ReadAsArray().astype(np.float64)
+        nodata = band.GetNoDataValue()
+        if nodata is not None:
+            density[density == nodata] = 0.0
+        return cls(density, bounds, rng)
+
+    @classmethod
+    def from_zone_weights(cls, terrain_info, edge_weight, margin=0.0, rng=None):
+        """Density raster reproducing the edge/center split of ZONE_WEIGHTS
+
+        A share edge_weight of the points falls in the edge zone and the rest
+        in the center, each uniformly distributed within its zone.
+        """
+        bounds = terrain_info.placement_bounds(margin)
+        min_x, max_x, min_y, max_y = bounds
+
+        # Fine enough to resolve the edge strip, capped at 2048 cells per side
+        width = terrain_info.edge_width
+        cell = max(width / 4, (max_x - min_x) / 2048, (max_y - min_y) / 2048)
+        cols = max(int(round((max_x - min_x) / cell)), 1)
+        rows = max(int(round((max_y - min_y) / cell)), 1)
+
+        # Zone membership of each cell center
+        x = min_x + (np.arange(cols) + 0.5) * (max_x - min_x) / cols
+        y = min_y + (np.arange(rows) + 0.5) * (max_y - min_y) / rows
+        grid_x, grid_y = np.meshgrid(x, y)
+        edge = ((grid_x < min_x + width) | (grid_x > max_x - width) |
+                (grid_y < min_y + width) | (grid_y > max_y - width))
+        center = ~edge
+
+        density = np.zeros((rows, cols))
+        if edge.any():
+            density[edge] = edge_weight / np.count_nonzero(edge)
+        if center.any():
+            density[center] = (1.0 - edge_weight) / np.count_nonzero(center)
+        return cls(density, bounds, rng)
+
+    def _set_weights(self, weights):
+        """Sampling CDF and density levels of the per-cell weights"""
+        weights = weights.ravel()
+        cdf = np.cumsum(weights)
+        self.cdf = cdf / cdf[-1]
+
+        # Cells sorted by level, with the start and size of each level's run
+        _, level = np.unique(weights, return_inverse=True)
+        self.level = level.ravel()
+        self.level_cells = np.argsort(self.level, kind='stable')
+        self.level_size = np.bincount(self.level)
+        self.level_start = np.cumsum(self.level_size) - self.level_size
+
+    def clip(self, bounds):
+        """Restrict sampling to bounds, e.g. a raster covering the whole DEM to the placement area
+
+        Cells are cut to their part inside bounds and their density scaled
+        by the share of the cell that remains.
+        """
+        min_x, max_x, min_y, max_y = bounds
+        col_extents = np.clip(self.col_extents, min_x, max_x)
+        row_extents = np.clip(self.row_extents, min_y, max_y)
+        # Untouched cells keep their exact density, so their levels stay intact
+        col_share = np.where((col_extents == self.col_extents).all(axis=1), 1.0,
+                             np.diff(col_extents, axis=1)[:, 0] / self.cell_w)
+        row_share = np.where((row_extents == self.row_extents).all(axis=1), 1.0,
+                             np.diff(row_extents, axis=1)[:, 0] / self.cell_h)
+        self.col_extents, self.row_extents = col_extents, row_extents
+
+        weights = self.density * row_share[:, None] * col_share[None, :]
+        if not (weights > 0).any():
+            raise ValueError(f"Density raster has no positive cells inside {bounds}")
+        self._set_weights(weights)
+
+    def sample_cells(self, count):
+        """Draw count flat cell indices with probability proportional to density"""
+        cells = np.searchsorted(self.cdf, self.rng.uniform(0, 1, count), side='right')
+        return np.minimum(cells, len(self.cdf) - 1)
+
+    def redraw_cells(self, cells):
+        """Replace each cell by a random cell of the same density level
+
+        Points rejected in a cell are redrawn this way, so every level keeps
+        its share of the points unless the whole level is full.
+        """
+        level = self.level[cells]
+        offset = (self.rng.uniform(0, 1, len(cells)) * self.level_size[level]).astype(np.int64)
+        return self.level_cells[self.level_start[level] + offset]
+
+    def sample_in_cells(self, cells):
+        """One uniform point inside each of the given flat cells, as a (len(cells), 2) array"""
+        rows, cols = np.divmod(cells, self.density.shape[1])
+        x = self.rng.uniform(self.col_extents[cols, 0], self.col_extents[cols, 1])
+        y = self.rng.uniform(self.row_extents[rows, 0], self.row_extents[rows, 1])
+        return np.column_stack([x, y])
+
+    def sample(self, count):
+        """Draw count points as an (count, 2) array"""
+        return self.sample_in_cells(self.sample_cells(count))
+
+
+class ClusterProcessSampler:
+    """Batched Thomas or Matern cluster point process
+
+    A share cluster_share of the points are children scattered around
+    parents, the rest uniform background points. Parents are either fixed
+    (e.g. already placed trees, each child picks one at random) or drawn
+    uniformly with a Poisson number of children averaging mean_children.
+    Children are offset by an isotropic Gaussian of cluster_radius
+    (Thomas) or uniformly within a disc of cluster_radius (Matern). Each
+    round draws all candidates as arrays and thins them against radius and
+    the exclusion sets with the KD-tree filter of PoissonDiskSampler.
+    """
+
+    KERNELS = ['thomas', 'matern']
+
+    def __init__(self, bounds, radius, cluster_radius, cluster_share=1.0, mean_children=4.0,
+                 parents=None, exclusions=None, rng=None, kernel='thomas'):
+        if kernel not in self.KERNELS:
+            raise ValueError(f"Unknown cluster kernel: {kernel}")
+        if cluster_radius <= 0:
+            raise ValueError(f"Cluster radius must be positive, got {cluster_radius}")
+        if mean_children <= 0:
+            raise ValueError(f"Mean children must be positive, got {mean_children}")
+
+        self.thinning = PoissonDiskSampler(bounds, radius, exclusions=exclusions, rng=rng)
+        self.rng = self.thinning.rng
+        self.cluster_radius = float(cluster_radius)
+        self.cluster_share = float(cluster_share)
+        self.mean_children = float(mean_children)
+        self.kernel = kernel
+        self.parents = None
+        if parents is not None and len(parents):
+            self.parents = np.asarray(parents, dtype=np.float64).reshape(-1, 2)
+
+    def _offsets(self, size):
+        """Child displacements from their parents"""
+        if self.kernel == 'thomas':
+            return self.rng.normal(0.0, self.cluster_radius, (size, 2))
+        r = self.cluster_radius * np.sqrt(self.rng.uniform(0.0, 1.0, size))
+        angle = self.rng.uniform(0, 2 * np.pi, size)
+        return np.column_stack([r * np.cos(angle), r * np.sin(angle)])
+
+    def _children(self, size):
+        """About size cluster children and the index of their parent"""
+        if self.parents is not None:
+            parent = self.rng.integers(len(self.parents), size=size)
+            centers = self.parents[parent]
+        else:
+            num_parents = max(int(np.ceil(size / self.mean_children)), 1)
+            parent = np.repeat(np.arange(num_parents),
+                               self.rng.poisson(self.mean_children, num_parents))
+            centers = self.thinning._uniform(num_parents)[parent]
+        return centers + self._offsets(len(centers)), parent
+
+    def sample(self, count, oversample=2.0, max_rounds=20):
+        """Draw up to count points; fewer are returned if the area saturates"""
+        accepted = np.empty((0, 2))
+        for _ in range(max_rounds):
+            remaining = count - len(accepted)
+            if remaining <= 0:
+                break
+
+            size = int(np.ceil(oversample * remaining))
+            clustered = self.rng.binomial(size, self.cluster_share)
+            children, parent = self._children(clustered)
+            candidates = np.vstack([children, self.thinning._uniform(size - clustered)])
+
+            # Shuffle whole clusters, with every background point its own
+            # group, so truncating to the remaining count keeps clusters intact
+            num_groups = (parent.max() + 1 if len(parent) else 0) + size - clustered
+            group = np.concatenate([parent, np.arange(num_groups - (size - clustered),
+                                                      num_groups)])
+            rank = self.rng.permutation(num_groups)
+            candidates = candidates[np.argsort(rank[group], kind='stable')]
+
+            new = self.thinning.filter(candidates, accepted, remaining)
+            if not len(new):
+                break
+            accepted = np.vstack([accepted, new])
+
+        return accepted
@@ -0,0 +1,72 @@
+#!/usr/bin/env python3
+
+import math
+
+
+class SpatialHash:
+    """Incremental uniform-grid index over 2D points
+
+    Points are bucketed into square cells of side cell_size. A radius query
+    only visits the cells overlapping the query disc, so with cell_size equal
+    to the typical query radius each check touches the 3x3 neighbourhood.
+    """
+
+    def __init__(self, cell_size):
+        if cell_size <= 0:
+            raise ValueError(f"Cell size must be positive, got {cell_size}")
+        self.cell_size = float(cell_size)
+        self.cells = {}
+        self.count = 0
+        # Bulk-inserted (x, y) batches not yet bucketed into cells
+        self._pending = []
+
+    def __len__(self):
+        return self.count
+
+    def _cell(self, x, y):
+        return (math.floor(x / self.cell_size), math.floor(y / self.cell_size))
+
+    def insert(self, x, y):
+        """Add a point to the index"""
+        self.cells.setdefault(self._cell(x, y), []).append((x, y))
+        self.count += 1
+
+    def insert_many(self, points):
+        """Add an (n, 2) array of points
+
+        Bucketing is deferred to the first query, so batched placement that
+        never queries the index does not pay for it.
+        """
+        if len(points):
+            self._pending.append(points)
+            self.count += len(points)
+
+    def _bucket_pending(self):
+        pending, self._pending = self._pending, []
+        for points in pending:
+            for x, y in points.tolist():
+                self.cells.setdefault(self._cell(x, y), []).append((x, y))
+
+    def any_within(self, x, y, radius):
+        """Return True if any indexed point lies strictly closer than radius"""
+        if not self.count:
+            return False
+        if self._pending:
+            self._bucket_pending()
+
+        radius_sq = radius * radius
+        reach = max(1, math.ceil(radius / self.cell_size))
+        cx, cy = self._cell(x, y)
+
+        for i in range(cx - reach, cx + reach + 1):
+            for j in range(cy - reach, cy + reach + 1):
+                for px, py in self.cells.get((i, j), ()):
+                    if (x - px) ** 2 + (y - py) ** 2 < radius_sq:
+                        return True
+        return False
+
+    def clear(self):
+        """Remove all points"""
+        self.cells.clear()
+        self._pending = []
+        self.count = 0
@@ -0,0 +1,114 @@
+#!/usr/bin/env python3
+
+import hashlib
+import json
+import os
+import shutil
+import time
+import uuid
+from pathlib import Path
+import numpy as np
+
+
+class TerrainCache:
+    """Disk cache of derived terrain artifacts with LRU eviction
+
+    Each entry is a directory named by a key derived from the input DEM
+    checksum and the generation parameters. Entries hold copied files
+    (STL, terrain info, ...), NumPy arrays and a small JSON metadata dict.
+    When the total size exceeds max_bytes the least recently used entries
+    are deleted.
+    """
+
+    # Bump when the pipeline output changes so old entries are not reused
+    VERSION = 2
+    META_NAME = "meta.json"
+
+    def __init__(self, cache_dir, max_bytes=2 * 1024 ** 3):
+        self.cache_dir = Path(cache_dir)
+        self.max_bytes = max_bytes
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+
+    @staticmethod
+    def file_hash(path, chunk_size=1 << 20):
+        """SHA-256 of a file's content"""
+        digest = hashlib.sha256()
+        with open(path, 'rb') as f:
+            for chunk in iter(lambda: f.read(chunk_size), b''):
+                digest.update(chunk)
+        return digest.hexdigest()
+
+    def key(self, *parts):
+        """Cache key for a stage name, input checksum and parameters"""
+        payload = json.dumps([self.VERSION, *parts], sort_keys=True, default=str)
+        return hashlib.sha256(payload.encode('utf-8')).hexdigest()[:32]
+
+    def get(self, key):
+        """Return the entry directory for key, or None on a miss"""
+        entry = self.cache_dir / key
+        meta_path = entry / self.META_NAME
+        if not meta_path.exists():
+            return None
+
+        # Record the access for LRU eviction
+        meta = self.read_meta(entry)
+        meta['last_used'] = time.time()
+        self._write_meta(entry, meta)
+        return entry
+
+    def read_meta(self, entry):
+        with open(Path(entry) / self.META_NAME) as f:
+            return json.load(f)
+
+    def _write_meta(self, entry, meta):
+        tmp_path = entry / f"{self.META_NAME}.{uuid.uuid4().hex}.tmp"
+        with open(tmp_path, 'w') as f:
+            json.dump(meta, f, indent=2)
+        os.replace(tmp_path, entry / self.META_NAME)
+
+    def put(self, key, files=None, arrays=None, meta=None):
+        """Store files ({name: source path}) and arrays ({name: ndarray}) under key"""
+        entry = self.cache_dir / key
+        tmp_entry = self.cache_dir / f".{key}.{uuid.uuid4().hex}.tmp"
+        tmp_entry.mkdir(parents=True)
+
+        try:
+            for name, source in (files or {}).items():
+                shutil.copy2(source, tmp_entry / name)
+            for name, array in (arrays or {}).items():
+                np.save(tmp_entry / name, array)
+
+            now = time.time()
+            self._write_meta(tmp_entry, dict(meta or {}, created=now, last_used=now))
+
+            if entry.exists():
+                shutil.rmtree(entry)
+            os.replace(tmp_entry, entry)
+        finally:
+            if tmp_entry.exists():
+                shutil.rmtree(tmp_entry, ignore_errors=True)
+
+        self.evict()
+        return entry
+
+    def _entry_size(self, entry):
+        return sum(f.stat().st_size for f in entry.rglob('*') if f.is_file())
+
+    def evict(self):
+        """Delete least recently used entries until the cache fits max_bytes"""
+        entries = []
+        for entry in self.cache_dir.iterdir():
+            if entry.is_dir() and not entry.name.startswith('.'):
+                try:
+                    last_used = self.read_meta(entry).get('last_used', 0)
+                except (OSError, ValueError):
+                    last_used = 0
+                entries.append((last_used, self._entry_size(entry), entry))
+
+        total = sum(size for _, size, _ in entries)
+        for _, size, entry in sorted(entries, key=lambda item: item[0]):
+            if total <= self.max_bytes:
+                break
+            shutil.rmtree(entry, ignore_errors=True)
+            total -= size
+            print(f"Evicted terrain cache entry: {entry.name}")
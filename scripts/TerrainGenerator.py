@@ -3,21 +3,47 @@ import numpy as np
 from osgeo import gdal
 import os
 from stl import mesh
-from scipy.ndimage import gaussian_filter
+from scipy.ndimage import gaussian_filter, zoom
 from pathlib import Path
 import sys
 import argparse
+import json
+import shutil
+import struct
+from concurrent.futures import ProcessPoolExecutor
+from collections import deque
+from contextlib import ExitStack
+from TerrainSampler import TerrainSampler, TerrainInfo
+from TerrainCache import TerrainCache
+from AdaptiveMesher import AdaptiveMesher
+from MeshExporter import MeshExporter
 
 class TerrainGenerator:
-    def __init__(self, tif_filename: str):
+    ENHANCE_SCALE = 6.0
+    # Rough peak bytes per DEM cell while meshing a band: elevation window,
+    # float64 vertices, face indices and the 50 byte STL records
+    BAND_BYTES_PER_CELL = 256
+    # Peak bytes per cell of a smoothing window: the float32 window, the
+    # filter output and its intermediate, and the copy returned to the parent
+    SMOOTH_BYTES_PER_CELL = 16
+    # Rough peak bytes per cell of adaptive meshing: the mesher's error and
+    # split arrays on top of the band
+    ADAPTIVE_BYTES_PER_CELL = 400
+    HEIGHTMAP_IMAGE = "terrain_heightmap.png"
+    # Largest value of the 16-bit heightmap, mapped to the top of the Z range
+    HEIGHTMAP_MAX_VALUE = 65535
+
+    def __init__(self, tif_filename: str, cache: TerrainCache = None):
         self.base_path = Path(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
         self.dem_path = self.base_path / "models/ground/dem"
         self.terrain_path = self.base_path / "models/ground"
         self.mesh_path = self.terrain_path / "mesh"
+        self.tiles_path = self.terrain_path / "tiles"
         self.material_path = self.terrain_path / "material"
         self.texture_path = self.terrain_path / "texture"
         self.worlds_path = self.base_path / "worlds"
         self.tif_filename = tif_filename
+        self.cache = cache
         
         self._verify_paths()
 
@@ -43,65 +69,19 @@ class TerrainGenerator:
         if missing_files:
             raise FileNotFoundError("\n".join(missing_files))
 
-    def enhance_dem(self, scale_factor=6.0):
-        """Optional DEM enhancement"""
-        input_tiff = self.dem_path / self.tif_filename
-        output_tiff = self.dem_path / "terrain_enhanced.tif"
-        
-        try:
-            ds = gdal.Open(str(input_tiff))
-            if ds is None:
-                raise ValueError(f"Failed to open {input_tiff}")
-            
-            gdal.Warp(
-                str(output_tiff),
-                ds,
-                width=int(ds.RasterXSize * scale_factor),
-                height=int(ds.RasterYSize * scale_factor),
-                resampleAlg=gdal.GRA_CubicSpline,
-                options=['COMPRESS=LZW']
-            )
-            
-            return output_tiff
-        except Exception as e:
-            print(f"Error enhancing DEM: {e}")
-            sys.exit(1)
-
-    def create_terrain_mesh(self, scale_factor=1.0, smooth_sigma=1.0, enhance=False):
-        """Generate terrain mesh from DEM while maintaining proportions"""
-        try:
-            # Determine which DEM file to use
-            if enhance:
-                dem_file = self.enhance_dem()
-                print("Using enhanced DEM...")
-            else:
-                dem_file = self.dem_path / self.tif_filename
-                print("Using original DEM...")
-
-            # Open DEM file
-            ds = gdal.Open(str(dem_file))
-            if ds is None:
-                raise ValueError(f"Failed to open {dem_file}")
-
-            # Get geotransform information
-            geotransform = ds.GetGeoTransform()
-            pixel_width = abs(geotransform[1])  # X resolution
-            pixel_height = abs(geotransform[5])  # Y resolution
+    @staticmethod
+    def _build_mesh_arrays(elevation, pixel_width, pixel_height, scale_factor=1.0,
+                           mesher='vectorized', center=True):
+        """Build vertex and triangle index arrays for a regular elevation grid
 
-            # Read elevation data
-            elevation = ds.GetRasterBand(1).ReadAsArray().astype(np.float32)
-            
-            # Apply smoothing if requested
-            if smooth_sigma > 0:
-                elevation = gaussian_filter(elevation, sigma=smooth_sigma)
+        Vertices are centered on their mean unless center is False.
+        """
+        rows, cols = elevation.shape
 
-            # Get dimensions
-            rows, cols = elevation.shape
-            
-            # Create vertices
+        if mesher == 'loop':
             vertices = []
             faces = []
-            
+
             # Calculate real-world coordinates using geotransform
             for y in range(rows):
                 for x in range(cols):
@@ -109,7 +89,7 @@ class TerrainGenerator:
                     world_x = x * pixel_width * scale_factor
                     world_y = y * pixel_height * scale_factor
                     world_z = elevation[y, x] * scale_factor
-                    
+
                     vertices.append([world_x, world_y, world_z])
 
             # Generate faces (triangles)
@@ -121,35 +101,532 @@ class TerrainGenerator:
                     v3 = v2 + 1
                     faces.extend([[v0, v1, v2], [v1, v3, v2]])
 
-            # Create the mesh
             vertices = np.array(vertices)
             faces = np.array(faces)
-            
-            # Center the mesh
-            center = np.mean(vertices, axis=0)
-            vertices -= center
-            
-            # Create the STL mesh
-            terrain = mesh.Mesh(np.zeros(len(faces), dtype=mesh.Mesh.dtype))
+
+        elif mesher == 'vectorized':
+            # Meshgrid of world coordinates, row-major like the loop above
+            world_x = np.arange(cols, dtype=np.float64) * pixel_width * scale_factor
+            world_y = np.arange(rows, dtype=np.float64) * pixel_height * scale_factor
+            grid_x, grid_y = np.meshgrid(world_x, world_y)
+            grid_z = (elevation * scale_factor).astype(np.float64)
+            vertices = np.column_stack([grid_x.ravel(), grid_y.ravel(), grid_z.ravel()])
+
+            # Two triangles per cell, interleaved in the same order as the loop
+            index_dtype = np.int32 if rows * cols < np.iinfo(np.int32).max else np.int64
+            v0 = (np.arange(rows - 1, dtype=index_dtype)[:, None] * cols +
+                  np.arange(cols - 1, dtype=index_dtype)[None, :]).ravel()
+            v1 = v0 + 1
+            v2 = v0 + cols
+            v3 = v2 + 1
+            faces = np.empty((2 * len(v0), 3), dtype=index_dtype)
+            faces[0::2] = np.column_stack([v0, v1, v2])
+            faces[1::2] = np.column_stack([v1, v3, v2])
+
+        else:
+            raise ValueError(f"Unknown mesher: {mesher}")
+
+        # Center the mesh
+        if center:
+            vertices -= np.mean(vertices, axis=0)
+
+        return vertices, faces
+
+    @staticmethod
+    def _build_adaptive_mesh_arrays(elevation, pixel_width, pixel_height, scale_factor=1.0,
+                                    max_error=0.1, max_triangles=None, center=True):
+        """Build an error-bounded RTIN mesh of an elevation grid
+
+        max_error is the largest allowed vertical deviation from the grid in
+        output units, max_triangles an optional face budget. The mesh is
+        centered like the full grid mesh so both share terrain coordinates,
+        unless center is False. Returns (vertices, faces, achieved_error).
+        """
+        rows, cols = elevation.shape
+        adaptive = AdaptiveMesher(elevation)
+        grid_cols, grid_rows, faces, achieved_error = adaptive.mesh(
+            (max_error or 0.0) / scale_factor, max_triangles)
+        if max_triangles is not None and len(faces) > max_triangles:
+            print(f"Warning: {len(faces)} faces exceed the budget of {max_triangles}, "
+                  f"the grid border alone needs more")
+
+        vertices = np.column_stack([
+            grid_cols * pixel_width * scale_factor,
+            grid_rows * pixel_height * scale_factor,
+            elevation[grid_rows, grid_cols].astype(np.float64) * scale_factor
+        ])
+        if center:
+            vertices -= np.array([(cols - 1) / 2.0 * pixel_width,
+                                  (rows - 1) / 2.0 * pixel_height,
+                                  elevation.mean(dtype=np.float64)]) * scale_factor
+        return vertices, faces, achieved_error * scale_factor
+
+    @staticmethod
+    def _create_stl_mesh(vertices, faces, mesher='vectorized'):
+        """Create an STL mesh from vertex and face arrays"""
+        terrain = mesh.Mesh(np.zeros(len(faces), dtype=mesh.Mesh.dtype))
+        if mesher == 'loop':
             for i, f in enumerate(faces):
                 for j in range(3):
                     terrain.vectors[i][j] = vertices[f[j]]
+        else:
+            terrain.vectors[:] = vertices[faces]
+        return terrain
+
+    def _open_enhanced_dem(self, scale_factor=ENHANCE_SCALE, memory_budget=None):
+        """Upsampled view of the DEM as an in-memory warped VRT
+
+        Nothing is resampled until windows are read, so enhancement never
+        writes or holds the full-resolution raster.
+        """
+        input_tiff = self.dem_path / self.tif_filename
+        ds = gdal.Open(str(input_tiff))
+        if ds is None:
+            raise ValueError(f"Failed to open {input_tiff}")
+
+        warp_options = {}
+        if memory_budget:
+            warp_options['warpMemoryLimit'] = max(memory_budget // 4, 1 << 20)
+
+        enhanced = gdal.Warp(
+            '',
+            ds,
+            format='VRT',
+            width=int(ds.RasterXSize * scale_factor),
+            height=int(ds.RasterYSize * scale_factor),
+            resampleAlg=gdal.GRA_CubicSpline,
+            **warp_options
+        )
+        if enhanced is None:
+            raise ValueError(f"Failed to enhance {input_tiff}")
+        return enhanced
+
+    @staticmethod
+    def _pixel_size(ds):
+        """X and Y resolution from a dataset's geotransform"""
+        geotransform = ds.GetGeoTransform()
+        return abs(geotransform[1]), abs(geotransform[5])
+
+    @staticmethod
+    def _dataset_source(ds):
+        """String gdal.Open accepts to reopen ds in another process"""
+        if ds.GetDriver().ShortName == 'VRT':
+            # In-memory VRTs have no file, but GDAL opens their XML directly
+            return ds.GetMetadata('xml:VRT')[0]
+        return ds.GetDescription()
+
+    @staticmethod
+    def _iter_elevation_bands(ds, band_rows, smooth_sigma=1.0, workers=1):
+        """Yield (row_start, elevation) for consecutive row bands of a dataset
+
+        Bands overlap by one row so neighbouring band meshes share their edge
+        vertices. Each window is read with a halo covering the Gaussian
+        support, so a smoothed band equals the same rows of gaussian_filter
+        applied to the whole raster. With workers > 1 the windows are read
+        and smoothed in a process pool, keeping at most two windows per
+        worker in flight.
+        """
+        rows, cols = ds.RasterYSize, ds.RasterXSize
+        halo = _smoothing_halo(smooth_sigma)
+        band_rows = max(int(band_rows), 2)
+
+        windows = []
+        row_start = 0
+        while row_start < rows - 1 or (rows == 1 and not windows):
+            row_end = min(row_start + band_rows, rows)
+            windows.append((row_start, row_end, max(row_start - halo, 0),
+                            min(row_end + halo, rows)))
+            row_start = row_end - 1
+
+        if workers <= 1 or len(windows) == 1:
+            for row_start, row_end, read_start, read_end in windows:
+                yield row_start, _read_smoothed_window(
+                    ds, (read_start, read_end), (row_start, row_end), smooth_sigma)
+            return
+
+        source = TerrainGenerator._dataset_source(ds)
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            pending = deque()
+            for row_start, row_end, read_start, read_end in windows:
+                pending.append((row_start, executor.submit(
+                    _read_smoothed_window, source, (read_start, read_end),
+                    (row_start, row_end), smooth_sigma)))
+                if len(pending) >= 2 * workers:
+                    done_start, future = pending.popleft()
+                    yield done_start, future.result()
+            while pending:
+                done_start, future = pending.popleft()
+                yield done_start, future.result()
+
+    def _write_banded_stl(self, ds, output_path, scale_factor=1.0, smooth_sigma=1.0,
+                          memory_budget=1 << 30, mesher='vectorized', workers=1,
+                          collision_path=None, collision_error=None, heights_path=None):
+        """Mesh a dataset band by band straight into a binary STL
+
+        Band height is chosen so one band fits memory_budget. X and Y are
+        centered analytically; the Z mean is only known at the end, so it is
+        subtracted in place through a memory map of the written file. With
+        collision_path, each band is also meshed adaptively within
+        collision_error into a second STL; adaptive bands keep all their
+        border vertices, so they join without cracks. With heights_path, the
+        centered vertex heights are also written there as a .npy grid.
+        Returns (num_vertices, num_faces, num_collision_faces, min_corner,
+        max_corner, z_mean) where z_mean is the height removed by centering.
+        """
+        rows, cols = ds.RasterYSize, ds.RasterXSize
+        pixel_width, pixel_height = self._pixel_size(ds)
+        # The band being meshed plus the windows in flight share the budget
+        band_bytes = self.BAND_BYTES_PER_CELL + 2 * workers * self.SMOOTH_BYTES_PER_CELL
+        if collision_path is not None:
+            band_bytes += self.ADAPTIVE_BYTES_PER_CELL
+        band_rows = memory_budget // (cols * band_bytes)
+        num_faces = 2 * (rows - 1) * (cols - 1)
+
+        center_x = (cols - 1) * pixel_width * scale_factor / 2
+        center_y = (rows - 1) * pixel_height * scale_factor / 2
+        z_sum = 0.0
+        z_min = np.inf
+        z_max = -np.inf
+
+        num_collision_faces = 0
+        if heights_path is not None:
+            grid = np.lib.format.open_memmap(heights_path, mode='w+', dtype=np.float64,
+                                             shape=(rows, cols))
+        with ExitStack() as stack:
+            f = stack.enter_context(open(output_path, 'wb'))
+            self._write_stl_header(f, output_path.name, num_faces)
+            if collision_path is not None:
+                collision_file = stack.enter_context(open(collision_path, 'wb'))
+                self._write_stl_header(collision_file, collision_path.name, 0)
+
+            for row_start, elevation in self._iter_elevation_bands(
+                    ds, band_rows, smooth_sigma, workers):
+                offset = np.array([-center_x,
+                                   row_start * pixel_height * scale_factor - center_y, 0.0])
+                vertices, faces = self._build_mesh_arrays(
+                    elevation, pixel_width, pixel_height, scale_factor, mesher, center=False
+                )
+                vertices += offset
+
+                # The first row of later bands was already counted
+                own_z = vertices[cols:, 2] if row_start else vertices[:, 2]
+                z_sum += own_z.sum()
+                z_min = min(z_min, own_z.min())
+                z_max = max(z_max, own_z.max())
+
+                self._append_stl_records(f, vertices, faces, mesher)
+                if heights_path is not None:
+                    grid[row_start:row_start + len(elevation)] = vertices[:, 2].reshape(
+                        elevation.shape)
+
+                if collision_path is not None:
+                    vertices, faces, _ = self._build_adaptive_mesh_arrays(
+                        elevation, pixel_width, pixel_height, scale_factor,
+                        collision_error, center=False
+                    )
+                    vertices += offset
+                    self._append_stl_records(collision_file, vertices, faces)
+                    num_collision_faces += len(faces)
+
+            if collision_path is not None:
+                self._write_stl_header(collision_file, collision_path.name, num_collision_faces)
+
+        # Center Z in place, normals are unaffected by the translation
+        z_mean = z_sum / (rows * cols)
+        self._shift_stl_z(output_path, num_faces, -z_mean, memory_budget)
+        if heights_path is not None:
+            grid.flush()
+            del grid
+            self._shift_height_grid(heights_path, -z_mean, memory_budget)
+        if collision_path is not None:
+            self._shift_stl_z(collision_path, num_collision_faces, -z_mean, memory_budget)
+
+        min_corner = np.array([-center_x, -center_y, z_min - z_mean])
+        max_corner = np.array([center_x, center_y, z_max - z_mean])
+        return rows * cols, num_faces, num_collision_faces, min_corner, max_corner, z_mean
+
+    def _write_collision_stl(self, elevation, collision_path, pixel_width, pixel_height,
+                             scale_factor=1.0, collision_error=0.25, memory_budget=1 << 30):
+        """Mesh an in-memory elevation grid adaptively into a collision STL, band by band
+
+        Bands are sized so adaptive meshing one fits memory_budget and share
+        their edge rows, like the bands of _write_banded_stl. The mesh is
+        centered like the full grid mesh. Returns the number of faces.
+        """
+        rows, cols = elevation.shape
+        band_rows = max(int(memory_budget // (cols * self.ADAPTIVE_BYTES_PER_CELL)), 2)
+        center = np.array([(cols - 1) / 2.0 * pixel_width, (rows - 1) / 2.0 * pixel_height,
+                           elevation.mean(dtype=np.float64)]) * scale_factor
+
+        num_faces = 0
+        with open(collision_path, 'wb') as f:
+            self._write_stl_header(f, collision_path.name, 0)
+            for row_start in range(0, max(rows - 1, 1), band_rows - 1):
+                vertices, faces, _ = self._build_adaptive_mesh_arrays(
+                    elevation[row_start:row_start + band_rows], pixel_width, pixel_height,
+                    scale_factor, collision_error, center=False
+                )
+                vertices[:, 1] += row_start * pixel_height * scale_factor
+                vertices -= center
+                self._append_stl_records(f, vertices, faces)
+                num_faces += len(faces)
+            self._write_stl_header(f, collision_path.name, num_faces)
+        return num_faces
+
+    @staticmethod
+    def _write_stl_header(f, name, num_faces):
+        """Write, or rewrite at the start of f, a binary STL header and face count"""
+        f.seek(0)
+        f.write(mesh.Mesh(np.zeros(0, dtype=mesh.Mesh.dtype)).get_header(name).encode('ascii'))
+        f.write(struct.pack('<I', num_faces))
+        f.seek(0, os.SEEK_END)
+
+    @classmethod
+    def _append_stl_records(cls, f, vertices, faces, mesher='vectorized'):
+        """Append the binary STL records of a mesh piece to an open file"""
+        piece = cls._create_stl_mesh(vertices, faces, mesher)
+        piece.update_normals(update_areas=False, update_centroids=False)
+        piece.data.tofile(f)
+
+    @staticmethod
+    def _shift_stl_z(path, num_faces, dz, memory_budget=1 << 30):
+        """Add dz to every vertex Z of a binary STL through a memory map"""
+        records = np.memmap(path, dtype=mesh.Mesh.dtype, mode='r+',
+                            offset=84, shape=(num_faces,))
+        chunk = max(memory_budget // mesh.Mesh.dtype.itemsize, 1)
+        for start in range(0, num_faces, chunk):
+            records['vectors'][start:start + chunk, :, 2] += dz
+        records.flush()
+        del records
+
+    @staticmethod
+    def _shift_height_grid(path, dz, memory_budget=1 << 30):
+        """Add dz to every height of a .npy grid through a memory map"""
+        grid = np.load(path, mmap_mode='r+')
+        chunk = max(memory_budget // (grid.shape[1] * grid.itemsize), 1)
+        for start in range(0, len(grid), chunk):
+            grid[start:start + chunk] += dz
+        grid.flush()
+        del grid
+
+    def _load_elevation(self, smooth_sigma=1.0, dem_hash=None, memory_budget=1 << 30,
+                        workers=1, enhance=False):
+        """Read and smooth the elevation raster
+
+        Returns (elevation, pixel_width, pixel_height). The raster is read
+        and smoothed in windows that fit memory_budget, in parallel across
+        workers processes, and the result is identical to smoothing it
+        whole. enhance reads the upsampled DEM instead. With a cache, the
+        smoothed array is reused for identical DEM and smoothing.
+        """
+        if self.cache is not None:
+            enhance_key = ('enhanced', self.ENHANCE_SCALE) if enhance else ()
+            key = self.cache.key('elevation', dem_hash, smooth_sigma, *enhance_key)
+            entry = self.cache.get(key)
+            if entry is not None:
+                meta = self.cache.read_meta(entry)
+                print("Using cached smoothed elevation...")
+                return (np.load(entry / "elevation.npy"),
+                        meta['pixel_width'], meta['pixel_height'])
+
+        if enhance:
+            print("Using enhanced DEM...")
+            ds = self._open_enhanced_dem(self.ENHANCE_SCALE, memory_budget)
+        else:
+            dem_file = self.dem_path / self.tif_filename
+            print("Using original DEM...")
+
+            # Open DEM file
+            ds = gdal.Open(str(dem_file))
+            if ds is None:
+                raise ValueError(f"Failed to open {dem_file}")
+
+        pixel_width, pixel_height = self._pixel_size(ds)
+
+        # Read and smooth elevation data window by window
+        rows, cols = ds.RasterYSize, ds.RasterXSize
+        elevation = np.empty((rows, cols), dtype=np.float32)
+        band_rows = memory_budget // (cols * max(workers, 1) * self.SMOOTH_BYTES_PER_CELL)
+        for row_start, band in self._iter_elevation_bands(ds, band_rows, smooth_sigma, workers):
+            elevation[row_start:row_start + len(band)] = band
+
+        if self.cache is not None:
+            self.cache.put(key, arrays={"elevation.npy": elevation},
+                           meta={'pixel_width': pixel_width, 'pixel_height': pixel_height})
+
+        return elevation, pixel_width, pixel_height
+
+    @staticmethod
+    def _print_terrain_statistics(extents, num_vertices, num_faces, max_error=None,
+                                  collision_faces=None):
+        """Print terrain statistics"""
+        x_extent, y_extent, z_extent = extents
+        print(f"\nTerrain dimensions:")
+        print(f"X extent: {x_extent:.2f} units")
+        print(f"Y extent: {y_extent:.2f} units")
+        print(f"Z extent: {z_extent:.2f} units")
+        print(f"Number of vertices: {num_vertices}")
+        print(f"Number of faces: {num_faces}")
+        if max_error is not None:
+            print(f"Max vertical error: {max_error:.4f} units")
+        if collision_faces is not None:
+            print(f"Number of collision faces: {collision_faces}")
+
+    def _restore_cached_mesh(self, entry):
+        """Copy a cached STL, its collision mesh and terrain info into the mesh directory"""
+        output_path = self.mesh_path / "terrain.stl"
+        meta = self.cache.read_meta(entry)
+        for name in meta.get('files', ["terrain.stl", TerrainInfo.FILENAME]):
+            shutil.copy2(entry / name, self.mesh_path / name)
+        print(f"Restored cached terrain mesh at: {output_path}")
+
+        terrain_info = TerrainInfo.load(entry / TerrainInfo.FILENAME)
+        self._print_terrain_statistics(
+            (terrain_info.max_x - terrain_info.min_x,
+             terrain_info.max_y - terrain_info.min_y,
+             terrain_info.max_z - terrain_info.min_z),
+            meta['vertices'], meta['faces'], meta.get('max_error'),
+            meta.get('collision_faces')
+        )
+        return output_path
+
+    def create_terrain_mesh(self, scale_factor=1.0, smooth_sigma=1.0, enhance=False,
+                            mesher='vectorized', memory_budget=1 << 30, workers=1,
+                            max_error=0.1, max_triangles=None, collision_error=None,
+                            mesh_format='stl'):
+        """Generate terrain mesh from DEM while maintaining proportions
+
+        mesher selects the mesh construction path: 'vectorized' (array based,
+        default) or 'loop' (original per-vertex Python loops), which produce
+        the same full grid STL, or 'adaptive', an RTIN mesh whose vertical
+        error stays within max_error units, coarsened further if needed to
+        fit max_triangles faces. With enhance, the upsampled DEM is read,
+        smoothed and meshed in row bands sized to memory_budget bytes
+        (the adaptive mesher needs the whole grid and loads it instead).
+        Smoothing runs in windows across workers processes.
+
+        With collision_error, a decimated adaptive mesh within collision_error
+        units of the terrain is also written to terrain_collision.stl for
+        physics, band by band within memory_budget. The surface heights are saved as
+        a terrain_heights.npy grid that WorldPopulator memory-maps instead
+        of parsing the STL.
+
+        mesh_format 'obj', 'ply' or 'glb' also writes the mesh as an indexed
+        terrain.obj, terrain.ply or terrain.glb. The OBJ is about 0.7x and
+        the binary formats about half the size of the STL. Indexed output needs the whole grid,
+        so with enhance it loads the upsampled DEM instead of meshing in
+        bands.
+        """
+        try:
+            dem_hash = None
+            if self.cache is not None:
+                dem_hash = self.cache.file_hash(self.dem_path / self.tif_filename)
+                adaptive_key = (('adaptive', max_error, max_triangles)
+                                if mesher == 'adaptive' else ())
+                collision_key = ('collision', collision_error) if collision_error is not None else ()
+                format_key = ('format', mesh_format) if mesh_format != 'stl' else ()
+                mesh_key = self.cache.key('mesh', dem_hash, enhance, self.ENHANCE_SCALE,
+                                          smooth_sigma, scale_factor, *adaptive_key,
+                                          *collision_key, *format_key)
+                entry = self.cache.get(mesh_key)
+                if entry is not None:
+                    return self._restore_cached_mesh(entry)
 
-            # Save the mesh
             output_path = self.mesh_path / "terrain.stl"
-            terrain.save(str(output_path))
+            collision_path = None
+            if collision_error is not None:
+                collision_path = self.mesh_path / "terrain_collision.stl"
+            indexed_path = None
+            if mesh_format != 'stl':
+                indexed_path = self.mesh_path / f"terrain.{mesh_format}"
+            heights_path = self.mesh_path / TerrainSampler.GRID_FILENAME
+            achieved_error = None
+            num_collision_faces = None
+            if enhance and mesher != 'adaptive' and indexed_path is None:
+                print("Using enhanced DEM...")
+                ds = self._open_enhanced_dem(self.ENHANCE_SCALE, memory_budget)
+                pixel_width, pixel_height = self._pixel_size(ds)
+                (num_vertices, num_faces, num_collision_faces,
+                 min_corner, max_corner, z_mean) = self._write_banded_stl(
+                    ds, output_path, scale_factor, smooth_sigma, memory_budget, mesher, workers,
+                    collision_path, collision_error, heights_path
+                )
+                sampler = TerrainSampler(np.load(heights_path, mmap_mode='r'),
+                                         min_corner[0], min_corner[1],
+                                         pixel_width * scale_factor, pixel_height * scale_factor)
+            else:
+                elevation, pixel_width, pixel_height = self._load_elevation(
+                    smooth_sigma, dem_hash, memory_budget, workers, enhance)
+
+                # Build vertices and faces, then fill the STL vectors
+                if mesher == 'adaptive':
+                    vertices, faces, achieved_error = self._build_adaptive_mesh_arrays(
+                        elevation, pixel_width, pixel_height, scale_factor,
+                        max_error, max_triangles
+                    )
+                else:
+                    vertices, faces = self._build_mesh_arrays(
+                        elevation, pixel_width, pixel_height, scale_factor, mesher
+                    )
+                terrain = self._create_stl_mesh(vertices, faces, mesher)
+
+                # Save the mesh
+                terrain.save(str(output_path))
+                if indexed_path is not None:
+                    MeshExporter.write(indexed_path, vertices, faces)
+                num_vertices, num_faces = len(vertices), len(faces)
+                min_corner = vertices.min(axis=0)
+                max_corner = vertices.max(axis=0)
+
+                # Adaptive meshes are sampled on their triangles, not the raw grid
+                if mesher == 'adaptive':
+                    sampler = TerrainSampler.from_mesh(terrain)
+                else:
+                    sampler = TerrainSampler.from_elevation(elevation, pixel_width, pixel_height,
+                                                            scale_factor)
+                np.save(heights_path, sampler.grid)
+                z_mean = elevation.mean(dtype=np.float64) * scale_factor
+
+                if collision_path is not None:
+                    num_collision_faces = self._write_collision_stl(
+                        elevation, collision_path, pixel_width, pixel_height, scale_factor,
+                        collision_error, memory_budget
+                    )
             print(f"Created terrain mesh at: {output_path}")
+            if indexed_path is not None:
+                print(f"Created indexed terrain mesh at: {indexed_path} "
+                      f"({indexed_path.stat().st_size / output_path.stat().st_size:.0%} of the STL)")
+            if collision_path is not None:
+                print(f"Created collision mesh at: {collision_path}")
+
+            # Cache bounds and metadata for WorldPopulator
+            terrain_info = TerrainInfo(
+                min_corner[0], max_corner[0], min_corner[1], max_corner[1],
+                min_corner[2], max_corner[2],
+                pixel_width * scale_factor, pixel_height * scale_factor
+            )
+            info_path = self.mesh_path / TerrainInfo.FILENAME
+            terrain_info.save(info_path)
+            grid_info_path = self.mesh_path / TerrainSampler.GRID_INFO_FILENAME
+            sampler.save_info(grid_info_path, pixel_size=[pixel_width, pixel_height],
+                              scale_factor=scale_factor, z_offset=-z_mean)
+
+            if self.cache is not None:
+                files = {"terrain.stl": output_path, TerrainInfo.FILENAME: info_path,
+                         heights_path.name: heights_path, grid_info_path.name: grid_info_path}
+                if collision_path is not None:
+                    files[collision_path.name] = collision_path
+                if indexed_path is not None:
+                    files[indexed_path.name] = indexed_path
+                self.cache.put(mesh_key, files=files,
+                               meta={'vertices': num_vertices, 'faces': num_faces,
+                                     'max_error': achieved_error,
+                                     'collision_faces': num_collision_faces,
+                                     'files': list(files)})
             
             # Print terrain statistics
-            x_extent = np.ptp(vertices[:, 0])
-            y_extent = np.ptp(vertices[:, 1])
-            z_extent = np.ptp(vertices[:, 2])
-            print(f"\nTerrain dimensions:")
-            print(f"X extent: {x_extent:.2f} units")
-            print(f"Y extent: {y_extent:.2f} units")
-            print(f"Z extent: {z_extent:.2f} units")
-            print(f"Number of vertices: {len(vertices)}")
-            print(f"Number of faces: {len(faces)}")
+            self._print_terrain_statistics(max_corner - min_corner, num_vertices, num_faces,
+                                           achieved_error, num_collision_faces)
             
             return output_path
 
@@ -159,24 +636,241 @@ class TerrainGenerator:
             traceback.print_exc()
             sys.exit(1)
 
-    def _create_sdf_file(self):
-        """Create SDF file for the terrain model"""
-        sdf_content = '''<?xml version="1.0" ?>
+    def create_tiled_terrain(self, tiles, scale_factor=1.0, smooth_sigma=1.0, enhance=False,
+                             memory_budget=1 << 30, workers=1, collision_error=None):
+        """Generate the terrain as a grid of tile models
+
+        tiles is (rows, cols). Neighbouring tiles share their edge vertices
+        and every tile is smoothed with a halo, so the tiles join into the
+        same surface as the single mesh. Tiles are meshed in parallel across
+        workers processes into models/ground/tiles/tile_<row>_<col>, each
+        with its own STL and SDF model, plus a collision STL within
+        collision_error units if it is given. Returns the (uri, name)
+        include of every tile.
+        """
+        tile_rows, tile_cols = tiles
+        try:
+            if enhance:
+                print("Using enhanced DEM...")
+                ds = self._open_enhanced_dem(self.ENHANCE_SCALE, memory_budget)
+            else:
+                print("Using original DEM...")
+                dem_file = self.dem_path / self.tif_filename
+                ds = gdal.Open(str(dem_file))
+                if ds is None:
+                    raise ValueError(f"Failed to open {dem_file}")
+
+            rows, cols = ds.RasterYSize, ds.RasterXSize
+            if not (1 <= tile_rows < rows and 1 <= tile_cols < cols):
+                raise ValueError(
+                    f"Cannot split a {cols}x{rows} DEM into {tile_rows}x{tile_cols} tiles")
+
+            pixel_width, pixel_height = self._pixel_size(ds)
+            source = self._dataset_source(ds)
+            halo = _smoothing_halo(smooth_sigma)
+            center_xy = ((cols - 1) * pixel_width * scale_factor / 2,
+                         (rows - 1) * pixel_height * scale_factor / 2)
+
+            # Tile boundaries in pixels, each boundary row/column is shared
+            row_edges = np.linspace(0, rows - 1, tile_rows + 1).round().astype(int)
+            col_edges = np.linspace(0, cols - 1, tile_cols + 1).round().astype(int)
+
+            if self.tiles_path.exists():
+                shutil.rmtree(self.tiles_path)
+
+            # Tile workers fill their part of the shared height grid sidecar
+            heights_path = self.mesh_path / TerrainSampler.GRID_FILENAME
+            grid = np.lib.format.open_memmap(heights_path, mode='w+', dtype=np.float64,
+                                             shape=(rows, cols))
+            del grid
+
+            jobs = []
+            for i in range(tile_rows):
+                for j in range(tile_cols):
+                    name = f"tile_{i}_{j}"
+                    tile_path = self.tiles_path / name
+                    tile_path.mkdir(parents=True)
+                    r0, r1 = int(row_edges[i]), int(row_edges[i + 1])
+                    c0, c1 = int(col_edges[j]), int(col_edges[j + 1])
+                    owned_shape = (r1 - r0 + (i == tile_rows - 1), c1 - c0 + (j == tile_cols - 1))
+                    jobs.append((name, tile_path, (
+                        source, (r0, r1 + 1), (c0, c1 + 1), owned_shape, halo, smooth_sigma,
+                        pixel_width, pixel_height, scale_factor, center_xy,
+                        tile_path / "terrain.stl",
+                        tile_path / "terrain_collision.stl" if collision_error is not None else None,
+                        collision_error, heights_path
+                    )))
+
+            print(f"Meshing {len(jobs)} tiles...")
+            if workers > 1:
+                with ProcessPoolExecutor(max_workers=workers) as executor:
+                    futures = [executor.submit(_build_terrain_tile, *args) for _, _, args in jobs]
+                    results = [future.result() for future in futures]
+            else:
+                results = [_build_terrain_tile(*args) for _, _, args in jobs]
+
+            # Center Z on the mean of the whole terrain like the single mesh
+            z_mean = sum(result[0] for result in results) / (rows * cols)
+            includes = []
+            tile_entries = []
+            for (name, tile_path, args), result in zip(jobs, results):
+                mesh_uri = f"model://ground/tiles/{name}/terrain.stl"
+                collision_uri = mesh_uri
+                self._shift_stl_z(tile_path / "terrain.stl", result[4], -z_mean, memory_budget)
+                if collision_error is not None:
+                    collision_uri = f"model://ground/tiles/{name}/terrain_collision.stl"
+                    self._shift_stl_z(tile_path / "terrain_collision.stl", result[5], -z_mean,
+                                      memory_budget)
+                self._create_sdf_file(tile_path, name, mesh_uri, collision_uri)
+                self._create_config_file(tile_path, f"ground_{name}",
+                                         f"Terrain tile {name} generated from DEM data")
+                includes.append((f"model://ground/tiles/{name}", f"terrain_{name}"))
+                tile_entries.append({
+                    'name': name,
+                    'uri': f"model://ground/tiles/{name}",
+                    'mesh': f"tiles/{name}/terrain.stl"
+                })
+
+            manifest_path = self.tiles_path / "tiles.json"
+            with open(manifest_path, 'w') as f:
+                json.dump({'grid': [tile_rows, tile_cols], 'tiles': tile_entries}, f, indent=2)
+
+            self._shift_height_grid(heights_path, -z_mean, memory_budget)
+            sampler = TerrainSampler(np.load(heights_path, mmap_mode='r'),
+                                     -center_xy[0], -center_xy[1],
+                                     pixel_width * scale_factor, pixel_height * scale_factor)
+            sampler.save_info(self.mesh_path / TerrainSampler.GRID_INFO_FILENAME,
+                              pixel_size=[pixel_width, pixel_height],
+                              scale_factor=scale_factor, z_offset=-z_mean)
+
+            # Cache bounds and metadata for WorldPopulator
+            min_corner = np.array([-center_xy[0], -center_xy[1],
+                                   min(result[1] for result in results) - z_mean])
+            max_corner = np.array([center_xy[0], center_xy[1],
+                                   max(result[2] for result in results) - z_mean])
+            terrain_info = TerrainInfo(
+                min_corner[0], max_corner[0], min_corner[1], max_corner[1],
+                min_corner[2], max_corner[2],
+                pixel_width * scale_factor, pixel_height * scale_factor
+            )
+            terrain_info.save(self.mesh_path / TerrainInfo.FILENAME)
+            print(f"Created {len(jobs)} terrain tiles in: {self.tiles_path}")
+
+            # Print terrain statistics
+            self._print_terrain_statistics(
+                max_corner - min_corner,
+                sum(result[3] for result in results),
+                sum(result[4] for result in results),
+                collision_faces=(sum(result[5] for result in results)
+                                 if collision_error is not None else None)
+            )
+            print(f"Number of tiles: {tile_rows} x {tile_cols}")
+
+            return includes
+
+        except Exception as e:
+            print(f"Error creating terrain tiles: {e}")
+            import traceback
+            traceback.print_exc()
+            sys.exit(1)
+
+    @staticmethod
+    def _heightmap_side(rows, cols):
+        """Smallest valid Gazebo heightmap side (2^n + 1) covering a grid"""
+        return (1 << int(np.ceil(np.log2(max(rows, cols, 3) - 1)))) + 1
+
+    def create_heightmap(self, scale_factor=1.0, smooth_sigma=1.0, enhance=False,
+                         memory_budget=1 << 30, workers=1):
+        """Generate a Gazebo heightmap image from the DEM
+
+        The smoothed elevation is resampled bilinearly onto a square
+        (2^n + 1) grid spanning the same extent and written as a 16-bit PNG,
+        with rows flipped so the first image row is the +Y edge. Heights are
+        centered like the STL mesh, so both modes share terrain coordinates.
+        The heightmap <size> and <pos> are written next to the image in
+        terrain_heightmap.json, which WorldPopulator samples heights from.
+        Returns that description.
+        """
+        try:
+            dem_hash = None
+            if self.cache is not None:
+                dem_hash = self.cache.file_hash(self.dem_path / self.tif_filename)
+            elevation, pixel_width, pixel_height = self._load_elevation(
+                smooth_sigma, dem_hash, memory_budget, workers, enhance)
+
+            rows, cols = elevation.shape
+            side = self._heightmap_side(rows, cols)
+            # grid_mode=False maps corner samples onto corner samples
+            heights = zoom(elevation.astype(np.float64), (side / rows, side / cols),
+                           order=1, grid_mode=False) * scale_factor
+            heights -= elevation.mean(dtype=np.float64) * scale_factor
+
+            z_min, z_max = float(heights.min()), float(heights.max())
+            z_range = (z_max - z_min) or 1.0
+            image = np.rint((heights[::-1] - z_min) / z_range * self.HEIGHTMAP_MAX_VALUE)
+            image = image.astype(np.uint16)
+
+            # The PNG driver only supports CreateCopy
+            image_path = self.mesh_path / self.HEIGHTMAP_IMAGE
+            mem_ds = gdal.GetDriverByName('MEM').Create('', side, side, 1, gdal.GDT_UInt16)
+            mem_ds.GetRasterBand(1).WriteArray(image)
+            png_ds = gdal.GetDriverByName('PNG').CreateCopy(str(image_path), mem_ds)
+            if png_ds is None:
+                raise ValueError(f"Failed to write {image_path}")
+            png_ds = mem_ds = None
+            print(f"Created terrain heightmap at: {image_path}")
+
+            heightmap = {
+                'image': self.HEIGHTMAP_IMAGE,
+                'size': [(cols - 1) * pixel_width * scale_factor,
+                         (rows - 1) * pixel_height * scale_factor,
+                         z_range],
+                'pos': [0.0, 0.0, z_min],
+                'max_value': self.HEIGHTMAP_MAX_VALUE
+            }
+            with open(self.mesh_path / TerrainSampler.HEIGHTMAP_FILENAME, 'w') as f:
+                json.dump(heightmap, f, indent=2)
+
+            # Print terrain statistics
+            print(f"\nTerrain dimensions:")
+            print(f"X extent: {heightmap['size'][0]:.2f} units")
+            print(f"Y extent: {heightmap['size'][1]:.2f} units")
+            print(f"Z extent: {z_max - z_min:.2f} units")
+            print(f"Heightmap resolution: {side} x {side} (from {cols} x {rows})")
+            print(f"Height step: {z_range / self.HEIGHTMAP_MAX_VALUE:.6f} units")
+
+            return heightmap
+
+        except Exception as e:
+            print(f"Error creating terrain heightmap: {e}")
+            import traceback
+            traceback.print_exc()
+            sys.exit(1)
+
+    def _create_sdf_file(self, model_path=None, model_name='terrain',
+                         mesh_uri='model://ground/mesh/terrain.stl', collision_uri=None):
+        """Create SDF file for the terrain model
+
+        collision_uri is the mesh used for physics, the visual mesh by default.
+        """
+        model_path = model_path or self.terrain_path
+        collision_uri = collision_uri or mesh_uri
+        sdf_content = f'''<?xml version="1.0" ?>
 <sdf version="1.7">
-    <model name="terrain">
+    <model name="{model_name}">
         <static>true</static>
         <link name="link">
             <collision name="collision">
                 <geometry>
                     <mesh>
-                        <uri>model://ground/mesh/terrain.stl</uri>
+                        <uri>{collision_uri}</uri>
                     </mesh>
                 </geometry>
             </collision>
             <visual name="visual">
                 <geometry>
                     <mesh>
-                        <uri>model://ground/mesh/terrain.stl</uri>
+                        <uri>{mesh_uri}</uri>
                     </mesh>
                 </geometry>
                 <material>
@@ -190,15 +884,59 @@ class TerrainGenerator:
     </model>
 </sdf>'''
         
+        sdf_path = model_path / 'model.sdf'
+        sdf_path.write_text(sdf_content)
+        print(f"Created SDF file: {sdf_path}")
+
+    def _create_heightmap_sdf_file(self, heightmap, model_name='terrain'):
+        """Create SDF file for the terrain model as a native Gazebo heightmap"""
+        uri = f"model://ground/mesh/{heightmap['image']}"
+        size = ' '.join(f'{v:.10g}' for v in heightmap['size'])
+        pos = ' '.join(f'{v:.10g}' for v in heightmap['pos'])
+        sdf_content = f'''<?xml version="1.0" ?>
+<sdf version="1.7">
+    <model name="{model_name}">
+        <static>true</static>
+        <link name="link">
+            <collision name="collision">
+                <geometry>
+                    <heightmap>
+                        <uri>{uri}</uri>
+                        <size>{size}</size>
+                        <pos>{pos}</pos>
+                    </heightmap>
+                </geometry>
+            </collision>
+            <visual name="visual">
+                <geometry>
+                    <heightmap>
+                        <uri>{uri}</uri>
+                        <size>{size}</size>
+                        <pos>{pos}</pos>
+                        <use_terrain_paging>false</use_terrain_paging>
+                        <texture>
+                            <diffuse>model://ground/texture/moss_basecolor.png</diffuse>
+                            <normal>file://media/materials/textures/flat_normal.png</normal>
+                            <size>10</size>
+                        </texture>
+                    </heightmap>
+                </geometry>
+            </visual>
+        </link>
+    </model>
+</sdf>'''
+
         sdf_path = self.terrain_path / 'model.sdf'
         sdf_path.write_text(sdf_content)
         print(f"Created SDF file: {sdf_path}")
 
-    def _create_config_file(self):
+    def _create_config_file(self, model_path=None, model_name='ground',
+                            description='Terrain model generated from DEM data for Gazebo simulation'):
         """Create model.config file"""
-        config_content = '''<?xml version="1.0"?>
+        model_path = model_path or self.terrain_path
+        config_content = f'''<?xml version="1.0"?>
 <model>
-    <name>ground</name>
+    <name>{model_name}</name>
     <version>1.0</version>
     <sdf version="1.7">model.sdf</sdf>
     
@@ -208,30 +946,36 @@ class TerrainGenerator:
     </author>
     
     <description>
-        Terrain model generated from DEM data for Gazebo simulation
+        {description}
     </description>
 </model>'''
         
-        config_path = self.terrain_path / 'model.config'
+        config_path = model_path / 'model.config'
         config_path.write_text(config_content)
         print(f"Created config file: {config_path}")
 
-    def _create_test_world(self):
-        """Create test world file"""
-        world_content = '''<?xml version="1.0" ?>
+    def _create_test_world(self, terrain_includes=None):
+        """Create test world file
+
+        terrain_includes lists (uri, name) pairs, the single ground model by
+        default or one entry per terrain tile.
+        """
+        terrain_includes = terrain_includes or [('model://ground', 'terrain')]
+        includes = ''.join(f'''        <include>
+            <name>{name}</name>
+            <uri>{uri}</uri>
+            <pose>0 0 0 0 0 0</pose>
+        </include>
+        
+''' for uri, name in terrain_includes)
+        world_content = f'''<?xml version="1.0" ?>
 <sdf version="1.7">
     <world name="default">
         <include>
             <uri>model://sun</uri>
         </include>
         
-        <include>
-            <name>terrain</name>
-            <uri>model://ground</uri>
-            <pose>0 0 0 0 0 0</pose>
-        </include>
-        
-        <physics type="ode">
+{includes}        <physics type="ode">
             <real_time_update_rate>1000.0</real_time_update_rate>
             <max_step_size>0.001</max_step_size>
             <real_time_factor>1</real_time_factor>
@@ -244,26 +988,187 @@ class TerrainGenerator:
         world_path.write_text(world_content)
         print(f"Created test world file: {world_path}")
 
-    def process_terrain(self, scale_factor=1.0, smooth_sigma=1.0, enhance=False):
-        """Process complete terrain generation pipeline"""
+    def _visual_format(self, mesh_format):
+        """Format of the ground visual mesh: mesh_format if Gazebo loads it and it beats the STL"""
+        if mesh_format not in MeshExporter.GAZEBO_FORMATS:
+            return 'stl'
+        indexed_path = self.mesh_path / f"terrain.{mesh_format}"
+        stl_path = self.mesh_path / "terrain.stl"
+        if indexed_path.stat().st_size >= stl_path.stat().st_size:
+            print(f"Keeping the STL visual, {indexed_path.name} is not smaller")
+            return 'stl'
+        return mesh_format
+
+    def process_terrain(self, scale_factor=1.0, smooth_sigma=1.0, enhance=False,
+                        mesher='vectorized', memory_budget=1 << 30, workers=1, tiles=None,
+                        max_error=0.1, max_triangles=None, collision_error=None,
+                        output_format='stl', mesh_format='stl'):
+        """Process complete terrain generation pipeline
+
+        tiles=(rows, cols) splits the terrain into tile models instead of a
+        single ground mesh; the ground model itself then gets no model
+        files, worlds include the tiles. collision_error makes physics use a decimated
+        collision mesh within that error instead of the visual mesh. output_format='heightmap'
+        writes a native Gazebo heightmap instead of an STL mesh. mesh_format
+        writes an indexed copy of the mesh; the ground model's visual uses
+        it when Gazebo Classic can load it (OBJ) and it is smaller than the
+        STL, and the STL otherwise.
+        """
         print("\nStarting terrain generation pipeline...")
         print("\n1. Verifying directory structure...")
         self._verify_paths()
 
-        print("\n2. Creating terrain mesh...")
-        stl_path = self.create_terrain_mesh(
-            scale_factor=scale_factor,
-            smooth_sigma=smooth_sigma,
-            enhance=enhance
-        )
+        # Stale outputs of other modes would otherwise take precedence in WorldPopulator
+        if self.tiles_path.exists() and not (tiles and output_format == 'stl'):
+            shutil.rmtree(self.tiles_path)
+            print(f"Removed previous terrain tiles: {self.tiles_path}")
+        heightmap_info = self.mesh_path / TerrainSampler.HEIGHTMAP_FILENAME
+        if heightmap_info.exists() and output_format != 'heightmap':
+            heightmap_info.unlink()
+            print(f"Removed previous terrain heightmap: {heightmap_info}")
+
+        heightmap = None
+        terrain_includes = None
+        if output_format == 'heightmap':
+            print("\n2. Creating terrain heightmap...")
+            heightmap = self.create_heightmap(
+                scale_factor=scale_factor,
+                smooth_sigma=smooth_sigma,
+                enhance=enhance,
+                memory_budget=memory_budget,
+                workers=workers
+            )
+        elif tiles:
+            print("\n2. Creating terrain tiles...")
+            terrain_includes = self.create_tiled_terrain(
+                tiles,
+                scale_factor=scale_factor,
+                smooth_sigma=smooth_sigma,
+                enhance=enhance,
+                memory_budget=memory_budget,
+                workers=workers,
+                collision_error=collision_error
+            )
+        else:
+            print("\n2. Creating terrain mesh...")
+            stl_path = self.create_terrain_mesh(
+                scale_factor=scale_factor,
+                smooth_sigma=smooth_sigma,
+                enhance=enhance,
+                mesher=mesher,
+                memory_budget=memory_budget,
+                workers=workers,
+                max_error=max_error,
+                max_triangles=max_triangles,
+                collision_error=collision_error,
+                mesh_format=mesh_format
+            )
         
         print("\n3. Creating Gazebo model files...")
-        self._create_sdf_file()
-        self._create_config_file()
-        self._create_test_world()
+        if terrain_includes is not None:
+            # Worlds include the tile models, which have their own model files
+            for stale_path in (self.terrain_path / 'model.sdf', self.terrain_path / 'model.config'):
+                if stale_path.exists():
+                    stale_path.unlink()
+                    print(f"Removed single ground model file: {stale_path}")
+        else:
+            if heightmap is not None:
+                self._create_heightmap_sdf_file(heightmap)
+            else:
+                mesh_uri = f'model://ground/mesh/terrain.{self._visual_format(mesh_format)}'
+                collision_uri = None
+                if collision_error is not None:
+                    collision_uri = 'model://ground/mesh/terrain_collision.stl'
+                self._create_sdf_file(mesh_uri=mesh_uri, collision_uri=collision_uri)
+            self._create_config_file()
+        self._create_test_world(terrain_includes)
 
         return self.terrain_path
 
+# Gaussian smoothing kernels are cut off this many sigmas from their centre
+SMOOTH_TRUNCATE = 4.0
+
+
+def _smoothing_halo(smooth_sigma):
+    """Rows/columns a window must extend past its output to smooth like the whole raster
+
+    This is the kernel radius gaussian_filter uses with SMOOTH_TRUNCATE.
+    """
+    return int(SMOOTH_TRUNCATE * smooth_sigma + 0.5) if smooth_sigma > 0 else 0
+
+
+def _read_smoothed_window(source, read_rows, crop_rows, smooth_sigma, read_cols=None,
+                          crop_cols=None):
+    """Read a (row, col) window of a DEM, smooth it and crop the halo
+
+    Rows and columns are (start, end) ranges in raster pixels; columns
+    default to the full width. source is an open dataset or a string for
+    gdal.Open, so the function also runs in pool workers.
+    """
+    ds = gdal.Open(source) if isinstance(source, str) else source
+    if ds is None:
+        raise ValueError("Failed to open DEM window source")
+
+    read_cols = read_cols or (0, ds.RasterXSize)
+    crop_cols = crop_cols or read_cols
+    window = ds.GetRasterBand(1).ReadAsArray(read_cols[0], read_rows[0],
+                                             read_cols[1] - read_cols[0],
+                                             read_rows[1] - read_rows[0])
+    window = window.astype(np.float32)
+    if smooth_sigma > 0:
+        window = gaussian_filter(window, sigma=smooth_sigma, truncate=SMOOTH_TRUNCATE)
+    return window[crop_rows[0] - read_rows[0]:crop_rows[1] - read_rows[0],
+                  crop_cols[0] - read_cols[0]:crop_cols[1] - read_cols[0]]
+
+def _build_terrain_tile(source, rows, cols, owned_shape, halo, smooth_sigma, pixel_width,
+                        pixel_height, scale_factor, center_xy, output_path,
+                        collision_path=None, collision_error=None, heights_path=None):
+    """Smooth and mesh one DEM tile into an STL in whole-terrain X/Y coordinates
+
+    rows and cols are the tile's (start, end) pixel ranges, including the
+    edge shared with the next tile. Z is left uncentered because its mean
+    depends on all tiles. With collision_path, an adaptive mesh within
+    collision_error is written there as well, and with heights_path the
+    tile's heights are stored in that shared .npy grid. Returns (z_sum,
+    z_min, z_max, num_vertices, num_faces, num_collision_faces) with z_sum
+    over the leading owned_shape cells, which leave out the edge shared
+    with the next tiles.
+    """
+    ds = gdal.Open(source)
+    if ds is None:
+        raise ValueError("Failed to open DEM tile source")
+
+    read_rows = (max(rows[0] - halo, 0), min(rows[1] + halo, ds.RasterYSize))
+    read_cols = (max(cols[0] - halo, 0), min(cols[1] + halo, ds.RasterXSize))
+    elevation = _read_smoothed_window(ds, read_rows, rows, smooth_sigma, read_cols, cols)
+
+    offset = np.array([cols[0] * pixel_width * scale_factor - center_xy[0],
+                       rows[0] * pixel_height * scale_factor - center_xy[1], 0.0])
+    vertices, faces = TerrainGenerator._build_mesh_arrays(
+        elevation, pixel_width, pixel_height, scale_factor, center=False)
+    vertices += offset
+    TerrainGenerator._create_stl_mesh(vertices, faces).save(str(output_path))
+
+    z = vertices[:, 2].reshape(elevation.shape)
+    if heights_path is not None:
+        # Tiles overlap only on shared edges, which hold identical heights
+        grid = np.load(heights_path, mmap_mode='r+')
+        grid[rows[0]:rows[1], cols[0]:cols[1]] = z
+        grid.flush()
+        del grid
+    owned = z[:owned_shape[0], :owned_shape[1]]
+    num_vertices, num_faces = len(vertices), len(faces)
+
+    num_collision_faces = 0
+    if collision_path is not None:
+        vertices, faces, _ = TerrainGenerator._build_adaptive_mesh_arrays(
+            elevation, pixel_width, pixel_height, scale_factor, collision_error, center=False)
+        vertices += offset
+        TerrainGenerator._create_stl_mesh(vertices, faces).save(str(collision_path))
+        num_collision_faces = len(faces)
+
+    return owned.sum(), z.min(), z.max(), num_vertices, num_faces, num_collision_faces
+
 def main():
     parser = argparse.ArgumentParser(description='DEM to Gazebo Terrain Generator')
     parser.add_argument('--tif-file', type=str, default='terrain.tif',
@@ -274,16 +1179,65 @@ def main():
                        help='Smoothing factor for the terrain (default: 1.0)')
     parser.add_argument('--enhance', action='store_true',
                        help='Enable DEM enhancement (default: False)')
+    parser.add_argument('--mesher', choices=['vectorized', 'loop', 'adaptive'],
+                       default='vectorized',
+                       help='Mesh construction path (default: vectorized)')
+    parser.add_argument('--max-error', type=float, default=0.1,
+                       help='Max vertical error of the adaptive mesher in units (default: 0.1)')
+    parser.add_argument('--max-triangles', type=int,
+                       help='Face budget of the adaptive mesher')
+    parser.add_argument('--memory-budget-mb', type=float, default=1024,
+                       help='Peak memory for windowed smoothing and banded meshing in MB (default: 1024)')
+    parser.add_argument('--workers', type=int, default=os.cpu_count() or 1,
+                       help='Processes for windowed DEM smoothing (default: CPU count)')
+    parser.add_argument('--collision-error', type=float,
+                       help='Collide against a decimated mesh within this vertical error in '
+                            'units instead of the visual mesh')
+    parser.add_argument('--format', choices=['stl', 'heightmap'], default='stl',
+                       help='Terrain output: STL mesh or native Gazebo heightmap (default: stl)')
+    parser.add_argument('--mesh-format', choices=['stl'] + MeshExporter.FORMATS, default='stl',
+                       help='Indexed mesh written next to the STL; obj is also used for the '
+                            'visual, ply and glb are side outputs (default: stl)')
+    parser.add_argument('--tiles', type=int, nargs=2, metavar=('ROWS', 'COLS'),
+                       help='Split the terrain into ROWS x COLS tile models')
+    parser.add_argument('--no-cache', action='store_true',
+                       help='Always rebuild derived terrain artifacts')
+    parser.add_argument('--cache-dir', type=str,
+                       help='Terrain cache directory (default: <project>/.cache/terrain)')
+    parser.add_argument('--cache-size-mb', type=float, default=2048,
+                       help='Terrain cache disk budget in MB (default: 2048)')
     
     args = parser.parse_args()
+    if args.tiles and args.mesher == 'adaptive':
+        parser.error("--mesher adaptive cannot be combined with --tiles")
+    if args.format == 'heightmap' and (args.tiles or args.mesher != 'vectorized' or
+                                       args.mesh_format != 'stl'):
+        parser.error("--format heightmap cannot be combined with --tiles, --mesher or --mesh-format")
+    if args.tiles and args.mesh_format != 'stl':
+        parser.error("--mesh-format cannot be combined with --tiles")
     print(f"\nProcessing terrain file: {args.tif_file}")
     
     try:
-        generator = TerrainGenerator(args.tif_file)
+        cache = None
+        if not args.no_cache:
+            base_path = Path(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+            cache = TerrainCache(args.cache_dir or base_path / ".cache/terrain",
+                                 max_bytes=int(args.cache_size_mb * 1024 ** 2))
+
+        generator = TerrainGenerator(args.tif_file, cache=cache)
         model_path = generator.process_terrain(
             scale_factor=args.scale,
             smooth_sigma=args.smooth,
-            enhance=args.enhance
+            enhance=args.enhance,
+            mesher=args.mesher,
+            memory_budget=int(args.memory_budget_mb * 1024 ** 2),
+            workers=args.workers,
+            tiles=args.tiles,
+            max_error=args.max_error,
+            max_triangles=args.max_triangles,
+            collision_error=args.collision_error,
+            output_format=args.format,
+            mesh_format=args.mesh_format
         )
         
         print("\nTerrain generation completed successfully!")
@@ -0,0 +1,355 @@
+#!/usr/bin/env python3
+
+import json
+from pathlib import Path
+import numpy as np
+
+
+def triangle_stencils(tri_col, tri_row, chunk_points=1 << 22):
+    """Grid points covered by triangles, with their barycentric weights
+
+    tri_col and tri_row are (n, 3) integer grid columns and rows of the
+    triangle corners. Triangles of the same shape share one stencil of
+    covered grid offsets from their first corner, so the work is batched
+    per shape. Yields (index, ox, oy, w0, w1, w2) with index the triangles
+    of a chunk of at most about chunk_points covered points, ox and oy the
+    offsets and w0, w1 and w2 the weights of the three corners. Degenerate
+    triangles are skipped.
+    """
+    d1 = np.column_stack([tri_col[:, 1] - tri_col[:, 0], tri_row[:, 1] - tri_row[:, 0]])
+    d2 = np.column_stack([tri_col[:, 2] - tri_col[:, 0], tri_row[:, 2] - tri_row[:, 0]])
+    shapes, inverse = np.unique(np.hstack([d1, d2]), axis=0, return_inverse=True)
+    inverse = inverse.ravel()
+
+    for shape_index, (d1x, d1y, d2x, d2y) in enumerate(shapes):
+        denom = d1x * d2y - d2x * d1y
+        if denom == 0:
+            continue
+        # Grid offsets covered by the triangle (0, d1, d2) and their weights
+        ox, oy = np.meshgrid(np.arange(min(0, d1x, d2x), max(0, d1x, d2x) + 1),
+                             np.arange(min(0, d1y, d2y), max(0, d1y, d2y) + 1))
+        ox, oy = ox.ravel(), oy.ravel()
+        w1 = (ox * d2y - d2x * oy) / denom
+        w2 = (d1x * oy - ox * d1y) / denom
+        w0 = 1.0 - w1 - w2
+        covered = (w0 >= -1e-9) & (w1 >= -1e-9) & (w2 >= -1e-9)
+        ox, oy, w0, w1, w2 = ox[covered], oy[covered], w0[covered], w1[covered], w2[covered]
+
+        selected = np.flatnonzero(inverse == shape_index)
+        chunk = max(chunk_points // len(ox), 1)
+        for start in range(0, len(selected), chunk):
+            yield selected[start:start + chunk], ox, oy, w0, w1, w2
+
+
+class TerrainSampler:
+    """Constant-time terrain height queries on a regular height grid
+
+    heights[row, col] is the surface height at
+    (origin_x + col * spacing_x, origin_y + row * spacing_y). Each grid cell
+    is split into the same two triangles TerrainGenerator writes to the STL
+    ([v0, v1, v2] and [v1, v3, v2]), so queries return the exact height of
+    the rendered surface.
+    """
+
+    # Heightmap <size>/<pos> description written by TerrainGenerator --format heightmap
+    HEIGHTMAP_FILENAME = "terrain_heightmap.json"
+    # Height grid sidecar written next to the terrain mesh
+    GRID_FILENAME = "terrain_heights.npy"
+    GRID_INFO_FILENAME = "terrain_heights.json"
+
+    def __init__(self, heights, origin_x, origin_y, spacing_x, spacing_y):
+        self.grid = np.ascontiguousarray(heights, dtype=np.float64)
+        self.origin_x = float(origin_x)
+        self.origin_y = float(origin_y)
+        self.spacing_x = float(spacing_x)
+        self.spacing_y = float(spacing_y)
+
+        rows, cols = self.grid.shape
+        if rows < 2 or cols < 2:
+            raise ValueError("Height grid needs at least 2x2 samples")
+
+    @property
+    def shape(self):
+        return self.grid.shape
+
+    @classmethod
+    def from_elevation(cls, elevation, pixel_width, pixel_height, scale_factor=1.0):
+        """Build a sampler from a (smoothed) elevation array, centered like the STL"""
+        rows, cols = elevation.shape
+        heights = elevation.astype(np.float64) * scale_factor
+        spacing_x = pixel_width * scale_factor
+        spacing_y = pixel_height * scale_factor
+
+        # TerrainGenerator centers the mesh on the mean of its vertices
+        return cls(heights - heights.mean(),
+                   -(cols - 1) / 2.0 * spacing_x, -(rows - 1) / 2.0 * spacing_y,
+                   spacing_x, spacing_y)
+
+    @classmethod
+    def from_heightmap(cls, image, size, pos=(0.0, 0.0, 0.0), max_value=65535):
+        """Build a sampler from a Gazebo heightmap image
+
+        The image covers size[0] x size[1] centered on pos, with its first
+        row on the +Y edge, and pixel values 0..max_value span pos[2] to
+        pos[2] + size[2].
+        """
+        rows, cols = image.shape
+        heights = pos[2] + image[::-1].astype(np.float64) / max_value * size[2]
+        return cls(heights, pos[0] - size[0] / 2.0, pos[1] - size[1] / 2.0,
+                   size[0] / (cols - 1), size[1] / (rows - 1))
+
+    @classmethod
+    def from_mesh(cls, terrain_mesh):
+        """Build a sampler from a terrain STL mesh
+
+        Meshes written by TerrainGenerator are regular grids and are recovered
+        exactly; adaptive meshes, whose vertices are a subset of such a grid,
+        are sampled from their triangle planes at every grid point. Any other
+        triangulation is resampled onto a regular grid with
+        linear interpolation at its median vertex spacing.
+        """
+        vertices = terrain_mesh.vectors.reshape(-1, 3).astype(np.float64)
+        sampler = cls._from_regular_vertices(vertices)
+        if sampler is not None:
+            return sampler
+        return cls._from_scattered_vertices(vertices)
+
+    @staticmethod
+    def _grid_axis(values):
+        """Return (origin, spacing, count) of a regular axis, or None"""
+        unique = np.unique(values)
+        if len(unique) < 2:
+            return None
+
+        # Float32 round-off splits one grid line into several nearby values
+        gaps = np.diff(unique)
+        count = int(np.count_nonzero(gaps > 0.5 * gaps.max())) + 1
+        spacing = (unique[-1] - unique[0]) / (count - 1)
+
+        offsets = (values - unique[0]) / spacing
+        if np.abs(offsets - np.rint(offsets)).max() > 1e-3:
+            return None
+        return unique[0], spacing, count
+
+    @classmethod
+    def _from_regular_vertices(cls, vertices):
+        """Scatter grid vertices into a height array, or None if not a regular grid"""
+        x_axis = cls._grid_axis(vertices[:, 0])
+        y_axis = cls._grid_axis(vertices[:, 1])
+        if x_axis is None or y_axis is None:
+            return None
+
+        origin_x, spacing_x, cols = x_axis
+        origin_y, spacing_y, rows = y_axis
+        col = np.rint((vertices[:, 0] - origin_x) / spacing_x).astype(np.int64)
+        row = np.rint((vertices[:, 1] - origin_y) / spacing_y).astype(np.int64)
+
+        heights = np.full((rows, cols), np.nan)
+        heights[row, col] = vertices[:, 2]
+        if np.isnan(heights).any():
+            # Adaptive meshes skip grid points inside their larger triangles
+            cls._fill_from_triangles(heights, col.reshape(-1, 3), row.reshape(-1, 3),
+                                     vertices[:, 2].reshape(-1, 3))
+            if np.isnan(heights).any():
+                return None
+
+        return cls(heights, origin_x, origin_y, spacing_x, spacing_y)
+
+    @staticmethod
+    def _fill_from_triangles(heights, tri_col, tri_row, tri_z, chunk_points=1 << 22):
+        """Fill NaN grid heights from the planes of the triangles covering them
+
+        tri_col, tri_row and tri_z are (n, 3) grid columns, rows and heights
+        of the triangle corners. Each filled point lies on the triangulated
+        surface.
+        """
+        rows, cols = heights.shape
+        for index, ox, oy, w0, w1, w2 in triangle_stencils(tri_col, tri_row, chunk_points):
+            col = tri_col[index, 0][:, None] + ox
+            row = tri_row[index, 0][:, None] + oy
+            z = (w0 * tri_z[index, 0][:, None] + w1 * tri_z[index, 1][:, None] +
+                 w2 * tri_z[index, 2][:, None])
+            valid = (col >= 0) & (col < cols) & (row >= 0) & (row < rows)
+            heights[row[valid], col[valid]] = np.where(
+                np.isnan(heights[row[valid], col[valid]]), z[valid],
+                heights[row[valid], col[valid]])
+
+    @classmethod
+    def _from_scattered_vertices(cls, vertices):
+        """Resample an irregular triangulation onto a regular grid"""
+        from scipy.interpolate import griddata
+
+        points, index = np.unique(np.round(vertices[:, :2], 6), axis=0, return_index=True)
+        values = vertices[index, 2]
+
+        edges = np.linalg.norm(np.diff(vertices.reshape(-1, 3, 3)[:, :, :2], axis=1), axis=2)
+        spacing = float(np.median(edges[edges > 0]))
+
+        min_x, min_y = points.min(axis=0)
+        max_x, max_y = points.max(axis=0)
+        cols = max(int(np.ceil((max_x - min_x) / spacing)) + 1, 2)
+        rows = max(int(np.ceil((max_y - min_y) / spacing)) + 1, 2)
+        grid_x, grid_y = np.meshgrid(np.linspace(min_x, max_x, cols),
+                                     np.linspace(min_y, max_y, rows))
+
+        heights = griddata(points, values, (grid_x, grid_y), method='linear')
+        missing = np.isnan(heights)
+        if missing.any():
+            heights[missing] = griddata(points, values, (grid_x[missing], grid_y[missing]),
+                                        method='nearest')
+
+        return cls(heights, min_x, min_y,
+                   (max_x - min_x) / (cols - 1), (max_y - min_y) / (rows - 1))
+
+    def save_info(self, path, **metadata):
+        """Write the grid placement and extra metadata as JSON"""
+        info = dict(metadata, shape=list(self.grid.shape),
+                    origin=[self.origin_x, self.origin_y],
+                    spacing=[self.spacing_x, self.spacing_y])
+        with open(path, 'w') as f:
+            json.dump(info, f, indent=2)
+
+    def save(self, directory, **metadata):
+        """Write the height grid (.npy) and its placement (JSON) into directory"""
+        directory = Path(directory)
+        np.save(directory / self.GRID_FILENAME, self.grid)
+        self.save_info(directory / self.GRID_INFO_FILENAME, **metadata)
+
+    @classmethod
+    def load(cls, directory, mmap_mode='r'):
+        """Read a grid written by save(), memory-mapped by default
+
+        Only the cells touched by height queries are then read from disk.
+        """
+        directory = Path(directory)
+        with open(directory / cls.GRID_INFO_FILENAME) as f:
+            info = json.load(f)
+        grid = np.load(directory / cls.GRID_FILENAME, mmap_mode=mmap_mode)
+        if list(grid.shape) != info['shape']:
+            raise ValueError(f"Height grid shape {grid.shape} does not match {info['shape']}")
+        return cls(grid, *info['origin'], *info['spacing'])
+
+    def heights(self, xy):
+        """Surface heights for an (N, 2) array of world XY positions
+
+        Positions outside the grid are clamped to the nearest edge.
+        """
+        xy = np.asarray(xy, dtype=np.float64).reshape(-1, 2)
+        rows, cols = self.grid.shape
+
+        u = np.clip((xy[:, 0] - self.origin_x) / self.spacing_x, 0, cols - 1)
+        v = np.clip((xy[:, 1] - self.origin_y) / self.spacing_y, 0, rows - 1)
+        col = np.minimum(u.astype(np.int64), cols - 2)
+        row = np.minimum(v.astype(np.int64), rows - 2)
+        u -= col
+        v -= row
+
+        z0 = self.grid[row, col]
+        z1 = self.grid[row, col + 1]
+        z2 = self.grid[row + 1, col]
+        z3 = self.grid[row + 1, col + 1]
+
+        # Barycentric interpolation on the cell's two triangles
+        lower = u + v <= 1.0
+        return np.where(lower,
+                        z0 + u * (z1 - z0) + v * (z2 - z0),
+                        z3 + (1.0 - u) * (z2 - z3) + (1.0 - v) * (z1 - z3))
+
+    def height(self, x, y):
+        """Surface height at a single world position"""
+        return float(self.heights(np.array([[x, y]]))[0])
+
+
+class TerrainInfo:
+    """Terrain bounds and metadata computed once per terrain and shared by all placements"""
+
+    FILENAME = "terrain_info.json"
+
+    def __init__(self, min_x, max_x, min_y, max_y, min_z, max_z,
+                 spacing_x, spacing_y, edge_width=5.0):
+        self.min_x = float(min_x)
+        self.max_x = float(max_x)
+        self.min_y = float(min_y)
+        self.max_y = float(max_y)
+        self.min_z = float(min_z)
+        self.max_z = float(max_z)
+        self.spacing_x = float(spacing_x)
+        self.spacing_y = float(spacing_y)
+        self.edge_width = float(edge_width)
+
+    @classmethod
+    def from_mesh(cls, terrain_mesh, sampler=None, edge_width=5.0):
+        """Compute bounds from a terrain STL mesh in a single pass"""
+        vertices = terrain_mesh.vectors.reshape(-1, 3)
+        min_corner = vertices.min(axis=0)
+        max_corner = vertices.max(axis=0)
+        if sampler is None:
+            sampler = TerrainSampler.from_mesh(terrain_mesh)
+
+        return cls(min_corner[0], max_corner[0], min_corner[1], max_corner[1],
+                   min_corner[2], max_corner[2],
+                   sampler.spacing_x, sampler.spacing_y, edge_width)
+
+    @classmethod
+    def from_sampler(cls, sampler, edge_width=5.0):
+        """Compute bounds from a height grid"""
+        rows, cols = sampler.shape
+        return cls(sampler.origin_x, sampler.origin_x + (cols - 1) * sampler.spacing_x,
+                   sampler.origin_y, sampler.origin_y + (rows - 1) * sampler.spacing_y,
+                   sampler.grid.min(), sampler.grid.max(),
+                   sampler.spacing_x, sampler.spacing_y, edge_width)
+
+    @property
+    def resolution(self):
+        return (self.spacing_x, self.spacing_y)
+
+    @property
+    def z_range(self):
+        return (self.min_z, self.max_z)
+
+    def placement_bounds(self, margin=0.0):
+        """Return (min_x, max_x, min_y, max_y) shrunk by margin on every side"""
+        return (self.min_x + margin, self.max_x - margin,
+                self.min_y + margin, self.max_y - margin)
+
+    def edge_zones(self, margin=0.0):
+        """Return the top, bottom, left and right edge strips as (x0, y0, x1, y1) rectangles"""
+        min_x, max_x, min_y, max_y = self.placement_bounds(margin)
+        width = self.edge_width
+        return {
+            'top': (min_x, max_y - width, max_x, max_y),
+            'bottom': (min_x, min_y, max_x, min_y + width),
+            'left': (min_x, min_y, min_x + width, max_y),
+            'right': (max_x - width, min_y, max_x, max_y)
+        }
+
+    def is_edge(self, x, y, margin=0.0):
+        """Determine if a position is in the edge zone"""
+        min_x, max_x, min_y, max_y = self.placement_bounds(margin)
+        width = self.edge_width
+        return (x < min_x + width or x > max_x - width or
+                y < min_y + width or y > max_y - width)
+
+    def to_dict(self):
+        return {
+            'bounds': [self.min_x, self.max_x, self.min_y, self.max_y],
+            'z_range': [self.min_z, self.max_z],
+            'resolution': [self.spacing_x, self.spacing_y],
+            'edge_width': self.edge_width
+        }
+
+    @classmethod
+    def from_dict(cls, data):
+        return cls(*data['bounds'], *data['z_range'], *data['resolution'],
+                   data.get('edge_width', 5.0))
+
+    def save(self, path):
+        """Write the terrain info as JSON"""
+        with open(path, 'w') as f:
+            json.dump(self.to_dict(), f, indent=2)
+
+    @classmethod
+    def load(cls, path):
+        """Read terrain info written by save()"""
+        with open(path, 'r') as f:
+            return cls.from_dict(json.load(f))
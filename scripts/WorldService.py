@@ -0,0 +1,315 @@
+#!/usr/bin/env python3
+
+import io
+import os
+import sys
+import json
+import time
+import signal
+import argparse
+import threading
+import socketserver
+from pathlib import Path
+from concurrent.futures import ProcessPoolExecutor
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+import numpy as np
+from ForestGenerator import WorldPopulator, init_world_worker, generate_world
+from main import validate_density
+
+
+class WorldService:
+    """Serve forest worlds from a long-lived, warm WorldPopulator
+
+    The terrain and variant catalog are loaded once on start, in the service
+    and in each pool worker that generates the worlds, so a request only
+    pays for placement and writing. Requests without a seed draw one from the
+    service's own random stream, which makes the sequence of served worlds
+    reproducible from the service seed.
+
+    A request is a dict with "density" and optionally "seed", "result"
+    ("path", "arrays" or "npz"), "output" (world path, relative to and
+    inside the worlds directory) and the create_forest_world options in
+    WORLD_OPTIONS, where density_rasters must name files in the DEM
+    directory.
+    """
+
+    WORLD_OPTIONS = ['placement', 'density_rasters', 'position_decimals',
+                     'angle_decimals', 'compress', 'placement_tiles']
+    RESULTS = ['path', 'arrays', 'npz']
+
+    def __init__(self, populator, workers=1, seed=None,
+                 output_pattern="service/world_{index:06d}.world"):
+        self.populator = populator
+        self.workers = workers
+        self.output_pattern = output_pattern
+        self.seed_sequence = np.random.SeedSequence(seed)
+        self.rng = np.random.default_rng(self.seed_sequence)
+        self.world_count = 0
+        self._lock = threading.Lock()
+        self._pool = None
+
+    def start(self):
+        """Load the terrain and start the worker pool
+
+        Worlds are always generated in pool workers, even with one worker,
+        so their logs stay out of the request handler threads.
+        """
+        print(f"Service random seed: {self.seed_sequence.entropy}")
+        self.populator.load_terrain()
+        self._pool = ProcessPoolExecutor(max_workers=max(self.workers, 1),
+                                         initializer=init_world_worker,
+                                         initargs=(self.populator.base_path,))
+
+    def close(self):
+        if self._pool is not None:
+            self._pool.shutdown()
+            self._pool = None
+
+    def __enter__(self):
+        self.start()
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    def _make_job(self, request):
+        """Validate a request and assign its seed and output path"""
+        if not isinstance(request, dict):
+            raise ValueError("Request must be a JSON object")
+        density = request.get('density')
+        if not isinstance(density, dict) or not density:
+            raise ValueError("Request needs a density object")
+        if not validate_density(density):
+            raise ValueError("Invalid density configuration")
+        result = request.get('result', 'path')
+        if result not in self.RESULTS:
+            raise ValueError(f"Unknown result type {result!r}, expected one of {self.RESULTS}")
+        seed = request.get('seed')
+        if seed is not None and (not isinstance(seed, int) or isinstance(seed, bool) or seed < 0):
+            raise ValueError(f"Seed must be a non-negative integer, got {seed!r}")
+        output = request.get('output')
+        if output is not None and (not isinstance(output, str) or not output):
+            raise ValueError("Output must be a non-empty path")
+
+        with self._lock:
+            index = self.world_count
+            self.world_count += 1
+            if seed is None:
+                seed = int(self.rng.integers(0, 2**63, dtype=np.int64))
+
+        output_path = None
+        if result == 'path':
+            if output is None:
+                output_path = Path(self.output_pattern.format(index=index, seed=seed))
+                if not output_path.is_absolute():
+                    output_path = self.populator.worlds_path / output_path
+            else:
+                output_path = self._resolve_inside(self.populator.worlds_path, output, 'worlds')
+
+        options = {key: request[key] for key in self.WORLD_OPTIONS if key in request}
+        if 'density_rasters' in options:
+            options['density_rasters'] = self._resolve_density_rasters(options['density_rasters'])
+        return {'seed': seed, 'density': density, 'path': output_path,
+                'result': result, 'options': options}
+
+    @staticmethod
+    def _resolve_inside(directory, path, name):
+        """Resolved path of a requested relative path inside directory
+
+        Absolute paths, '..' components and symlinks leading out of the
+        directory are rejected, so clients cannot reach other files.
+        """
+        directory = directory.resolve()
+        relative = Path(path)
+        if relative.is_absolute() or '..' in relative.parts:
+            raise ValueError(f"Path must be relative and inside the {name} directory: {path!r}")
+        resolved = (directory / relative).resolve()
+        if directory not in resolved.parents:
+            raise ValueError(f"Path escapes the {name} directory: {path!r}")
+        return resolved
+
+    def _resolve_density_rasters(self, rasters):
+        """Density raster paths of a request, confined to the DEM directory"""
+        if not isinstance(rasters, dict):
+            raise ValueError("density_rasters must map categories to raster paths")
+        dem_path = self.populator.models_path / "ground/dem"
+        resolved = {}
+        for category, raster in rasters.items():
+            if category not in WorldPopulator.CATEGORIES:
+                raise ValueError(f"Unknown density raster category: {category!r}")
+            if not isinstance(raster, str) or not raster:
+                raise ValueError(f"Density raster of {category} must be a non-empty path")
+            raster_path = self._resolve_inside(dem_path, raster, 'DEM')
+            if not raster_path.is_file():
+                raise ValueError(f"Density raster not found: {raster!r}")
+            resolved[category] = str(raster_path)
+        return resolved
+
+    def generate(self, request):
+        """Generate one world for a request and return the response dict
+
+        Arrays are returned per category as {"variants": names, "instances":
+        INSTANCE_DTYPE array}; the caller chooses how to encode them.
+        """
+        if self._pool is None:
+            raise RuntimeError("World service is not started")
+        job = self._make_job(request)
+        start = time.perf_counter()
+        response = self._pool.submit(generate_world, None, job['density'], job['seed'],
+                                     job['path'], job['options'],
+                                     arrays=job['result'] != 'path').result()
+        if response['path'] is None:
+            del response['path']
+        response['elapsed'] = time.perf_counter() - start
+        return response
+
+    def status(self):
+        info = self.populator.terrain_info
+        return {
+            'worlds': self.world_count,
+            'workers': self.workers,
+            'seed': self.seed_sequence.entropy,
+            'terrain': {
+                'min_x': info.min_x, 'max_x': info.max_x,
+                'min_y': info.min_y, 'max_y': info.max_y,
+                'min_z': info.min_z, 'max_z': info.max_z
+            },
+            'variants': {category: len(names)
+                         for category, names in self.populator.model_variants.items()}
+        }
+
+    @staticmethod
+    def encode_arrays(arrays):
+        """JSON-ready placement arrays, one list per instance field"""
+        return {
+            category: dict(
+                variants=entry['variants'],
+                **{name: entry['instances'][name].tolist()
+                   for name in entry['instances'].dtype.names}
+            )
+            for category, entry in arrays.items()
+        }
+
+    @staticmethod
+    def encode_npz(arrays):
+        """Placement arrays as an .npz archive, <category> and <category>_variants"""
+        buffer = io.BytesIO()
+        contents = {}
+        for category, entry in arrays.items():
+            contents[category] = entry['instances']
+            contents[f"{category}_variants"] = np.array(entry['variants'])
+        np.savez(buffer, **contents)
+        return buffer.getvalue()
+
+    def _handler(self):
+        service = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def _send(self, status, body, content_type='application/json'):
+                if not isinstance(body, bytes):
+                    body = json.dumps(body).encode('utf-8')
+                self.send_response(status)
+                self.send_header('Content-Type', content_type)
+                self.send_header('Content-Length', str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def do_GET(self):
+                if self.path != '/status':
+                    self._send(404, {'error': f"Unknown path: {self.path}"})
+                    return
+                self._send(200, service.status())
+
+            def do_POST(self):
+                if self.path != '/world':
+                    self._send(404, {'error': f"Unknown path: {self.path}"})
+                    return
+                try:
+                    length = int(self.headers.get('Content-Length', 0))
+                    request = json.loads(self.rfile.read(length) or b'{}')
+                    response = service.generate(request)
+                except (ValueError, TypeError, KeyError) as e:
+                    self._send(400, {'error': str(e)})
+                    return
+                except Exception as e:
+                    self._send(500, {'error': str(e)})
+                    return
+
+                arrays = response.pop('arrays', None)
+                if arrays is not None and request.get('result') == 'npz':
+                    self._send(200, service.encode_npz(arrays), 'application/octet-stream')
+                    return
+                if arrays is not None:
+                    response['arrays'] = service.encode_arrays(arrays)
+                self._send(200, response)
+
+            def log_message(self, format, *args):
+                print(format % args)
+
+        return Handler
+
+    def serve_http(self, host='127.0.0.1', port=8765):
+        """Serve requests over HTTP until interrupted"""
+        with ThreadingHTTPServer((host, port), self._handler()) as server:
+            print(f"Serving forest worlds on http://{host}:{port}")
+            server.serve_forever()
+
+    def serve_unix(self, socket_path):
+        """Serve HTTP requests over a local Unix socket until interrupted"""
+        socket_path = Path(socket_path)
+        if socket_path.exists():
+            socket_path.unlink()
+        try:
+            with _UnixHTTPServer(str(socket_path), self._handler()) as server:
+                print(f"Serving forest worlds on unix://{socket_path}")
+                server.serve_forever()
+        finally:
+            if socket_path.exists():
+                socket_path.unlink()
+
+
+class _UnixHTTPServer(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+    daemon_threads = True
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Long-lived forest world generation service')
+    parser.add_argument('--base-path', type=str,
+                        default=str(Path(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))),
+                        help='Base path for the project')
+    parser.add_argument('--socket', type=str,
+                        help='Serve on this Unix socket instead of TCP')
+    parser.add_argument('--host', type=str, default='127.0.0.1',
+                        help='HTTP host (default: 127.0.0.1)')
+    parser.add_argument('--port', type=int, default=8765,
+                        help='HTTP port (default: 8765)')
+    parser.add_argument('--workers', type=int, default=os.cpu_count() or 1,
+                        help='Processes generating worlds (default: CPU count)')
+    parser.add_argument('--seed', type=int,
+                        help='Seed of the stream that seeds requests without one (default: random)')
+    parser.add_argument('--output-pattern', type=str, default="service/world_{index:06d}.world",
+                        help='World file name, formatted with {index} and {seed}; relative '
+                             'to the worlds directory (default: service/world_{index:06d}.world)')
+    args = parser.parse_args()
+    if args.workers < 1:
+        parser.error('--workers must be at least 1')
+
+    populator = WorldPopulator(Path(args.base_path))
+    # Stop through the normal exit path on SIGTERM so the socket is removed
+    signal.signal(signal.SIGTERM, lambda signum, frame: sys.exit(0))
+    try:
+        with WorldService(populator, workers=args.workers, seed=args.seed,
+                          output_pattern=args.output_pattern) as service:
+            if args.socket:
+                service.serve_unix(args.socket)
+            else:
+                service.serve_http(args.host, args.port)
+    except KeyboardInterrupt:
+        print("\nService stopped")
+    except Exception as e:
+        print(f"\nError: {e}")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
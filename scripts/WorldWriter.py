@@ -0,0 +1,133 @@
+#!/usr/bin/env python3
+
+import gzip
+from pathlib import Path
+from xml.sax.saxutils import escape
+import numpy as np
+
+
+class WorldWriter:
+    """Stream a forest SDF world to disk in chunks of <include> elements
+
+    The world header (lighting, terrain and physics) is written on open and
+    the closing tags on close, so memory use does not grow with the number
+    of models. Poses are rounded to position_decimals (3 = mm) and
+    angle_decimals (3 = mrad). A path ending in .gz is gzip-compressed.
+    """
+
+    HEADER = '''<?xml version="1.0" ?>
+<sdf version="1.7">
+  <world name="{world_name}">
+    <include>
+      <uri>model://sun</uri>
+    </include>
+    <light name="ambient" type="directional">
+      <cast_shadows>false</cast_shadows>
+      <pose>0 0 10 0 0 0</pose>
+      <diffuse>0.8 0.8 0.8 1</diffuse>
+      <specular>0.1 0.1 0.1 1</specular>
+      <direction>0.1 0.1 -0.9</direction>
+    </light>
+    <light name="point_light" type="point">
+      <cast_shadows>false</cast_shadows>
+      <pose>0 0 10 0 0 0</pose>
+      <diffuse>0.3 0.3 0.3 1</diffuse>
+      <specular>0.05 0.05 0.05 1</specular>
+      <attenuation />
+      <range>30</range>
+    </light>
+{terrain}    <physics type="ode">
+      <real_time_update_rate>1000.0</real_time_update_rate>
+      <max_step_size>0.001</max_step_size>
+      <real_time_factor>1</real_time_factor>
+      <gravity>0 0 -9.8</gravity>
+    </physics>
+'''
+
+    TERRAIN = '''    <include>
+      <uri>{uri}</uri>
+      <name>{name}</name>
+      <pose>{pose}</pose>
+    </include>
+'''
+
+    FOOTER = '''  </world>
+</sdf>
+'''
+
+    # One placed model: variant index into the category's variant names, pose and scale
+    INSTANCE_DTYPE = np.dtype([
+        ('variant', np.int32),
+        ('x', np.float64), ('y', np.float64), ('z', np.float64),
+        ('roll', np.float64), ('pitch', np.float64), ('yaw', np.float64),
+        ('scale', np.float64)
+    ])
+
+    def __init__(self, output_path, world_name='forest_world', position_decimals=3,
+                 angle_decimals=3, terrain_includes=None, buffer_size=1 << 20):
+        self.output_path = Path(output_path)
+        self.world_name = world_name
+        self.position_decimals = position_decimals
+        self.angle_decimals = angle_decimals
+        self.terrain_includes = terrain_includes or [('model://ground', 'terrain', (0, 0, 0))]
+        self.buffer_size = buffer_size
+        self.model_count = 0
+        self._file = None
+
+        p = position_decimals
+        a = angle_decimals
+        self._include_format = (
+            '    <include>\n'
+            '      <uri>model://{category}/{variant}</uri>\n'
+            '      <name>{category}_{index}</name>\n'
+            f'      <pose>{{x:.{p}f}} {{y:.{p}f}} {{z:.{p}f}} '
+            f'{{roll:.{a}f}} {{pitch:.{a}f}} {{yaw:.{a}f}}</pose>\n'
+            f'      <scale>{{scale:.{p}f}} {{scale:.{p}f}} {{scale:.{p}f}}</scale>\n'
+            '    </include>\n'
+        )
+
+    def __enter__(self):
+        self.open()
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    def open(self):
+        """Open the output file and write the world header"""
+        self.output_path.parent.mkdir(parents=True, exist_ok=True)
+        if self.output_path.suffix == '.gz':
+            self._file = gzip.open(self.output_path, 'wt', encoding='utf-8')
+        else:
+            self._file = open(self.output_path, 'w', encoding='utf-8',
+                              buffering=self.buffer_size)
+
+        terrain = ''.join(
+            self.TERRAIN.format(uri=escape(uri), name=escape(name),
+                                pose=' '.join(f'{v:g}' for v in (*xyz, 0, 0, 0)))
+            for uri, name, xyz in self.terrain_includes
+        )
+        self._file.write(self.HEADER.format(world_name=escape(self.world_name), terrain=terrain))
+
+    def add_instances(self, category, variant_names, instances, start_index=0,
+                      chunk_size=10000):
+        """Write many includes from a structured array of INSTANCE_DTYPE"""
+        fmt = self._include_format.format
+        category_escaped = escape(category)
+        names = [escape(name) for name in variant_names]
+        for chunk_start in range(0, len(instances), chunk_size):
+            rows = instances[chunk_start:chunk_start + chunk_size].tolist()
+            self._file.write(''.join(
+                fmt(category=category_escaped, variant=names[variant],
+                    index=start_index + chunk_start + i,
+                    x=x, y=y, z=z, roll=roll, pitch=pitch, yaw=yaw, scale=scale)
+                for i, (variant, x, y, z, roll, pitch, yaw, scale) in enumerate(rows)
+            ))
+        self.model_count += len(instances)
+
+    def close(self):
+        """Write the closing tags and close the file"""
+        if self._file is not None:
+            self._file.write(self.FOOTER)
+            self._file.close()
+            self._file = None
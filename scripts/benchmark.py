@@ -0,0 +1,186 @@
+#!/usr/bin/env python3
+"""Micro-benchmarks for the Forest3D generation pipeline.
+
+Each subcommand runs on synthetic data so results do not depend on the
+DEM or assets currently checked into models/.
+"""
+
+import argparse
+import os
+import tempfile
+import time
+from pathlib import Path
+import numpy as np
+
+
+def _timed(func, *args, **kwargs):
+    """Run func and return (result, elapsed seconds)"""
+    start = time.perf_counter()
+    result = func(*args, **kwargs)
+    return result, time.perf_counter() - start
+
+
+def _synthetic_dem(size, seed=0):
+    """Create a smooth random elevation raster of shape (size, size)"""
+    from scipy.ndimage import gaussian_filter
+    rng = np.random.default_rng(seed)
+    return gaussian_filter(rng.normal(0, 20, (size, size)), sigma=size / 16).astype(np.float32)
+
+
+def benchmark_mesh(sizes, skip_loop_above=512):
+    """Compare the loop and vectorized terrain mesh builders"""
+    from TerrainGenerator import TerrainGenerator
+
+    print(f"{'DEM size':>10} {'loop (s)':>10} {'vectorized (s)':>15} {'identical':>10}")
+    for size in sizes:
+        elevation = _synthetic_dem(size)
+
+        def build(mesher):
+            vertices, faces = TerrainGenerator._build_mesh_arrays(
+                elevation, 1.0, 1.0, 1.0, mesher)
+            return TerrainGenerator._create_stl_mesh(vertices, faces, mesher)
+
+        fast, fast_time = _timed(build, 'vectorized')
+        if size <= skip_loop_above:
+            slow, slow_time = _timed(build, 'loop')
+            identical = np.array_equal(slow.vectors, fast.vectors)
+            print(f"{size:>10} {slow_time:>10.3f} {fast_time:>15.3f} {str(identical):>10}")
+        else:
+            print(f"{size:>10} {'skipped':>10} {fast_time:>15.3f} {'-':>10}")
+
+
+def benchmark_smoothing(sizes, sigma=1.0, workers=None, memory_budget_mb=256):
+    """Compare whole-raster and windowed parallel Gaussian smoothing of a GeoTIFF"""
+    from osgeo import gdal
+    from scipy.ndimage import gaussian_filter
+    from TerrainGenerator import TerrainGenerator
+
+    workers = workers or os.cpu_count() or 1
+    budget = int(memory_budget_mb * 1024 ** 2)
+    print(f"{'DEM size':>10} {'whole (s)':>10} {'windowed (s)':>13} {'identical':>10}")
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        for size in sizes:
+            path = os.path.join(tmp_dir, f"dem_{size}.tif")
+            ds = gdal.GetDriverByName('GTiff').Create(path, size, size, 1, gdal.GDT_Float32)
+            ds.GetRasterBand(1).WriteArray(_synthetic_dem(size))
+            ds = None
+
+            def whole():
+                elevation = gdal.Open(path).GetRasterBand(1).ReadAsArray().astype(np.float32)
+                return gaussian_filter(elevation, sigma=sigma)
+
+            def windowed():
+                ds = gdal.Open(path)
+                elevation = np.empty((size, size), dtype=np.float32)
+                band_rows = budget // (size * workers * TerrainGenerator.SMOOTH_BYTES_PER_CELL)
+                for row_start, band in TerrainGenerator._iter_elevation_bands(
+                        ds, band_rows, sigma, workers):
+                    elevation[row_start:row_start + len(band)] = band
+                return elevation
+
+            expected, whole_time = _timed(whole)
+            result, windowed_time = _timed(windowed)
+            identical = np.array_equal(expected, result)
+            print(f"{size:>10} {whole_time:>10.3f} {windowed_time:>13.3f} {str(identical):>10}")
+
+
+def _synthetic_terrain_mesh(size=64, spacing=8.0):
+    """Create an STL terrain mesh over a synthetic DEM"""
+    from TerrainGenerator import TerrainGenerator
+    vertices, faces = TerrainGenerator._build_mesh_arrays(
+        _synthetic_dem(size), spacing, spacing)
+    return TerrainGenerator._create_stl_mesh(vertices, faces)
+
+
+def _check_distance_to_placed_linear(populator, x, y, category):
+    """Reference WorldPopulator._check_distance_to_placed scanning every placed model"""
+    min_distance = populator.MIN_DISTANCES.get(category, 1.0)
+
+    # Check distance to same category
+    for px, py, _ in populator.placed_models[category]:
+        if np.sqrt((x - px)**2 + (y - py)**2) < min_distance:
+            return False
+
+    # Trees keep clear of rocks and sand, bushes of sand
+    for other_category in populator.EXCLUSIONS.get(category, []):
+        for px, py, _ in populator.placed_models[other_category]:
+            if np.sqrt((x - px)**2 + (y - py)**2) < populator.MIN_DISTANCES[other_category]:
+                return False
+
+    return True
+
+
+def benchmark_placement(counts, category='grass', skip_linear_above=10000, base_path=None):
+    """Compare linear and spatial-hash distance checks when placing one category"""
+    from ForestGenerator import WorldPopulator
+    from TerrainSampler import TerrainSampler, TerrainInfo
+
+    populator = WorldPopulator(base_path or Path(__file__).resolve().parent.parent)
+    terrain_mesh = _synthetic_terrain_mesh()
+    populator.terrain_sampler = TerrainSampler.from_mesh(terrain_mesh)
+    terrain_info = TerrainInfo.from_mesh(terrain_mesh, populator.terrain_sampler)
+
+    def place(count, linear):
+        populator._reset_placements()
+        if linear:
+            populator._check_distance_to_placed = (
+                lambda x, y, category: _check_distance_to_placed_linear(populator, x, y, category))
+        populator.seed(0)
+        try:
+            for _ in range(count):
+                populator._get_random_position(terrain_info, category)
+        finally:
+            populator.__dict__.pop('_check_distance_to_placed', None)
+        return len(populator.placed_models[category])
+
+    print(f"\n{'count':>10} {'linear (s)':>12} {'indexed (s)':>12} {'placed':>10}")
+    for count in counts:
+        placed, fast_time = _timed(place, count, False)
+        if count <= skip_linear_above:
+            _, slow_time = _timed(place, count, True)
+            print(f"{count:>10} {slow_time:>12.3f} {fast_time:>12.3f} {placed:>10}")
+        else:
+            print(f"{count:>10} {'skipped':>12} {fast_time:>12.3f} {placed:>10}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Forest3D performance benchmarks')
+    subparsers = parser.add_subparsers(dest='benchmark', required=True)
+
+    mesh_parser = subparsers.add_parser('mesh', help='Terrain mesh construction')
+    mesh_parser.add_argument('--sizes', type=int, nargs='+', default=[128, 256, 512, 2048],
+                             help='DEM edge lengths in pixels')
+    mesh_parser.add_argument('--skip-loop-above', type=int, default=512,
+                             help='Only time the loop mesher up to this DEM size')
+
+    smoothing_parser = subparsers.add_parser('smoothing', help='Windowed DEM smoothing')
+    smoothing_parser.add_argument('--sizes', type=int, nargs='+', default=[1024, 4096, 8192],
+                                  help='DEM edge lengths in pixels')
+    smoothing_parser.add_argument('--sigma', type=float, default=1.0,
+                                  help='Gaussian smoothing sigma (default: 1.0)')
+    smoothing_parser.add_argument('--workers', type=int,
+                                  help='Smoothing processes (default: CPU count)')
+    smoothing_parser.add_argument('--memory-budget-mb', type=float, default=256,
+                                  help='Memory budget for the windows in MB (default: 256)')
+
+    placement_parser = subparsers.add_parser('placement', help='Model placement distance checks')
+    placement_parser.add_argument('--counts', type=int, nargs='+', default=[1000, 10000, 100000],
+                                  help='Number of instances to place')
+    placement_parser.add_argument('--category', default='grass',
+                                  choices=['tree', 'bush', 'rock', 'grass', 'sand'],
+                                  help='Category to place (default: grass)')
+    placement_parser.add_argument('--skip-linear-above', type=int, default=10000,
+                                  help='Only time the linear scan up to this count')
+
+    args = parser.parse_args()
+
+    if args.benchmark == 'mesh':
+        benchmark_mesh(args.sizes, args.skip_loop_above)
+    elif args.benchmark == 'smoothing':
+        benchmark_smoothing(args.sizes, args.sigma, args.workers, args.memory_budget_mb)
+    elif args.benchmark == 'placement':
+        benchmark_placement(args.counts, args.category, args.skip_linear_above)
+
+
+if __name__ == "__main__":
+    main()
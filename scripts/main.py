@@ -19,8 +19,60 @@ def parse_arguments():
     
     parser.add_argument('--config-file', type=str,
                         help='Path to JSON configuration file')
+
+    parser.add_argument('--placement', choices=['rejection', 'poisson', 'density', 'cluster'],
+                        default='rejection',
+                        help='Placement strategy (default: rejection)')
+
+    parser.add_argument('--density-rasters', type=str,
+                        help='JSON mapping categories to density GeoTIFFs for --placement density '
+                             '(e.g. \'{"tree": "tree_density.tif"}\')')
+
+    parser.add_argument('--placement-tiles', type=int, nargs=2, metavar=('ROWS', 'COLS'),
+                        help='Place models tile by tile over a ROWS x COLS grid '
+                             '(poisson and cluster placement only)')
+
+    parser.add_argument('--workers', type=int, default=os.cpu_count() or 1,
+                        help='Processes used for --placement-tiles, or for the worlds of '
+                             'a batch (default: CPU count)')
+
+    parser.add_argument('--count', type=int, default=1,
+                        help='Number of worlds to generate as a batch (default: 1)')
+
+    parser.add_argument('--output-pattern', type=str,
+                        help='Batch world file name, formatted with {index} and {seed}; '
+                             'relative to the worlds directory '
+                             '(default: forest_world_{index:04d}.world)')
+
+    parser.add_argument('--density-jitter', type=float, default=0.0,
+                        help='Scale each batch world\'s counts by a random factor within '
+                             '+-this fraction (default: 0)')
+
+    parser.add_argument('--manifest', type=str,
+                        help='Batch manifest path (default: worlds/batch_manifest.json)')
+
+    parser.add_argument('--position-decimals', type=int, default=3,
+                        help='Decimals written for positions and scales (default: 3, i.e. mm)')
+
+    parser.add_argument('--angle-decimals', type=int, default=3,
+                        help='Decimals written for angles (default: 3, i.e. mrad)')
+
+    parser.add_argument('--compress', action='store_true',
+                        help='Write a gzip-compressed .world.gz file')
+
+    parser.add_argument('--seed', type=int,
+                        help='Random seed for reproducible worlds (default: random)')
     
-    return parser.parse_args()
+    args = parser.parse_args()
+    if args.placement_tiles and args.placement not in WorldPopulator.TILED_PLACEMENT_MODES:
+        parser.error('--placement-tiles requires --placement poisson or cluster')
+    if args.workers < 1:
+        parser.error('--workers must be at least 1')
+    if args.count < 1:
+        parser.error('--count must be at least 1')
+    if not 0.0 <= args.density_jitter < 1.0:
+        parser.error('--density-jitter must be in [0, 1)')
+    return args
 
 def load_default_density():
     """Load default density configuration"""
@@ -52,6 +104,13 @@ def validate_density(density):
         if category not in valid_categories:
             print(f"Warning: Invalid category '{category}' in density configuration")
             return False
+        if isinstance(count, dict):
+            variants = count.get('variants', {})
+            if not isinstance(variants, dict) or any(
+                    not isinstance(w, (int, float)) or w < 0 for w in variants.values()):
+                print(f"Warning: Invalid variant weights for {category}: {variants}")
+                return False
+            count = count.get('count')
         if not isinstance(count, int) or count < 0:
             print(f"Warning: Invalid count for {category}: {count}")
             return False
@@ -89,6 +148,15 @@ def main():
             print("Error: Invalid density configuration")
             sys.exit(1)
             
+        # Load density rasters
+        density_rasters = None
+        if args.density_rasters:
+            try:
+                density_rasters = json.loads(args.density_rasters)
+            except json.JSONDecodeError:
+                print("Error: Invalid JSON string for density rasters")
+                sys.exit(1)
+
         print("\nInitializing World Populator...")
         print(f"Base path: {base_path}")
         print("\nDensity configuration:")
@@ -98,8 +166,38 @@ def main():
         # Create and populate the world
         populator = WorldPopulator(base_path)
         
+        if args.count > 1 or args.output_pattern:
+            print(f"\nGenerating {args.count} forest worlds...")
+            manifest_path = populator.create_forest_worlds(
+                args.count,
+                density,
+                output_pattern=args.output_pattern or "forest_world_{index:04d}.world",
+                density_jitter=args.density_jitter,
+                seed=args.seed,
+                workers=args.workers,
+                manifest_path=args.manifest,
+                placement=args.placement,
+                density_rasters=density_rasters,
+                position_decimals=args.position_decimals,
+                angle_decimals=args.angle_decimals,
+                compress=args.compress,
+                placement_tiles=args.placement_tiles
+            )
+            print(f"\nSuccess! {args.count} forest worlds listed in: {manifest_path}")
+            return
+
         print("\nGenerating forest world...")
-        world_path = populator.create_forest_world(density)
+        world_path = populator.create_forest_world(
+            density,
+            placement=args.placement,
+            density_rasters=density_rasters,
+            position_decimals=args.position_decimals,
+            angle_decimals=args.angle_decimals,
+            compress=args.compress,
+            seed=args.seed,
+            placement_tiles=args.placement_tiles,
+            workers=args.workers
+        )
 
         print(f"\nSuccess! Forest world created at: {world_path}")
         print(f"\nTo view in Gazebo:")
@@ -0,0 +1,72 @@
+import sys
+from pathlib import Path
+
+import numpy as np
+import pytest
+
+# The scripts import each other as top-level modules
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "scripts"))
+
+CATEGORIES = ['tree', 'bush', 'rock', 'grass', 'sand']
+
+
+def synthetic_elevation(size=81, seed=0):
+    """Smooth random hills of shape (size, size)"""
+    from scipy.ndimage import gaussian_filter
+    rng = np.random.default_rng(seed)
+    return gaussian_filter(rng.normal(0, 20, (size, size)), sigma=size / 8)
+
+
+def grid_mesh_arrays(elevation, spacing=2.5):
+    """Centered vertices and faces of a regular grid, two triangles per cell"""
+    rows, cols = elevation.shape
+    grid_x, grid_y = np.meshgrid(np.arange(cols) * spacing, np.arange(rows) * spacing)
+    vertices = np.column_stack([grid_x.ravel(), grid_y.ravel(), elevation.ravel()])
+    vertices -= vertices.mean(axis=0)
+
+    v0 = (np.arange(rows - 1)[:, None] * cols + np.arange(cols - 1)[None, :]).ravel()
+    faces = np.empty((2 * len(v0), 3), dtype=np.int64)
+    faces[0::2] = np.column_stack([v0, v0 + 1, v0 + cols])
+    faces[1::2] = np.column_stack([v0 + 1, v0 + cols + 1, v0 + cols])
+    return vertices, faces
+
+
+def stl_mesh(vertices, faces):
+    from stl import mesh
+    terrain = mesh.Mesh(np.zeros(len(faces), dtype=mesh.Mesh.dtype))
+    terrain.vectors[:] = vertices[faces]
+    return terrain
+
+
+def plane_heights(vectors, xy):
+    """Height of the triangle containing each point, by brute force over all triangles"""
+    a, b, c = (vectors[:, i].astype(np.float64) for i in range(3))
+    d1 = b[:, :2] - a[:, :2]
+    d2 = c[:, :2] - a[:, :2]
+    denom = d1[:, 0] * d2[:, 1] - d2[:, 0] * d1[:, 1]
+
+    heights = np.full(len(xy), np.nan)
+    for i, point in enumerate(xy):
+        offset = point - a[:, :2]
+        w1 = (offset[:, 0] * d2[:, 1] - d2[:, 0] * offset[:, 1]) / denom
+        w2 = (d1[:, 0] * offset[:, 1] - offset[:, 0] * d1[:, 1]) / denom
+        inside = np.flatnonzero((w1 >= -1e-9) & (w2 >= -1e-9) & (w1 + w2 <= 1 + 1e-9))
+        z = (1 - w1 - w2) * a[:, 2] + w1 * b[:, 2] + w2 * c[:, 2]
+        # Points on a shared edge lie on both triangles
+        heights[i] = z[inside[0]]
+        np.testing.assert_allclose(z[inside], heights[i], atol=1e-4)
+    return heights
+
+
+@pytest.fixture
+def project(tmp_path):
+    """Project tree with two variants per category and a 200 m synthetic terrain STL"""
+    for category in CATEGORIES:
+        for variant in ('a', 'b'):
+            (tmp_path / "models" / category / f"{category}_{variant}").mkdir(parents=True)
+    (tmp_path / "models/ground/mesh").mkdir(parents=True)
+    (tmp_path / "models/ground/dem").mkdir(parents=True)
+    (tmp_path / "worlds").mkdir()
+    stl_mesh(*grid_mesh_arrays(synthetic_elevation())).save(
+        str(tmp_path / "models/ground/mesh/terrain.stl"))
+    return tmp_path
@@ -0,0 +1,68 @@
+import numpy as np
+import pytest
+
+from conftest import synthetic_elevation, plane_heights
+from AdaptiveMesher import AdaptiveMesher
+
+
+def mesh_deviation(heights, cols, rows, faces):
+    """Actual maximum vertical deviation of the mesh from every grid point"""
+    vertices = np.column_stack([cols, rows, heights[rows, cols]]).astype(np.float64)
+    grid_col, grid_row = np.meshgrid(np.arange(heights.shape[1]), np.arange(heights.shape[0]))
+    xy = np.column_stack([grid_col.ravel(), grid_row.ravel()])
+    return np.abs(plane_heights(vertices[faces], xy) - heights.ravel()).max()
+
+
+@pytest.mark.parametrize("shape", [(33, 33), (21, 37)])
+@pytest.mark.parametrize("max_error", [0.1, 0.5, 2.0])
+def test_reported_error_is_within_bound_and_exact(shape, max_error):
+    heights = synthetic_elevation(size=max(shape))[:shape[0], :shape[1]]
+    cols, rows, faces, error = AdaptiveMesher(heights).mesh(max_error=max_error)
+
+    assert error <= max_error
+    assert error == pytest.approx(mesh_deviation(heights, cols, rows, faces), abs=1e-9)
+
+
+def test_zero_error_keeps_the_full_grid():
+    heights = synthetic_elevation(size=17)
+    cols, rows, faces, error = AdaptiveMesher(heights).mesh(max_error=0.0)
+
+    assert error == pytest.approx(0.0, abs=1e-9)
+    assert len(cols) == 17 * 17
+    assert len(faces) == 2 * 16 * 16
+
+
+def test_larger_error_gives_fewer_triangles():
+    mesher = AdaptiveMesher(synthetic_elevation(size=65))
+    counts = [len(mesher.mesh(max_error=e)[2]) for e in (0.0, 0.05, 0.2, 1.0)]
+
+    assert counts == sorted(counts, reverse=True)
+    assert counts[-1] < counts[0] / 4
+
+
+def test_triangle_budget_is_respected():
+    mesher = AdaptiveMesher(synthetic_elevation(size=65))
+    _, _, faces, error = mesher.mesh(max_triangles=1000)
+    _, _, finer_faces, finer_error = mesher.mesh(max_error=error / 2)
+
+    assert len(faces) <= 1000
+    assert finer_error <= error and len(finer_faces) > len(faces)
+
+
+def test_border_vertices_are_kept_and_faces_counter_clockwise():
+    heights = synthetic_elevation(size=37)[:21]
+    cols, rows, faces, _ = AdaptiveMesher(heights).mesh(max_error=5.0)
+
+    used = set(zip(cols.tolist(), rows.tolist()))
+    border = ({(c, r) for c in range(37) for r in (0, 20)} |
+              {(c, r) for c in (0, 36) for r in range(21)})
+    assert border <= used
+
+    a, b, c = (np.column_stack([cols, rows])[faces[:, i]] for i in range(3))
+    cross = (b[:, 0] - a[:, 0]) * (c[:, 1] - a[:, 1]) - (b[:, 1] - a[:, 1]) * (c[:, 0] - a[:, 0])
+    assert (cross > 0).all()
+
+
+def test_needs_a_2x2_grid():
+    with pytest.raises(ValueError):
+        AdaptiveMesher(np.zeros((1, 5)))
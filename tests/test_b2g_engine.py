@@ -0,0 +1,196 @@
+import json
+import os
+import stat
+import sys
+
+import pytest
+
+from B2GEngine import AssetExporter, run_exports
+
+# Stand-in for `blender --background --python <script> [-- args]`: runs the
+# export script against a minimal fake bpy whose collada_export writes the
+# target file, and logs every session to $STUB_BLENDER_LOG.
+STUB_BLENDER = '''#!{python}
+import json
+import os
+import sys
+import types
+
+class Collection:
+    def __init__(self):
+        self.objects = types.SimpleNamespace(link=lambda obj: None)
+
+class Object:
+    def __init__(self, name):
+        self.name = name
+        self.type = 'MESH'
+        self.parent = None
+        self.data = types.SimpleNamespace(copy=lambda: None)
+        self.users_collection = [Collection()]
+        self.modifiers = types.SimpleNamespace(
+            new=lambda name, type: types.SimpleNamespace(name=name, ratio=1.0))
+
+    def select_set(self, state):
+        pass
+
+    def copy(self):
+        return Object(self.name + "_copy")
+
+def open_mainfile(filepath):
+    if not os.path.exists(filepath):
+        raise RuntimeError(f"Cannot read file: {{filepath}}")
+    bpy.data.objects = [Object("mesh")]
+
+def collada_export(filepath, **kwargs):
+    with open(filepath, "w") as f:
+        f.write("<COLLADA/>")
+
+bpy = types.ModuleType("bpy")
+bpy.data = types.SimpleNamespace(objects=[])
+bpy.context = types.SimpleNamespace(
+    view_layer=types.SimpleNamespace(objects=types.SimpleNamespace(active=None)))
+bpy.ops = types.SimpleNamespace(
+    wm=types.SimpleNamespace(open_mainfile=open_mainfile, collada_export=collada_export),
+    object=types.SimpleNamespace(modifier_apply=lambda modifier: None,
+                                 select_all=lambda action: None))
+sys.modules["bpy"] = bpy
+
+script = sys.argv[sys.argv.index("--python") + 1]
+if "--" in sys.argv:
+    with open(sys.argv[sys.argv.index("--") + 1]) as f:
+        assets = [item["blend_file"] for item in json.load(f)]
+else:
+    assets = ["single"]
+with open(os.environ["STUB_BLENDER_LOG"], "a") as f:
+    f.write(json.dumps(assets) + "\\n")
+
+with open(script) as f:
+    code = f.read()
+exec(compile(code, script, "exec"), {{"__name__": "__main__"}})
+'''
+
+
+@pytest.fixture
+def stub_blender(tmp_path, monkeypatch):
+    """Put a stub blender on PATH and return the path of its session log"""
+    bin_dir = tmp_path / "bin"
+    bin_dir.mkdir()
+    blender = bin_dir / "blender"
+    blender.write_text(STUB_BLENDER.format(python=sys.executable))
+    blender.chmod(blender.stat().st_mode | stat.S_IXUSR)
+
+    log_path = tmp_path / "sessions.log"
+    log_path.touch()
+    monkeypatch.setenv("PATH", f"{bin_dir}{os.pathsep}{os.environ['PATH']}")
+    monkeypatch.setenv("STUB_BLENDER_LOG", str(log_path))
+    return log_path
+
+
+def _sessions(log_path):
+    return [json.loads(line) for line in log_path.read_text().splitlines()]
+
+
+def _make_jobs(tmp_path, count):
+    """count fake .blend files split over two categories"""
+    source_dir = tmp_path / "blend"
+    source_dir.mkdir()
+    jobs = []
+    for i in range(count):
+        blend_file = source_dir / f"asset_{i}.blend"
+        blend_file.write_bytes(f"blend {i}".encode())
+        category = "tree" if i % 2 == 0 else "rock"
+        jobs.append((str(blend_file), str(tmp_path / "models" / category)))
+    return jobs
+
+
+def _assert_exported(jobs):
+    for blend_file, category_dir in jobs:
+        name = os.path.splitext(os.path.basename(blend_file))[0]
+        asset_dir = os.path.join(category_dir, name)
+        assert os.path.exists(os.path.join(asset_dir, "mesh", f"{name}.dae"))
+        assert os.path.exists(os.path.join(asset_dir, "mesh", f"{name}_collision.dae"))
+        assert os.path.exists(os.path.join(asset_dir, "model.sdf"))
+
+
+def test_blender_found_on_path(stub_blender):
+    exporter = AssetExporter(show_progress=False)
+    assert exporter.blender_path == str(stub_blender.parent / "bin" / "blender")
+
+
+def test_batch_size_chunks_blender_sessions(tmp_path, stub_blender):
+    jobs = _make_jobs(tmp_path, 5)
+    exporter = AssetExporter(show_progress=False)
+
+    failures = run_exports(exporter, jobs, batch_size=2)
+
+    assert failures == []
+    sessions = _sessions(stub_blender)
+    assert [len(assets) for assets in sessions] == [2, 2, 1]
+    assert [blend for assets in sessions for blend in assets] == [blend for blend, _ in jobs]
+    _assert_exported(jobs)
+
+
+def test_single_asset_sessions(tmp_path, stub_blender):
+    jobs = _make_jobs(tmp_path, 3)
+    exporter = AssetExporter(show_progress=False)
+
+    assert run_exports(exporter, jobs) == []
+    assert _sessions(stub_blender) == [["single"]] * 3
+    _assert_exported(jobs)
+
+
+@pytest.mark.parametrize("batch_size", [1, 2])
+def test_jobs_export_in_parallel_with_logs(tmp_path, stub_blender, batch_size):
+    jobs = _make_jobs(tmp_path, 4)
+    missing = str(tmp_path / "blend" / "missing.blend")
+    jobs.append((missing, str(tmp_path / "models" / "tree")))
+    log_dir = tmp_path / "logs"
+    exporter = AssetExporter(show_progress=False)
+
+    failures = run_exports(exporter, jobs, num_jobs=2, log_dir=str(log_dir),
+                           batch_size=batch_size)
+
+    assert failures == [missing]
+    assert len(_sessions(stub_blender)) == -(-len(jobs) // batch_size)
+    assert len(list(log_dir.iterdir())) == -(-len(jobs) // batch_size)
+    _assert_exported(jobs[:-1])
+
+
+def test_manifest_skips_up_to_date_assets(tmp_path, stub_blender):
+    jobs = _make_jobs(tmp_path, 4)
+    exporter = AssetExporter(show_progress=False)
+    assert run_exports(exporter, jobs, batch_size=4) == []
+    for category_dir in {category_dir for _, category_dir in jobs}:
+        assert os.path.exists(os.path.join(category_dir, AssetExporter.MANIFEST_NAME))
+
+    # Unchanged sources are skipped
+    stub_blender.write_text("")
+    assert run_exports(exporter, jobs, batch_size=4) == []
+    assert _sessions(stub_blender) == []
+
+    # A touched but identical file is matched by its content hash
+    os.utime(jobs[0][0], ns=(0, 0))
+    assert run_exports(exporter, jobs, batch_size=4) == []
+    assert _sessions(stub_blender) == []
+
+    # Only the changed source is exported again
+    with open(jobs[1][0], "ab") as f:
+        f.write(b" edited")
+    assert run_exports(exporter, jobs, batch_size=4) == []
+    assert _sessions(stub_blender) == [[jobs[1][0]]]
+
+    # --force exports everything
+    stub_blender.write_text("")
+    assert run_exports(exporter, jobs, batch_size=4, force=True) == []
+    assert _sessions(stub_blender) == [[blend for blend, _ in jobs]]
+
+
+def test_changed_settings_invalidate_manifest(tmp_path, stub_blender, monkeypatch):
+    jobs = _make_jobs(tmp_path, 2)
+    exporter = AssetExporter(show_progress=False)
+    assert run_exports(exporter, jobs, batch_size=2) == []
+
+    stub_blender.write_text("")
+    monkeypatch.setattr(AssetExporter, "VISUAL_DECIMATE_RATIO", 0.2)
+    assert run_exports(exporter, jobs, batch_size=2) == []
+    assert len(_sessions(stub_blender)) == 1
@@ -0,0 +1,168 @@
+import json
+from pathlib import Path
+
+import numpy as np
+import pytest
+from scipy.spatial import cKDTree
+
+from ForestGenerator import WorldPopulator
+from benchmark import _check_distance_to_placed_linear
+
+DENSITY = {'tree': 150, 'bush': 150, 'rock': 20, 'grass': 2000, 'sand': 20}
+
+
+@pytest.fixture
+def populator(project):
+    populator = WorldPopulator(project)
+    populator.load_terrain()
+    return populator
+
+
+def placed_xy(populator):
+    return {category: np.array(placed).reshape(-1, 3)[:, :2]
+            for category, placed in populator.placed_models.items()}
+
+
+def assert_no_violations(populator, xy=None):
+    """Check MIN_DISTANCES within and EXCLUSIONS across categories"""
+    xy = xy if xy is not None else placed_xy(populator)
+    for category, points in xy.items():
+        # Distances equal to the minimum are allowed
+        radius = populator.MIN_DISTANCES[category] * (1 - 1e-9)
+        assert not cKDTree(points).query_pairs(radius), f"{category} too close"
+        for other in populator.EXCLUSIONS.get(category, []):
+            if len(xy[other]) and len(points):
+                near = cKDTree(xy[other]).query_ball_point(
+                    points, populator.MIN_DISTANCES[other] * (1 - 1e-9))
+                assert not any(near), f"{category} too close to {other}"
+
+
+def instance_xy(populator):
+    return {category: np.column_stack([instances['x'], instances['y']])
+            for category, instances in populator.placed_instances.items()}
+
+
+def edge_count(populator, instances, margin=2.0):
+    return sum(populator.terrain_info.is_edge(x, y, margin)
+               for x, y in zip(instances['x'], instances['y']))
+
+
+def test_cluster_placement_keeps_distances(populator):
+    populator.create_forest_world(DENSITY, placement='cluster', seed=10, write=False)
+
+    assert_no_violations(populator, instance_xy(populator))
+    for category, count in DENSITY.items():
+        assert len(populator.placed_instances[category]) == count
+
+
+def test_density_placement_keeps_distances(populator):
+    populator.create_forest_world(DENSITY, placement='density', seed=6, write=False)
+
+    assert_no_violations(populator, instance_xy(populator))
+
+
+def test_density_placement_keeps_zone_shares(populator):
+    density = {'tree': 300, 'bush': 300, 'rock': 20, 'grass': 8000, 'sand': 20}
+    seeds = range(8)
+    edge = dict.fromkeys(density, 0)
+    for seed in seeds:
+        populator.create_forest_world(density, placement='density', seed=seed, write=False)
+        for category, count in density.items():
+            instances = populator.placed_instances[category]
+            assert len(instances) == count
+            edge[category] += edge_count(populator, instances)
+
+    for category in ['tree', 'bush', 'grass']:
+        share = edge[category] / (density[category] * len(seeds))
+        # Well beyond the binomial spread of the zone draws, under 0.01
+        assert share == pytest.approx(populator.ZONE_WEIGHTS[category]['edge'], abs=0.03)
+
+
+def test_rejection_placement_keeps_distances(populator):
+    populator.create_forest_world(DENSITY, seed=3, write=False)
+
+    assert_no_violations(populator)
+
+
+def test_spatial_index_matches_linear_check(populator):
+    populator.create_forest_world(DENSITY, seed=4, write=False)
+    indexed = populator.placed_instances
+
+    populator._check_distance_to_placed = (
+        lambda x, y, category: _check_distance_to_placed_linear(populator, x, y, category))
+    populator.create_forest_world(DENSITY, seed=4, write=False)
+
+    for category in DENSITY:
+        np.testing.assert_array_equal(populator.placed_instances[category], indexed[category])
+
+
+def test_poisson_placement_keeps_distances(populator):
+    populator.create_forest_world(DENSITY, placement='poisson', seed=5, write=False)
+
+    assert_no_violations(populator, instance_xy(populator))
+    for category, count in DENSITY.items():
+        assert len(populator.placed_instances[category]) == count
+
+
+@pytest.mark.parametrize("placement", WorldPopulator.PLACEMENT_MODES)
+def test_same_seed_same_world(populator, tmp_path, placement):
+    worlds = []
+    for name in ('first', 'second'):
+        path = populator.create_forest_world(DENSITY, placement=placement, seed=7,
+                                             output_path=tmp_path / f"{name}.world")
+        worlds.append(path.read_bytes())
+
+    assert worlds[0] == worlds[1]
+    populator.create_forest_world(DENSITY, placement=placement, seed=8,
+                                  output_path=tmp_path / "other.world")
+    assert (tmp_path / "other.world").read_bytes() != worlds[0]
+
+
+def test_category_streams_are_independent(populator):
+    populator.create_forest_world(DENSITY, seed=9, write=False)
+    placed = dict(populator.placed_instances)
+    populator.create_forest_world(dict(DENSITY, grass=10, bush=5), seed=9, write=False)
+
+    for category in ('tree', 'rock', 'sand'):
+        np.testing.assert_array_equal(populator.placed_instances[category], placed[category])
+
+
+@pytest.mark.parametrize("placement", WorldPopulator.TILED_PLACEMENT_MODES)
+def test_tiled_placement_is_independent_of_workers(populator, placement):
+    placed = {}
+    for workers in (1, 4):
+        populator.create_forest_world(DENSITY, placement=placement, seed=11,
+                                      placement_tiles=(3, 3), workers=workers, write=False)
+        placed[workers] = dict(populator.placed_instances)
+        # No conflicts across tile borders either
+        assert_no_violations(populator, instance_xy(populator))
+
+    for category, count in DENSITY.items():
+        assert len(placed[1][category]) == count
+        np.testing.assert_array_equal(placed[1][category], placed[4][category])
+
+
+def test_tiled_placement_rejects_other_modes(populator):
+    with pytest.raises(ValueError):
+        populator.create_forest_world(DENSITY, placement='density', placement_tiles=(2, 2),
+                                      write=False)
+
+
+def test_batch_is_independent_of_workers_and_rebuildable(populator, tmp_path):
+    worlds = {}
+    for workers in (1, 2):
+        manifest_path = populator.create_forest_worlds(
+            3, DENSITY, output_pattern=str(tmp_path / f"w{workers}" / "world_{index}.world"),
+            density_jitter=0.2, seed=12, workers=workers, placement='poisson',
+            manifest_path=tmp_path / f"manifest_{workers}.json")
+        manifest = json.loads(manifest_path.read_text())
+        worlds[workers] = [Path(world['path']).read_bytes() for world in manifest['worlds']]
+
+    assert worlds[1] == worlds[2]
+    assert len(set(worlds[1])) == 3
+
+    # Any world can be rebuilt alone from its manifest entry
+    world = manifest['worlds'][1]
+    path = populator.create_forest_world(world['density'], placement='poisson',
+                                         seed=world['seed'], output_path=tmp_path / "alone.world")
+    assert path.read_bytes() == worlds[1][1]
@@ -0,0 +1,64 @@
+import numpy as np
+import pytest
+from stl import mesh
+
+from MeshExporter import MeshExporter
+
+
+def grid_mesh(size=129, pixel=1.0, seed=0):
+    """Centered regular terrain grid, two triangles per cell like TerrainGenerator"""
+    rng = np.random.default_rng(seed)
+    elevation = np.cumsum(np.cumsum(rng.normal(size=(size, size)), 0), 1) * 0.05 + 1500
+    grid_x, grid_y = np.meshgrid(np.arange(size) * pixel, np.arange(size) * -pixel)
+    vertices = np.column_stack([grid_x.ravel(), grid_y.ravel(), elevation.ravel()])
+    vertices -= vertices.mean(axis=0)
+
+    v0 = (np.arange(size - 1)[:, None] * size + np.arange(size - 1)[None, :]).ravel()
+    faces = np.empty((2 * len(v0), 3), dtype=np.int64)
+    faces[0::2] = np.column_stack([v0, v0 + 1, v0 + size])
+    faces[1::2] = np.column_stack([v0 + 1, v0 + size + 1, v0 + size])
+    return vertices, faces
+
+
+def write_stl(path, vertices, faces):
+    terrain = mesh.Mesh(np.zeros(len(faces), dtype=mesh.Mesh.dtype))
+    terrain.vectors[:] = vertices[faces]
+    terrain.save(str(path))
+
+
+def read_obj(path):
+    vertices, faces = [], []
+    with open(path) as f:
+        for line in f:
+            kind, *values = line.split()
+            if kind == 'v':
+                vertices.append([float(v) for v in values])
+            elif kind == 'f':
+                faces.append([int(v) - 1 for v in values])
+    return np.array(vertices), np.array(faces)
+
+
+@pytest.mark.parametrize("pixel", [1.0, 30.0])
+@pytest.mark.parametrize("fmt", MeshExporter.FORMATS)
+def test_indexed_mesh_smaller_than_stl(tmp_path, fmt, pixel):
+    vertices, faces = grid_mesh(pixel=pixel)
+    write_stl(tmp_path / "terrain.stl", vertices, faces)
+    MeshExporter.write(tmp_path / f"terrain.{fmt}", vertices, faces)
+
+    ratio = ((tmp_path / f"terrain.{fmt}").stat().st_size /
+             (tmp_path / "terrain.stl").stat().st_size)
+    assert ratio < (0.8 if fmt == 'obj' else 0.55)
+
+
+def test_obj_round_trip(tmp_path):
+    vertices, faces = grid_mesh(size=33)
+    MeshExporter.write(tmp_path / "terrain.obj", vertices, faces)
+
+    read_vertices, read_faces = read_obj(tmp_path / "terrain.obj")
+    np.testing.assert_array_equal(read_faces, faces)
+    np.testing.assert_allclose(read_vertices, vertices, atol=5e-4)
+
+
+def test_unknown_format(tmp_path):
+    with pytest.raises(ValueError):
+        MeshExporter.write(tmp_path / "terrain.xyz", *grid_mesh(size=3))
@@ -0,0 +1,185 @@
+import numpy as np
+import pytest
+from scipy.spatial import cKDTree
+
+from PlacementSampler import PoissonDiskSampler, DensityRasterSampler, ClusterProcessSampler
+from TerrainSampler import TerrainInfo
+
+BOUNDS = (-20.0, 20.0, -10.0, 10.0)
+
+
+def min_distance(points):
+    distance, _ = cKDTree(points).query(points, k=2)
+    return distance[:, 1].min()
+
+
+def inside(points, bounds):
+    min_x, max_x, min_y, max_y = bounds
+    return ((points[:, 0] >= min_x) & (points[:, 0] <= max_x) &
+            (points[:, 1] >= min_y) & (points[:, 1] <= max_y)).all()
+
+
+def test_poisson_points_keep_radius_and_bounds():
+    points = PoissonDiskSampler(BOUNDS, 1.5, rng=np.random.default_rng(0)).sample(200)
+
+    assert len(points) == 200
+    assert inside(points, BOUNDS)
+    assert min_distance(points) >= 1.5
+
+
+def test_poisson_points_keep_clear_of_exclusions():
+    rng = np.random.default_rng(1)
+    rocks = rng.uniform(-20, 20, (30, 2)) * [1, 0.5]
+    points = PoissonDiskSampler(BOUNDS, 1.0, exclusions=[(rocks, 3.0)], rng=rng).sample(300)
+
+    distance, _ = cKDTree(rocks).query(points)
+    assert distance.min() >= 3.0
+    assert min_distance(points) >= 1.0
+
+
+def test_poisson_saturates_instead_of_overfilling():
+    bounds = (0.0, 20.0, 0.0, 20.0)
+    points = PoissonDiskSampler(bounds, 1.0, rng=np.random.default_rng(2)).sample(10000)
+
+    # Random close packing fits about 280 discs, a hexagonal packing about 460
+    assert 200 < len(points) < 470
+    assert min_distance(points) >= 1.0
+
+
+def test_poisson_same_seed_same_points():
+    first = PoissonDiskSampler(BOUNDS, 1.0, rng=np.random.default_rng(3)).sample(500)
+    second = PoissonDiskSampler(BOUNDS, 1.0, rng=np.random.default_rng(3)).sample(500)
+
+    np.testing.assert_array_equal(first, second)
+
+
+def test_filter_resolves_conflicts_inside_the_batch():
+    sampler = PoissonDiskSampler(BOUNDS, 1.0)
+    candidates = np.array([[0.0, 0.0], [0.5, 0.0], [5.0, 0.0], [30.0, 0.0]])
+    accepted = np.array([[5.0, 0.9]])
+
+    np.testing.assert_array_equal(sampler.accept_mask(candidates, accepted),
+                                  [True, False, False, False])
+    np.testing.assert_array_equal(sampler.filter(candidates), [[0.0, 0.0], [5.0, 0.0]])
+    np.testing.assert_array_equal(sampler.filter(candidates, limit=1), [[0.0, 0.0]])
+
+
+@pytest.mark.parametrize("bounds, radius", [((0, 0, 0, 1), 1.0), (BOUNDS, 0.0)])
+def test_poisson_rejects_bad_arguments(bounds, radius):
+    with pytest.raises(ValueError):
+        PoissonDiskSampler(bounds, radius)
+
+
+def cell_counts(points, shape, bounds):
+    min_x, max_x, min_y, max_y = bounds
+    counts, _, _ = np.histogram2d(points[:, 1], points[:, 0], bins=shape,
+                                  range=[[min_y, max_y], [min_x, max_x]])
+    return counts
+
+
+def test_density_points_follow_the_raster():
+    density = np.array([[1.0, 3.0, 0.0], [0.0, 2.0, 4.0]])
+    sampler = DensityRasterSampler(density, BOUNDS, rng=np.random.default_rng(4))
+    points = sampler.sample(50000)
+
+    assert inside(points, BOUNDS)
+    shares = cell_counts(points, density.shape, BOUNDS) / len(points)
+    np.testing.assert_allclose(shares, density / density.sum(), atol=0.01)
+    assert (shares[density == 0] == 0).all()
+
+
+def test_density_clip_keeps_points_inside_and_scales_cut_cells():
+    density = np.ones((2, 4))
+    sampler = DensityRasterSampler(density, BOUNDS, rng=np.random.default_rng(5))
+    # Keeps the full right half and half of the second column
+    clipped = (-5.0, 20.0, -10.0, 10.0)
+    sampler.clip(clipped)
+    points = sampler.sample(50000)
+
+    assert inside(points, clipped)
+    shares = cell_counts(points, density.shape, BOUNDS) / len(points)
+    np.testing.assert_allclose(shares, np.array([[0, 0.5, 1, 1]] * 2) / 5, atol=0.01)
+
+
+def test_density_redraws_stay_within_the_level():
+    density = np.array([[1.0, 1.0, 2.0], [2.0, 1.0, 5.0]])
+    sampler = DensityRasterSampler(density, BOUNDS, rng=np.random.default_rng(6))
+    cells = sampler.sample_cells(1000)
+    redrawn = sampler.redraw_cells(cells)
+
+    np.testing.assert_array_equal(density.ravel()[redrawn], density.ravel()[cells])
+    # The single cell of density 5 can only be redrawn to itself
+    assert (redrawn[cells == 5] == 5).all()
+
+
+def test_zone_weight_raster_keeps_the_edge_share():
+    info = TerrainInfo(-50, 50, -50, 50, 0, 10, 1.0, 1.0, edge_width=5.0)
+    sampler = DensityRasterSampler.from_zone_weights(info, 0.2, margin=2.0,
+                                                     rng=np.random.default_rng(7))
+    points = sampler.sample(50000)
+
+    edge = np.array([info.is_edge(x, y, 2.0) for x, y in points])
+    assert edge.mean() == pytest.approx(0.2, abs=0.01)
+
+
+def test_density_same_seed_same_points():
+    density = np.random.default_rng(8).uniform(0, 1, (16, 16))
+    first = DensityRasterSampler(density, BOUNDS, rng=np.random.default_rng(9)).sample(100)
+    second = DensityRasterSampler(density, BOUNDS, rng=np.random.default_rng(9)).sample(100)
+
+    np.testing.assert_array_equal(first, second)
+
+
+@pytest.mark.parametrize("density", [np.zeros((2, 2)), -np.ones((2, 2)), np.ones(4)])
+def test_density_rejects_bad_rasters(density):
+    with pytest.raises(ValueError):
+        DensityRasterSampler(density, BOUNDS)
+
+
+@pytest.mark.parametrize("kernel", ClusterProcessSampler.KERNELS)
+def test_cluster_points_keep_radius_and_exclusions(kernel):
+    rng = np.random.default_rng(10)
+    rocks = rng.uniform(-20, 20, (8, 2)) * [1, 0.5]
+    sampler = ClusterProcessSampler(BOUNDS, 1.0, 2.0, cluster_share=0.7,
+                                    exclusions=[(rocks, 3.0)], rng=rng, kernel=kernel)
+    points = sampler.sample(100)
+
+    assert len(points) == 100
+    assert inside(points, BOUNDS)
+    assert min_distance(points) >= 1.0
+    assert cKDTree(rocks).query(points)[0].min() >= 3.0
+
+
+def test_matern_children_stay_around_fixed_parents():
+    parents = np.array([[-10.0, 0.0], [10.0, 0.0]])
+    sampler = ClusterProcessSampler(BOUNDS, 0.5, 3.0, parents=parents,
+                                    rng=np.random.default_rng(11), kernel='matern')
+    points = sampler.sample(40)
+
+    assert len(points) == 40
+    assert cKDTree(parents).query(points)[0].max() <= 3.0
+
+
+def test_clustered_points_are_closer_than_poisson_points():
+    clustered = ClusterProcessSampler(BOUNDS, 0.5, 1.0, rng=np.random.default_rng(12)).sample(80)
+    spread = PoissonDiskSampler(BOUNDS, 0.5, rng=np.random.default_rng(12)).sample(80)
+
+    def mean_nearest(points):
+        return cKDTree(points).query(points, k=2)[0][:, 1].mean()
+
+    assert mean_nearest(clustered) < 0.8 * mean_nearest(spread)
+
+
+def test_cluster_same_seed_same_points():
+    first = ClusterProcessSampler(BOUNDS, 1.0, 2.0, rng=np.random.default_rng(13)).sample(200)
+    second = ClusterProcessSampler(BOUNDS, 1.0, 2.0, rng=np.random.default_rng(13)).sample(200)
+
+    np.testing.assert_array_equal(first, second)
+
+
+@pytest.mark.parametrize("arguments", [dict(kernel='gauss'), dict(cluster_radius=0.0),
+                                       dict(mean_children=0.0)])
+def test_cluster_rejects_bad_arguments(arguments):
+    with pytest.raises(ValueError):
+        ClusterProcessSampler(**dict(dict(bounds=BOUNDS, radius=1.0, cluster_radius=2.0),
+                                     **arguments))
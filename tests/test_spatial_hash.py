@@ -0,0 +1,59 @@
+import numpy as np
+import pytest
+
+from SpatialHash import SpatialHash
+
+
+def brute_force_within(points, x, y, radius):
+    return bool(len(points)) and bool((np.hypot(points[:, 0] - x, points[:, 1] - y) < radius).any())
+
+
+@pytest.mark.parametrize("cell_size, radius", [(1.0, 1.0), (0.5, 2.0), (4.0, 1.0)])
+def test_any_within_matches_brute_force(cell_size, radius):
+    rng = np.random.default_rng(0)
+    points = rng.uniform(-20, 20, (300, 2))
+    index = SpatialHash(cell_size)
+    for x, y in points:
+        index.insert(x, y)
+
+    for x, y in rng.uniform(-25, 25, (2000, 2)):
+        assert index.any_within(x, y, radius) == brute_force_within(points, x, y, radius)
+
+
+def test_insert_many_matches_insert():
+    rng = np.random.default_rng(1)
+    points = rng.uniform(-10, 10, (200, 2))
+    single = SpatialHash(1.0)
+    for x, y in points:
+        single.insert(x, y)
+    batched = SpatialHash(1.0)
+    batched.insert_many(points[:120])
+    batched.insert_many(points[120:])
+
+    assert len(batched) == len(single) == len(points)
+    for x, y in rng.uniform(-12, 12, (1000, 2)):
+        assert batched.any_within(x, y, 0.7) == single.any_within(x, y, 0.7)
+
+
+def test_distance_is_strict():
+    index = SpatialHash(1.0)
+    index.insert(0.0, 0.0)
+
+    assert not index.any_within(1.0, 0.0, 1.0)
+    assert index.any_within(0.999, 0.0, 1.0)
+
+
+def test_clear_removes_pending_points():
+    index = SpatialHash(1.0)
+    index.insert(0.0, 0.0)
+    index.insert_many(np.array([[5.0, 5.0]]))
+    index.clear()
+
+    assert len(index) == 0
+    assert not index.any_within(0.0, 0.0, 1.0)
+    assert not index.any_within(5.0, 5.0, 1.0)
+
+
+def test_cell_size_must_be_positive():
+    with pytest.raises(ValueError):
+        SpatialHash(0)
@@ -0,0 +1,68 @@
+import itertools
+import types
+
+import numpy as np
+import pytest
+
+import TerrainCache as terrain_cache
+from TerrainCache import TerrainCache
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    """Strictly increasing time.time() for the cache, so LRU order is deterministic"""
+    ticks = itertools.count(1000.0)
+    monkeypatch.setattr(terrain_cache, 'time', types.SimpleNamespace(time=lambda: next(ticks)))
+
+
+def test_put_and_get_round_trip(tmp_path, clock):
+    source = tmp_path / "terrain.stl"
+    source.write_bytes(b"solid terrain")
+    cache = TerrainCache(tmp_path / "cache")
+    key = cache.key('mesh', 'abc', 1.0)
+
+    assert cache.get(key) is None
+    cache.put(key, files={"terrain.stl": source}, arrays={"elevation.npy": np.eye(3)},
+              meta={"pixel_width": 30.0})
+    entry = cache.get(key)
+
+    assert (entry / "terrain.stl").read_bytes() == b"solid terrain"
+    np.testing.assert_array_equal(np.load(entry / "elevation.npy"), np.eye(3))
+    assert cache.read_meta(entry)["pixel_width"] == 30.0
+    # No temporary entries are left behind
+    assert [path.name for path in cache.cache_dir.iterdir()] == [key]
+
+
+def test_key_depends_on_every_part(tmp_path):
+    cache = TerrainCache(tmp_path)
+
+    assert cache.key('mesh', 'abc', 1.0) == cache.key('mesh', 'abc', 1.0)
+    assert cache.key('mesh', 'abc', 1.0) != cache.key('mesh', 'abc', 2.0)
+    assert cache.key('mesh', 'abc', 1.0) != cache.key('elevation', 'abc', 1.0)
+
+
+def test_file_hash_follows_content(tmp_path):
+    first, second = tmp_path / "a.tif", tmp_path / "b.tif"
+    first.write_bytes(b"dem")
+    second.write_bytes(b"dem")
+
+    assert TerrainCache.file_hash(first) == TerrainCache.file_hash(second)
+    second.write_bytes(b"dem2")
+    assert TerrainCache.file_hash(first) != TerrainCache.file_hash(second)
+
+
+def test_evicts_least_recently_used_entries(tmp_path, clock):
+    array = np.zeros(1000)
+    entry_size = TerrainCache(tmp_path / "probe").put("probe", arrays={"a.npy": array})
+    entry_size = sum(f.stat().st_size for f in entry_size.iterdir())
+    cache = TerrainCache(tmp_path / "cache", max_bytes=int(2.5 * entry_size))
+
+    cache.put("first", arrays={"a.npy": array})
+    cache.put("second", arrays={"a.npy": array})
+    # Using the first entry makes the second the least recently used
+    assert cache.get("first") is not None
+    cache.put("third", arrays={"a.npy": array})
+
+    assert cache.get("second") is None
+    assert cache.get("first") is not None
+    assert cache.get("third") is not None
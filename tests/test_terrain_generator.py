@@ -0,0 +1,19 @@
+import numpy as np
+import pytest
+
+from conftest import synthetic_elevation
+
+# TerrainGenerator reads DEMs through GDAL
+pytest.importorskip("osgeo")
+from TerrainGenerator import TerrainGenerator
+
+
+@pytest.mark.parametrize("pixel", [(1.0, 1.0, 1.0), (30.0, -30.0, 0.5)])
+def test_loop_and_vectorized_meshers_match(pixel):
+    elevation = synthetic_elevation(size=33).astype(np.float32)
+    meshes = {}
+    for mesher in ('loop', 'vectorized'):
+        vertices, faces = TerrainGenerator._build_mesh_arrays(elevation, *pixel, mesher)
+        meshes[mesher] = TerrainGenerator._create_stl_mesh(vertices, faces, mesher)
+
+    np.testing.assert_array_equal(meshes['loop'].vectors, meshes['vectorized'].vectors)
@@ -0,0 +1,72 @@
+import numpy as np
+import pytest
+
+from conftest import synthetic_elevation, grid_mesh_arrays, stl_mesh, plane_heights
+from AdaptiveMesher import AdaptiveMesher
+from TerrainSampler import TerrainSampler
+
+
+def random_points(terrain, count=500, seed=0):
+    points = terrain.vectors.reshape(-1, 3)
+    rng = np.random.default_rng(seed)
+    return rng.uniform(points[:, :2].min(axis=0), points[:, :2].max(axis=0), (count, 2))
+
+
+def test_regular_mesh_heights_match_triangle_planes():
+    terrain = stl_mesh(*grid_mesh_arrays(synthetic_elevation(size=17)))
+    sampler = TerrainSampler.from_mesh(terrain)
+    xy = random_points(terrain)
+
+    np.testing.assert_allclose(sampler.heights(xy), plane_heights(terrain.vectors, xy),
+                               atol=1e-4)
+
+
+def test_regular_mesh_grid_is_recovered():
+    elevation = synthetic_elevation(size=17)
+    vertices, faces = grid_mesh_arrays(elevation)
+    sampler = TerrainSampler.from_mesh(stl_mesh(vertices, faces))
+
+    assert sampler.shape == elevation.shape
+    np.testing.assert_allclose(sampler.grid.ravel(), vertices[:, 2], atol=1e-4)
+
+
+def test_adaptive_mesh_grid_points_lie_on_triangle_planes():
+    elevation = synthetic_elevation(size=33)
+    cols, rows, faces, _ = AdaptiveMesher(elevation).mesh(max_error=0.5)
+    vertices = np.column_stack([cols * 2.5, rows * 2.5, elevation[rows, cols]])
+    terrain = stl_mesh(vertices, faces)
+    assert len(faces) < 2 * 32 * 32
+
+    # Between grid points the sampler splits cells along one fixed diagonal
+    sampler = TerrainSampler.from_mesh(terrain)
+    grid_x, grid_y = np.meshgrid(np.arange(33) * 2.5, np.arange(33) * 2.5)
+    xy = np.column_stack([grid_x.ravel(), grid_y.ravel()])
+
+    np.testing.assert_allclose(sampler.heights(xy), plane_heights(terrain.vectors, xy),
+                               atol=1e-4)
+
+
+def test_positions_outside_the_grid_are_clamped():
+    sampler = TerrainSampler.from_elevation(synthetic_elevation(size=9), 1.0, 1.0)
+    corner = sampler.height(sampler.origin_x, sampler.origin_y)
+
+    assert sampler.height(sampler.origin_x - 10, sampler.origin_y - 10) == corner
+
+
+def test_save_and_load_round_trip(tmp_path):
+    sampler = TerrainSampler.from_elevation(synthetic_elevation(size=9), 30.0, 30.0)
+    sampler.save(tmp_path, source="test")
+    loaded = TerrainSampler.load(tmp_path)
+
+    np.testing.assert_array_equal(loaded.grid, sampler.grid)
+    assert (loaded.origin_x, loaded.origin_y, loaded.spacing_x, loaded.spacing_y) == (
+        sampler.origin_x, sampler.origin_y, sampler.spacing_x, sampler.spacing_y)
+
+
+def test_load_rejects_mismatched_shape(tmp_path):
+    sampler = TerrainSampler.from_elevation(synthetic_elevation(size=9), 1.0, 1.0)
+    sampler.save(tmp_path)
+    np.save(tmp_path / TerrainSampler.GRID_FILENAME, np.zeros((4, 4)))
+
+    with pytest.raises(ValueError):
+        TerrainSampler.load(tmp_path)
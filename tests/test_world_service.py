@@ -0,0 +1,104 @@
+import io
+
+import numpy as np
+import pytest
+
+from ForestGenerator import WorldPopulator
+from WorldService import WorldService
+
+DENSITY = {'tree': 40, 'bush': 40, 'rock': 5, 'grass': 300, 'sand': 5}
+
+
+@pytest.fixture
+def service(project):
+    """Started service with two pool workers"""
+    with WorldService(WorldPopulator(project), workers=2, seed=1) as service:
+        yield service
+
+
+@pytest.mark.parametrize("request_body", [
+    [], {}, {'density': {'cactus': 3}}, {'density': {'tree': -1}},
+    {'density': DENSITY, 'result': 'xml'},
+    {'density': DENSITY, 'seed': -1}, {'density': DENSITY, 'seed': True},
+    {'density': DENSITY, 'output': ''},
+    {'density': DENSITY, 'output': '../outside.world'},
+    {'density': DENSITY, 'output': '/tmp/outside.world'},
+])
+def test_invalid_requests_are_rejected(project, request_body):
+    service = WorldService(WorldPopulator(project))
+
+    with pytest.raises(ValueError):
+        service._make_job(request_body)
+
+
+def test_output_symlink_cannot_leave_the_worlds_directory(project, tmp_path_factory):
+    (project / "worlds/link").symlink_to(tmp_path_factory.mktemp("elsewhere"))
+    service = WorldService(WorldPopulator(project))
+
+    with pytest.raises(ValueError):
+        service._make_job({'density': DENSITY, 'output': 'link/world.world'})
+    job = service._make_job({'density': DENSITY, 'output': 'mine/world.world'})
+    assert job['path'] == (project / "worlds/mine/world.world").resolve()
+
+
+@pytest.mark.parametrize("rasters", [
+    'trees.tif', {'cactus': 'trees.tif'}, {'tree': ''}, {'tree': 'missing.tif'},
+    {'tree': '../mesh/terrain.stl'}, {'tree': '/etc/passwd'},
+])
+def test_density_rasters_are_confined_to_the_dem_directory(project, rasters):
+    (project / "models/ground/dem/trees.tif").write_bytes(b"")
+    service = WorldService(WorldPopulator(project))
+
+    with pytest.raises(ValueError):
+        service._make_job({'density': DENSITY, 'density_rasters': rasters})
+
+
+def test_density_rasters_resolve_inside_the_dem_directory(project):
+    raster = project / "models/ground/dem/trees.tif"
+    raster.write_bytes(b"")
+    service = WorldService(WorldPopulator(project))
+    job = service._make_job({'density': DENSITY, 'placement': 'density',
+                             'density_rasters': {'tree': 'trees.tif'}})
+
+    assert job['options'] == {'placement': 'density',
+                              'density_rasters': {'tree': str(raster.resolve())}}
+
+
+def test_served_world_matches_a_direct_world(service, project, tmp_path):
+    response = service.generate({'density': DENSITY, 'seed': 5, 'placement': 'poisson',
+                                 'output': 'served.world'})
+    direct = WorldPopulator(project).create_forest_world(
+        DENSITY, placement='poisson', seed=5, output_path=tmp_path / "direct.world")
+
+    assert response['placed'] == DENSITY
+    assert (project / "worlds/served.world").read_bytes() == direct.read_bytes()
+
+
+def test_seedless_requests_follow_the_service_seed(service, project):
+    first = [service.generate({'density': DENSITY, 'result': 'arrays'})['seed']
+             for _ in range(3)]
+    with WorldService(WorldPopulator(project), seed=1) as other:
+        second = [other.generate({'density': DENSITY, 'result': 'arrays'})['seed']
+                  for _ in range(3)]
+
+    assert first == second
+    assert len(set(first)) == 3
+    assert service.status()['worlds'] == 3
+
+
+def test_array_results_round_trip_through_npz(service):
+    response = service.generate({'density': DENSITY, 'seed': 6, 'result': 'npz'})
+    assert 'path' not in response
+
+    archive = np.load(io.BytesIO(service.encode_npz(response['arrays'])))
+    for category, entry in response['arrays'].items():
+        np.testing.assert_array_equal(archive[category], entry['instances'])
+        assert archive[f"{category}_variants"].tolist() == entry['variants']
+
+    encoded = service.encode_arrays(response['arrays'])
+    assert len(encoded['tree']['x']) == DENSITY['tree']
+
+
+def test_generate_needs_a_started_service(project):
+    with pytest.raises(RuntimeError):
+        WorldService(WorldPopulator(project)).generate({'density': DENSITY})
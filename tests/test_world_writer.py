@@ -0,0 +1,71 @@
+import gzip
+import xml.etree.ElementTree as ET
+
+import numpy as np
+
+from WorldWriter import WorldWriter
+
+
+def instances(count, seed=0):
+    rng = np.random.default_rng(seed)
+    result = np.zeros(count, dtype=WorldWriter.INSTANCE_DTYPE)
+    result['variant'] = rng.integers(2, size=count)
+    for field in ('x', 'y', 'z', 'roll', 'pitch', 'yaw'):
+        result[field] = rng.uniform(-100, 100, count)
+    result['scale'] = rng.uniform(0.5, 2, count)
+    return result
+
+
+def includes(root):
+    return root.find('world').findall('include')
+
+
+def test_world_lists_every_instance_with_rounded_poses(tmp_path):
+    trees = instances(25)
+    path = tmp_path / "forest.world"
+    with WorldWriter(path, position_decimals=2, angle_decimals=4) as writer:
+        # Several chunks per call
+        writer.add_instances('tree', ['oak', 'pine'], trees, chunk_size=10)
+        writer.add_instances('rock', ['granite', 'slate'], instances(3, seed=1), start_index=7)
+    assert writer.model_count == 28
+
+    models = includes(ET.parse(path).getroot())
+    assert models[0].find('uri').text == 'model://sun'
+    assert models[1].find('name').text == 'terrain'
+    trees_xml = models[2:27]
+    assert [m.find('name').text for m in models[27:]] == ['rock_7', 'rock_8', 'rock_9']
+
+    for i, (model, tree) in enumerate(zip(trees_xml, trees)):
+        assert model.find('name').text == f'tree_{i}'
+        assert model.find('uri').text == f"model://tree/{['oak', 'pine'][tree['variant']]}"
+        pose = model.find('pose').text.split()
+        assert pose[0] == f"{tree['x']:.2f}" and pose[3] == f"{tree['roll']:.4f}"
+        np.testing.assert_allclose([float(v) for v in pose],
+                                   [tree[f] for f in ('x', 'y', 'z', 'roll', 'pitch', 'yaw')],
+                                   atol=5e-3)
+        scale = model.find('scale').text.split()
+        assert scale == [f"{tree['scale']:.2f}"] * 3
+
+
+def test_terrain_includes_and_names_are_escaped(tmp_path):
+    path = tmp_path / "tiles.world"
+    tiles = [('model://terrain_tile_0_0', 'tile<0>', (10, -5, 0)),
+             ('model://terrain_tile_0_1', 'tile&1', (30, -5, 0))]
+    with WorldWriter(path, world_name='a&b', terrain_includes=tiles):
+        pass
+
+    root = ET.parse(path).getroot()
+    assert root.find('world').get('name') == 'a&b'
+    models = includes(root)[1:]
+    assert [m.find('name').text for m in models] == ['tile<0>', 'tile&1']
+    assert models[0].find('pose').text == '10 -5 0 0 0 0'
+
+
+def test_gzip_output(tmp_path):
+    path = tmp_path / "forest.world.gz"
+    with WorldWriter(path) as writer:
+        writer.add_instances('grass', ['short', 'tall'], instances(5))
+
+    with gzip.open(path, 'rt') as f:
+        root = ET.fromstring(f.read())
+    assert len(includes(root)) == 2 + 5